@@ -1,4 +1,12 @@
 from typing import List
+import logging
+
+from automata_skills import AutomataSkills
+from compactador_cv import compactar_cv
+from documento_cv import DocumentoCV
+from limites_llm import ErrorLLM
+
+logger = logging.getLogger(__name__)
 
 
 class AgenteAnalizadorSkills:
@@ -86,60 +94,36 @@ class AgenteAnalizadorSkills:
         ],
     }
 
+    AUTOMATA = AutomataSkills(CATEGORIAS_SKILLS)
+
     def __init__(self, llm_client):
         self.llm = llm_client
 
-    def analizar(self, cv_texto: str) -> dict:
+    def analizar(self, cv: DocumentoCV | str) -> dict:
         """Analiza el CV y extrae todas las skills encontradas"""
-        cv_lower = cv_texto.lower()
-
-        skills_encontradas = {
-            "lenguajes_programacion": [],
-            "frameworks_frontend": [],
-            "frameworks_backend": [],
-            "bases_datos": [],
-            "cloud_devops": [],
-            "metodologias": [],
-            "habilidades_blandas": [],
-        }
-
-        for categoria, skills in self.CATEGORIAS_SKILLS.items():
-            for skill in skills:
-                if skill in cv_lower:
-                    skills_encontradas[categoria].append(skill)
-
-        experiencia = self._extraer_experiencia(cv_texto)
+        documento = DocumentoCV.de(cv)
+        skills_encontradas = {categoria: [] for categoria in self.CATEGORIAS_SKILLS}
+        skills_encontradas.update(documento.skills_por_categoria(self.AUTOMATA))
 
         return {
             "skills": skills_encontradas,
-            "experiencia_anios": experiencia,
-            "skills_principales": self._extraer_skills_principales(cv_texto),
+            "experiencia_anios": documento.experiencia_anios,
+            "skills_principales": self._extraer_skills_principales(documento),
         }
 
-    def _extraer_experiencia(self, cv_texto: str) -> int:
-        """Extrae años de experiencia del CV"""
-        import re
-
-        patrones = [
-            r"(\d+)\+?\s*años?\s+de\s+experiencia",
-            r"(\d+)\+?\s*years?\s+experience",
-            r"experiencia:\s*(\d+)\s*años?",
-        ]
-        for patron in patrones:
-            match = re.search(patron, cv_texto, re.IGNORECASE)
-            if match:
-                return int(match.group(1))
-        return 0
-
-    def _extraer_skills_principales(self, cv_texto: str) -> List[str]:
+    def _extraer_skills_principales(self, documento: DocumentoCV) -> List[str]:
         """Usa LLM para identificar skills principales mencionadas"""
         prompt = f"""
 Analiza el siguiente CV y lista las 10 habilidades técnicas más importantes 
 que posee el candidato, ordenadas por relevancia:
 
-{cv_texto[:2000]}
+{compactar_cv(documento, automata=self.AUTOMATA)}
 
 Responde solo con una lista de habilidades, una por línea.
 """
-        resultado = self.llm.generate(prompt)
+        try:
+            resultado = self.llm.generate(prompt)
+        except ErrorLLM as e:
+            logger.warning(f"Sin skills principales del LLM: {e}")
+            return []
         return [s.strip() for s in resultado.strip().split("\n") if s.strip()]
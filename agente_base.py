@@ -1,14 +1,20 @@
 from abc import ABC, abstractmethod
+from collections import deque
 from typing import Any, Dict
 from dataclasses import dataclass, field
 from datetime import datetime
 import time
 import logging
 
+from limites_llm import ErrorLLM
+from metricas import METRICAS
 from modelos import TrazabilidadAgente
+from trazas import contexto_actual
 
 logger = logging.getLogger(__name__)
 
+MAX_TRAZAS_AGENTE = 100
+
 
 @dataclass
 class PromptEstructurado:
@@ -20,21 +26,73 @@ class PromptEstructurado:
 
 
 class AgenteBase(ABC):
-    """Clase base para todos los agentes"""
+    """
+    Clase base para todos los agentes
+
+    Las subclases definen el prompt LLM (_construir_prompt) y la version
+    local basada en reglas (_ejecutar_local); ejecutar/aejecutar eligen
+    una u otra segun la disponibilidad del LLM.
+
+    ENTRADAS mapea cada parametro del agente a la clave de contexto de la
+    que se lee; SALIDAS mapea cada clave producida a su valor por defecto.
+    El coordinador deriva de ellas el grafo de dependencias. Las entradas
+    cuyo nombre empieza por "_" (como el DocumentoCV compartido) no se
+    copian a las trazas.
+
+    Las trazas se registran en el ContextoTraza activo; fuera de una
+    evaluacion se guardan en self.trazabilidad, acotada a MAX_TRAZAS_AGENTE.
+    """
+
+    ENTRADAS: dict[str, str] = {}
+    SALIDAS: dict[str, Any] = {}
 
     def __init__(self, nombre: str, llm_client):
         self.nombre = nombre
         self.llm = llm_client
-        self.trazabilidad: list[TrazabilidadAgente] = []
+        self.trazabilidad: deque[TrazabilidadAgente] = deque(maxlen=MAX_TRAZAS_AGENTE)
+
+    @abstractmethod
+    def _construir_prompt(self, input_data: dict) -> str:
+        """Construye el prompt del agente para el LLM"""
+        pass
 
     @abstractmethod
+    def _ejecutar_local(self, input_data: dict) -> dict:
+        """Implementacion local sin LLM"""
+        pass
+
+    def _procesar_respuesta(self, respuesta: dict, input_data: dict) -> dict:
+        """Post-procesa la respuesta JSON del LLM"""
+        return respuesta
+
     def ejecutar(self, input_data: dict) -> dict:
         """Ejecuta la logica del agente"""
-        pass
+        if self.llm.disponible:
+            respuesta = self.llm.generate_json(self._construir_prompt(input_data))
+            return self._procesar_respuesta(self._validar(respuesta), input_data)
+
+        return self._ejecutar_local(input_data)
+
+    async def aejecutar(self, input_data: dict) -> dict:
+        """Version asincrona de ejecutar"""
+        if self.llm.disponible:
+            respuesta = await self.llm.agenerate_json(
+                self._construir_prompt(input_data)
+            )
+            return self._procesar_respuesta(self._validar(respuesta), input_data)
+
+        return self._ejecutar_local(input_data)
+
+    @staticmethod
+    def _validar(respuesta: dict) -> dict:
+        """Una respuesta sin JSON es un fallo del LLM, no una salida vacia"""
+        if "raw_response" in respuesta:
+            raise ErrorLLM("respuesta del LLM sin JSON valido")
+        return respuesta
 
     def _ejecutar_con_trazabilidad(self, input_data: dict) -> dict:
         """Ejecuta el agente con medicion de tiempo y trazabilidad"""
-        inicio = time.time()
+        inicio = time.perf_counter()
         output = {}
         error = None
 
@@ -47,19 +105,88 @@ class AgenteBase(ABC):
             error = str(e)
             output = {"error": error}
 
-        duracion = (time.time() - inicio) * 1000
+        self._registrar_traza(input_data, output, error, inicio)
+        return output
+
+    async def _aejecutar_con_trazabilidad(self, input_data: dict) -> dict:
+        """Version asincrona de _ejecutar_con_trazabilidad"""
+        inicio = time.perf_counter()
+        output = {}
+        error = None
+
+        try:
+            logger.info(f"[{self.nombre}] Iniciando ejecucion")
+            output = await self.aejecutar(input_data)
+            logger.info(f"[{self.nombre}] Ejecucion completada")
+        except Exception as e:
+            logger.error(f"[{self.nombre}] Error: {e}")
+            error = str(e)
+            output = {"error": error}
+
+        self._registrar_traza(input_data, output, error, inicio)
+        return output
+
+    def _ejecutar_respaldo(self, input_data: dict, motivo: str) -> dict:
+        """Ejecuta la implementacion local tras un timeout o error del LLM"""
+        inicio = time.perf_counter()
+        output = {}
+        error = None
+
+        try:
+            logger.warning(f"[{self.nombre}] Usando metodo local: {motivo}")
+            output = self._ejecutar_local(input_data)
+        except Exception as e:
+            logger.error(f"[{self.nombre}] Error: {e}")
+            error = str(e)
+            output = {"error": error}
+
+        METRICAS.incrementar("fallbacks_total", {"agente": self.nombre})
+        self._registrar_traza(input_data, output, error, inicio, fallback=motivo)
+        return output
+
+    def _registrar_traza(
+        self,
+        input_data: dict,
+        output: dict,
+        error: str | None,
+        inicio: float,
+        fallback: str | None = None,
+        duracion_ms: float | None = None,
+    ):
+        """Registra la traza y la latencia; inicio viene de time.perf_counter()"""
+        if duracion_ms is None:
+            duracion = (time.perf_counter() - inicio) * 1000
+        else:
+            duracion = duracion_ms
+
+        if fallback is not None or self.llm is None or not self.llm.disponible:
+            modo = "local"
+        else:
+            modo = "llm"
+        if error or "error" in output:
+            resultado = "error"
+        else:
+            resultado = "fallback" if fallback is not None else "ok"
+        METRICAS.observar(
+            "agente_duracion_ms",
+            duracion,
+            {"agente": self.nombre, "modo": modo, "resultado": resultado},
+        )
 
         trazabilidad = TrazabilidadAgente(
             agente=self.nombre,
             status="error" if error else "success",
             duracion_ms=round(duracion, 2),
-            input_data=input_data,
+            input_data={k: v for k, v in input_data.items() if not k.startswith("_")},
             output_data=output,
             error=error,
+            fallback=fallback,
         )
-        self.trazabilidad.append(trazabilidad)
-
-        return output
+        contexto = contexto_actual()
+        if contexto is not None:
+            contexto.registrar(trazabilidad)
+        else:
+            self.trazabilidad.append(trazabilidad)
 
 
 PROMPTS = {
@@ -169,6 +296,47 @@ Nivel estimado: {seniority_estimado}
 Nivel requerido: {nivel_solicitado}
 Brechas: {brechas}
 
+Responde SOLO con JSON valido.""",
+    ),
+    "evaluacion_fusionada": PromptEstructurado(
+        system_prompt="""Eres un evaluador experto de candidatos tecnicos. En una sola respuesta realizas el trabajo de cuatro analistas:
+
+1. analista_skills: extrae habilidades tecnicas y blandas del CV
+2. evaluador_seniority: determina el nivel (junior 0-2 anos, semi-senior 2-4, senior 4-7, staff 7-10, principal 10+)
+3. detector_brechas: compara las skills del CV con el stack requerido
+4. calculador_match: calcula el match (tecnico 70%, seniority 30%)
+
+Responde en JSON con una seccion por analista:
+{
+  "analista_skills": {
+    "skills_tecnicas": [], "skills_blandas": [],
+    "experiencia_anios": numero, "nivel_autodetectado": "nivel"
+  },
+  "evaluador_seniority": {
+    "seniority_estimado": "nivel", "experiencia_detectada": numero,
+    "fundamento": "explicacion breve", "coherente": true/false,
+    "indicadores_encontrados": []
+  },
+  "detector_brechas": {
+    "brechas_criticas": [], "brechas_deseables": [],
+    "skills_coincidentes": [], "evaluacion_global": "descripcion breve"
+  },
+  "calculador_match": {
+    "porcentaje_match": numero, "match_tecnico": numero,
+    "match_seniority": numero,
+    "clasificacion": "excelente/bueno/regular/bajo/no_recomendado",
+    "resumen": "descripcion breve"
+  }
+}""",
+        user_template="""Evalua este candidato contra el puesto:
+
+CV:
+{cv_texto}
+
+Stack requerido: {stack_requerido}
+Nivel solicitado: {nivel_solicitado}
+Experiencia minima requerida: {exp_minima} anos
+
 Responde SOLO con JSON valido.""",
     ),
 }
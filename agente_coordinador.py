@@ -1,6 +1,10 @@
-from typing import Optional
+from typing import Any, Coroutine, Optional
 from datetime import datetime
 from dataclasses import dataclass, field
+import copy
+import json
+import threading
+import time
 import logging
 
 from modelos import (
@@ -9,7 +13,18 @@ from modelos import (
     TrazabilidadAgente,
     RequisitosPuesto,
 )
-from llm_client import LLMClient, create_llm_client
+from agente_base import PROMPTS
+from coalescencia import CoalescedorVuelo, huella
+from documento_cv import DocumentoCV
+from llm_client import (
+    LLMClient,
+    create_llm_client,
+    obtener_llm_client,
+    limpiar_registro_clientes,
+)
+from limites_llm import ConfiguracionLimites, LimitadorLLM
+from llm_simulado import ConfiguracionSimulacion
+from registro import RegistroLRU, clave_configuracion
 from agentes_especializados import (
     AgenteAnalistaSkills,
     AgenteEvaluadorSeniority,
@@ -17,9 +32,52 @@ from agentes_especializados import (
     AgenteCalculadorMatch,
 )
 from reglas import ReglasEvaluacion, get_clasificacion
+from grafo_agentes import GrafoAgentes
+from trazas import AlmacenTrazas, ContextoTraza, NIVELES_TRAZA, contexto_actual
+from workflows import WORKFLOW_DEFAULT
 
 logger = logging.getLogger(__name__)
 
+_bucle_fondo = None
+_lock_bucle_fondo = threading.Lock()
+
+
+def _obtener_bucle_fondo():
+    """
+    Event loop compartido, en un hilo daemon, para las evaluaciones sincronas.
+
+    Es uno solo por proceso y vive lo que el proceso: los clientes HTTP
+    asincronos del proveedor quedan ligados al loop en que se crean.
+    """
+    global _bucle_fondo
+    import asyncio
+
+    with _lock_bucle_fondo:
+        if _bucle_fondo is None:
+            bucle = asyncio.new_event_loop()
+            threading.Thread(
+                target=bucle.run_forever, name="coordinador-loop", daemon=True
+            ).start()
+            _bucle_fondo = bucle
+        return _bucle_fondo
+
+
+def _esperar_en_bucle_fondo(corrutina: Coroutine[Any, Any, Any]) -> Any:
+    """Ejecuta `corrutina` en el loop de fondo dentro del ContextoTraza actual"""
+    import asyncio
+
+    trazas = contexto_actual()
+
+    async def _con_trazas():
+        if trazas is None:
+            return await corrutina
+        with trazas:
+            return await corrutina
+
+    return asyncio.run_coroutine_threadsafe(
+        _con_trazas(), _obtener_bucle_fondo()
+    ).result()
+
 
 @dataclass
 class ConfiguracionEvaluacion:
@@ -29,6 +87,16 @@ class ConfiguracionEvaluacion:
     modelo: str = "gpt-4"
     usar_langchain: bool = True
     incluir_trazabilidad: bool = True
+    workflow: Optional[dict] = None
+    modo_fusionado: bool = False
+    max_trazas_retenidas: int = 256
+    muestreo_trazas: float = 1.0
+    nivel_traza: str = "completo"
+    muestreo_payload: float = 0.0
+    simulacion: Optional[ConfiguracionSimulacion] = None
+    limites: Optional[ConfiguracionLimites] = None
+    limitador: Optional[LimitadorLLM] = None
+    coalescer: bool = True
 
 
 class AgenteCoordinador:
@@ -47,26 +115,50 @@ class AgenteCoordinador:
     │  (Orquestacion y flujo)                              │
     └──────────────────────┬───────────────────────────────┘
                            │
-    ┌──────────────────────┼───────────────────────────────┐
-    │                      │                               │
-    v                      v                               v
-    ┌────────────┐   ┌────────────┐              ┌────────────┐
-    │ Analista   │-> │ Evaluador  │   ->        │ Detector   │
-    │ Skills     │   │ Seniority  │              │ Brechas    │
-    └────────────┘   └────────────┘              └─────┬──────┘
-                                                      │
-                                                      v
-                                              ┌────────────┐
-                                              │ Calculador │
-                                              │ Match      │
-                                              └────────────┘
+              ┌────────────┴───────────┐   (en paralelo)
+              v                        v
+        ┌────────────┐          ┌────────────┐
+        │ Analista   │          │ Evaluador  │
+        │ Skills     │          │ Seniority  │
+        └─────┬──────┘          └─────┬──────┘
+              v                       │
+        ┌────────────┐                │
+        │ Detector   │                │
+        │ Brechas    │                │
+        └─────┬──────┘                │
+              v                       v
+        ┌───────────────────────────────────┐
+        │         Calculador Match          │
+        └───────────────────────────────────┘
+
+    El orden se deriva de las ENTRADAS/SALIDAS declaradas por cada agente.
+
+    Con modo_fusionado, los cuatro agentes se resuelven con una sola
+    llamada al LLM cuya respuesta JSON trae una seccion por agente.
     """
 
     def __init__(self, config: Optional[ConfiguracionEvaluacion] = None):
         self.config = config or ConfiguracionEvaluacion()
-        self.llm = create_llm_client(
-            api_key=self.config.api_key, model=self.config.modelo
-        )
+        if self.config.nivel_traza not in NIVELES_TRAZA:
+            raise ValueError(
+                f"nivel_traza debe ser uno de {NIVELES_TRAZA}: {self.config.nivel_traza}"
+            )
+        if (
+            self.config.simulacion is not None
+            or self.config.limites is not None
+            or self.config.limitador is not None
+        ):
+            self.llm = create_llm_client(
+                api_key=self.config.api_key,
+                model=self.config.modelo,
+                simulacion=self.config.simulacion,
+                limites=self.config.limites,
+                limitador=self.config.limitador,
+            )
+        else:
+            self.llm = obtener_llm_client(
+                api_key=self.config.api_key, model=self.config.modelo
+            )
 
         self.agentes = {
             "analista_skills": AgenteAnalistaSkills(self.llm),
@@ -75,7 +167,26 @@ class AgenteCoordinador:
             "calculador_match": AgenteCalculadorMatch(self.llm),
         }
 
-        self.trazabilidad_global: list[TrazabilidadAgente] = []
+        self.grafo = GrafoAgentes.desde_agentes(
+            self.agentes,
+            entradas_iniciales=self._contexto_inicial("", [], "", 0, None),
+        )
+        workflow = self.config.workflow or WORKFLOW_DEFAULT
+        # Los pasos sin "nodo" no corresponden a un agente del grafo (p.ej.
+        # WORKFLOW_LANGCHAIN); esos agentes se quedan sin plazo
+        self.timeouts: dict[str, Optional[float]] = {
+            paso["nodo"]: paso.get("timeout")
+            for paso in workflow.get("pasos", [])
+            if paso.get("nodo") in self.agentes
+        }
+        self.metodo_respaldo = workflow.get("fallback", {}).get("metodo_backup")
+
+        self.almacen_trazas = AlmacenTrazas(
+            max_evaluaciones=self.config.max_trazas_retenidas,
+            muestreo=self.config.muestreo_trazas,
+        )
+        self._ultimo_contexto: Optional[ContextoTraza] = None
+        self._vuelos = CoalescedorVuelo("evaluacion")
         logger.info("AgenteCoordinador inicializado")
 
     def evaluar(
@@ -89,90 +200,399 @@ class AgenteCoordinador:
         """
         Ejecuta el flujo completo de evaluacion
 
-        Flujo:
-        1. AnalistaSkills -> Extrae skills del CV
-        2. EvaluadorSeniority -> Determina nivel
-        3. DetectorBrechas -> Identifica gaps
-        4. CalculadorMatch -> Calcula compatibilidad
+        Flujo (derivado de las ENTRADAS/SALIDAS de cada agente):
+        1. AnalistaSkills y EvaluadorSeniority -> en paralelo, solo leen el CV
+        2. DetectorBrechas -> Identifica gaps a partir de las skills
+        3. CalculadorMatch -> Calcula compatibilidad
+
+        En modo local los agentes se ejecutan en orden en el hilo actual;
+        con LLM, la evaluacion corre en un event loop de fondo (como aevaluar)
+        y este hilo espera el resultado: asi un plazo vencido cancela de
+        verdad la llamada al LLM y libera su plaza en el limitador.
+
+        Si ya hay en curso una evaluacion del mismo CV con los mismos
+        requisitos, se espera a esa en lugar de repetirla (config.coalescer).
         """
+        argumentos = (
+            cv_texto,
+            stack_requerido,
+            nivel_solicitado,
+            experiencia_minima,
+            habilidades_blandas,
+        )
+        if not self._coalescer_evaluacion():
+            return self._evaluar(*argumentos)
+        return self._vuelos.ejecutar(
+            self._clave_evaluacion(*argumentos), lambda: self._evaluar(*argumentos)
+        )
+
+    def _evaluar(
+        self,
+        cv_texto: str,
+        stack_requerido: list[str],
+        nivel_solicitado: str,
+        experiencia_minima: int,
+        habilidades_blandas: Optional[list[str]],
+    ) -> ResultadoCompleto:
         inicio_total = datetime.now()
         logger.info(f"Iniciando evaluacion de CV")
 
-        try:
-            resultado_analisis = self._ejecutar_agente(
-                "analista_skills", {"cv_texto": cv_texto}
-            )
+        with ContextoTraza() as trazas:
+            try:
+                contexto = self._contexto_inicial(
+                    cv_texto,
+                    stack_requerido,
+                    nivel_solicitado,
+                    experiencia_minima,
+                    habilidades_blandas,
+                )
+                if self._usar_modo_fusionado():
+                    _esperar_en_bucle_fondo(self._aejecutar_fusionado(contexto))
+                elif self.llm.disponible:
+                    _esperar_en_bucle_fondo(self._aejecutar_grafo(contexto))
+                else:
+                    self._ejecutar_grafo(contexto)
+                return self._consolidar(contexto, inicio_total, trazas)
 
-            resultado_seniority = self._ejecutar_agente(
-                "evaluador_seniority",
-                {
-                    "cv_texto": cv_texto,
-                    "nivel_solicitado": nivel_solicitado,
-                    "experiencia_minima": experiencia_minima,
-                },
-            )
+            except Exception as e:
+                logger.error(f"Error en evaluacion: {e}")
+                return self._crear_resultado_error(str(e), inicio_total, trazas.trazas)
 
-            resultado_brechas = self._ejecutar_agente(
-                "detector_brechas",
-                {
-                    "skills_encontradas": resultado_analisis.get("skills_tecnicas", []),
-                    "stack_requerido": stack_requerido,
-                    "cv_texto": cv_texto,
-                },
-            )
+            finally:
+                self._cerrar_trazas(trazas)
 
-            resultado_match = self._ejecutar_agente(
-                "calculador_match",
-                {
-                    "skills_encontradas": resultado_brechas.get(
-                        "skills_coincidentes", []
-                    ),
-                    "stack_requerido": stack_requerido,
-                    "seniority_estimado": resultado_seniority.get(
-                        "seniority_estimado", "senior"
-                    ),
-                    "nivel_solicitado": nivel_solicitado,
-                    "brechas_criticas": resultado_brechas.get("brechas_criticas", []),
-                },
-            )
+    async def aevaluar(
+        self,
+        cv_texto: str,
+        stack_requerido: list[str],
+        nivel_solicitado: str,
+        experiencia_minima: int = 0,
+        habilidades_blandas: list[str] = None,
+    ) -> ResultadoCompleto:
+        """
+        Version asincrona de evaluar.
 
-            resultado = ResultadoEvaluacion(
-                porcentaje_match=resultado_match.get("porcentaje_match", 0),
-                seniority_estimado=resultado_seniority.get(
-                    "seniority_estimado", "senior"
-                ),
-                brechas_tecnicas=resultado_brechas.get("brechas_criticas", []),
-                skills_encontradas=resultado_brechas.get("skills_coincidentes", []),
-                skills_faltantes=resultado_brechas.get("brechas_criticas", []),
-                nivel_coherente=resultado_seniority.get("coherente", True),
-                resumen_evaluacion=resultado_match.get("resumen", ""),
-            )
+        Las llamadas al LLM usan ainvoke, de modo que un unico event loop
+        puede mantener muchas evaluaciones en curso a la vez. Cada agente
+        arranca en cuanto terminan los agentes de los que depende.
+        """
+        argumentos = (
+            cv_texto,
+            stack_requerido,
+            nivel_solicitado,
+            experiencia_minima,
+            habilidades_blandas,
+        )
+        if not self._coalescer_evaluacion():
+            return await self._aevaluar(*argumentos)
+        return await self._vuelos.aejecutar(
+            self._clave_evaluacion(*argumentos), lambda: self._aevaluar(*argumentos)
+        )
 
-            self.trazabilidad_global.extend(
-                [t for agente in self.agentes.values() for t in agente.trazabilidad]
-            )
+    async def _aevaluar(
+        self,
+        cv_texto: str,
+        stack_requerido: list[str],
+        nivel_solicitado: str,
+        experiencia_minima: int,
+        habilidades_blandas: Optional[list[str]],
+    ) -> ResultadoCompleto:
+        inicio_total = datetime.now()
+        logger.info(f"Iniciando evaluacion asincrona de CV")
 
-            return ResultadoCompleto(
-                resultado=resultado,
-                trazabilidad=self.trazabilidad_global,
-                metodo="langchain" if self.config.usar_langchain else "estructurado",
-                timestamp=inicio_total.isoformat(),
-            )
+        with ContextoTraza() as trazas:
+            try:
+                contexto = self._contexto_inicial(
+                    cv_texto,
+                    stack_requerido,
+                    nivel_solicitado,
+                    experiencia_minima,
+                    habilidades_blandas,
+                )
+                if self._usar_modo_fusionado():
+                    await self._aejecutar_fusionado(contexto)
+                else:
+                    await self._aejecutar_grafo(contexto)
+                return self._consolidar(contexto, inicio_total, trazas)
 
-        except Exception as e:
-            logger.error(f"Error en evaluacion: {e}")
-            return self._crear_resultado_error(str(e), inicio_total)
+            except Exception as e:
+                logger.error(f"Error en evaluacion: {e}")
+                return self._crear_resultado_error(str(e), inicio_total, trazas.trazas)
+
+            finally:
+                self._cerrar_trazas(trazas)
+
+    def _coalescer_evaluacion(self) -> bool:
+        # En modo local evaluar cuesta menos que coordinar la espera
+        return self.config.coalescer and self.llm.disponible
+
+    @staticmethod
+    def _clave_evaluacion(
+        cv_texto: str,
+        stack_requerido: list[str],
+        nivel_solicitado: str,
+        experiencia_minima: int,
+        habilidades_blandas: Optional[list[str]],
+    ) -> tuple[str, str]:
+        """Hash del CV + hash de los requisitos del puesto"""
+        requisitos = json.dumps(
+            [
+                list(stack_requerido),
+                nivel_solicitado,
+                experiencia_minima,
+                list(habilidades_blandas or []),
+            ],
+            ensure_ascii=False,
+        )
+        return huella(cv_texto), huella(requisitos)
+
+    @staticmethod
+    def _contexto_inicial(
+        cv_texto: str,
+        stack_requerido: list[str],
+        nivel_solicitado: str,
+        experiencia_minima: int,
+        habilidades_blandas: Optional[list[str]],
+    ) -> dict:
+        return {
+            "cv_texto": cv_texto,
+            "_documento": DocumentoCV(cv_texto),
+            "stack_requerido": stack_requerido,
+            "nivel_solicitado": nivel_solicitado,
+            "experiencia_minima": experiencia_minima,
+            "habilidades_blandas": habilidades_blandas or [],
+        }
+
+    def _ejecutar_grafo(self, contexto: dict):
+        """Ejecuta los agentes en modo local, en el orden del grafo"""
+        for nombre in self.grafo.orden:
+            self._ejecutar_nodo(nombre, contexto)
+
+    async def _aejecutar_grafo(self, contexto: dict):
+        """
+        Ejecuta los agentes respetando el grafo de dependencias.
+
+        Cada agente arranca en cuanto terminan aquellos de los que depende.
+        Con LLM, su plazo es el timeout de su paso en el workflow; si vence,
+        la llamada se cancela y se ejecuta el metodo local del agente.
+        """
+        import asyncio
+
+        tareas: dict[str, asyncio.Future] = {}
+
+        async def _ejecutar(nombre: str):
+            await asyncio.gather(*(tareas[d] for d in self.grafo.dependencias[nombre]))
+            await self._aejecutar_nodo(nombre, contexto)
+
+        for nombre in self.grafo.orden:
+            tareas[nombre] = asyncio.ensure_future(_ejecutar(nombre))
+        await asyncio.gather(*tareas.values())
+
+    def _usar_modo_fusionado(self) -> bool:
+        return self.config.modo_fusionado and self.llm.disponible
+
+    def _prompt_fusionado(self, contexto: dict) -> str:
+        prompt = PROMPTS["evaluacion_fusionada"]
+        return prompt.system_prompt + "\n\n" + prompt.construir(
+            cv_texto=contexto["cv_texto"],
+            stack_requerido=", ".join(contexto["stack_requerido"]),
+            nivel_solicitado=contexto["nivel_solicitado"],
+            exp_minima=contexto["experiencia_minima"],
+        )
+
+    def _timeout_fusionado(self) -> Optional[float]:
+        """El plazo de la llamada fusionada es la suma de los plazos de los pasos"""
+        plazos = [self.timeouts.get(nombre) for nombre in self.grafo.orden]
+        if any(plazo is None for plazo in plazos):
+            return None
+        return sum(plazos)
+
+    async def _aejecutar_fusionado(self, contexto: dict):
+        """
+        Resuelve todos los agentes con una unica llamada al LLM.
+
+        La respuesta se reparte entre los agentes en el orden del grafo; cada
+        seccion pasa por el _procesar_respuesta de su agente y deja su propia
+        traza, con la duracion de la llamada dividida a partes iguales.
+        """
+        import asyncio
 
-    def _ejecutar_agente(self, nombre: str, input_data: dict) -> dict:
-        """Ejecuta un agente y maneja errores"""
+        inicio = time.perf_counter()
+        timeout = self._timeout_fusionado()
         try:
-            agente = self.agentes[nombre]
-            return agente._ejecutar_con_trazabilidad(input_data)
+            respuesta = await asyncio.wait_for(
+                self.llm.agenerate_json(self._prompt_fusionado(contexto)),
+                timeout=timeout,
+            )
+            motivo = None
+        except asyncio.TimeoutError:
+            respuesta, motivo = {}, f"timeout tras {timeout}s"
         except Exception as e:
-            logger.error(f"Error en agente {nombre}: {e}")
-            return {"error": str(e)}
+            respuesta, motivo = {}, f"error: {e}"
+        self._repartir_fusionado(respuesta, contexto, inicio, motivo)
+
+    def _repartir_fusionado(
+        self, respuesta: dict, contexto: dict, inicio: float, motivo: Optional[str]
+    ):
+        """Separa la respuesta fusionada en las salidas de cada agente"""
+        if motivo:
+            logger.warning(f"Llamada fusionada: {motivo}")
+        duracion = (time.perf_counter() - inicio) * 1000 / len(self.grafo.orden)
+
+        for nombre in self.grafo.orden:
+            agente = self.agentes[nombre]
+            entrada = self._entrada_nodo(nombre, contexto)
+            seccion = respuesta.get(nombre)
+            if isinstance(seccion, dict) and seccion:
+                try:
+                    output = agente._procesar_respuesta(seccion, entrada)
+                    error = None
+                except Exception as e:
+                    output, error = {"error": str(e)}, str(e)
+                agente._registrar_traza(
+                    entrada, output, error, inicio, duracion_ms=duracion
+                )
+                output = self._respaldo_si_error(nombre, entrada, output)
+            else:
+                faltante = motivo or "seccion ausente en la respuesta fusionada"
+                output = self._respaldo_seccion(
+                    nombre, entrada, faltante, inicio, duracion
+                )
+            self._guardar_salida(nombre, output, contexto)
+
+    def _respaldo_seccion(
+        self, nombre: str, entrada: dict, motivo: str, inicio: float, duracion: float
+    ) -> dict:
+        agente = self.agentes[nombre]
+        if self.metodo_respaldo == "estructurado":
+            return agente._ejecutar_respaldo(entrada, motivo)
+        output = {"error": motivo}
+        agente._registrar_traza(entrada, output, motivo, inicio, duracion_ms=duracion)
+        return output
+
+    def _entrada_nodo(self, nombre: str, contexto: dict) -> dict:
+        agente = self.agentes[nombre]
+        return {param: contexto[clave] for param, clave in agente.ENTRADAS.items()}
+
+    def _guardar_salida(self, nombre: str, output: dict, contexto: dict):
+        for clave, por_defecto in self.agentes[nombre].SALIDAS.items():
+            contexto[clave] = output.get(clave, copy.deepcopy(por_defecto))
+
+    def _ejecutar_nodo(self, nombre: str, contexto: dict):
+        output = self._aceptar(
+            self._ejecutar_agente(nombre, self._entrada_nodo(nombre, contexto))
+        )
+        self._guardar_salida(nombre, output, contexto)
+
+    async def _aejecutar_nodo(self, nombre: str, contexto: dict):
+        import asyncio
+
+        entrada = self._entrada_nodo(nombre, contexto)
+        if not self.llm.disponible:
+            output = self._aceptar(await self._aejecutar_agente(nombre, entrada))
+        else:
+            try:
+                output = self._aceptar(
+                    await asyncio.wait_for(
+                        self._aejecutar_agente(nombre, entrada),
+                        timeout=self.timeouts.get(nombre),
+                    )
+                )
+                output = self._respaldo_si_error(nombre, entrada, output)
+            except asyncio.TimeoutError:
+                output = self._respaldo_por_timeout(nombre, entrada)
+        self._guardar_salida(nombre, output, contexto)
+
+    @staticmethod
+    def _aceptar(resultado: tuple[dict, list[TrazabilidadAgente]]) -> dict:
+        """Incorpora a la evaluacion en curso las trazas de un resultado aceptado"""
+        output, trazas = resultado
+        contexto = contexto_actual()
+        if contexto is not None:
+            contexto.extender(trazas)
+        return output
+
+    def _respaldo_por_timeout(self, nombre: str, entrada: dict) -> dict:
+        motivo = f"timeout tras {self.timeouts.get(nombre)}s"
+        logger.warning(f"Agente {nombre}: {motivo}")
+        if self.metodo_respaldo != "estructurado":
+            return {"error": motivo}
+        return self.agentes[nombre]._ejecutar_respaldo(entrada, motivo)
 
-    def _crear_resultado_error(self, error: str, inicio: datetime) -> ResultadoCompleto:
+    def _respaldo_si_error(self, nombre: str, entrada: dict, output: dict) -> dict:
+        """Aplica el metodo de respaldo del workflow si el agente fallo"""
+        if "error" not in output or self.metodo_respaldo != "estructurado":
+            return output
+        return self.agentes[nombre]._ejecutar_respaldo(
+            entrada, f"error: {output['error']}"
+        )
+
+    def _consolidar(
+        self, contexto: dict, inicio_total: datetime, trazas: ContextoTraza
+    ) -> ResultadoCompleto:
+        """Construye el ResultadoCompleto a partir del contexto de la evaluacion"""
+        if self.config.nivel_traza == "compacto":
+            trazas.compactar(self.config.muestreo_payload)
+
+        resultado = ResultadoEvaluacion(
+            porcentaje_match=contexto["porcentaje_match"],
+            seniority_estimado=contexto["seniority_estimado"],
+            brechas_tecnicas=contexto["brechas_criticas"],
+            skills_encontradas=contexto["skills_coincidentes"],
+            skills_faltantes=contexto["brechas_criticas"],
+            nivel_coherente=contexto["coherente"],
+            resumen_evaluacion=contexto["resumen"],
+        )
+
+        return ResultadoCompleto(
+            resultado=resultado,
+            trazabilidad=trazas.trazas,
+            metodo="langchain" if self.config.usar_langchain else "estructurado",
+            timestamp=inicio_total.isoformat(),
+        )
+
+    def _ejecutar_agente(
+        self, nombre: str, input_data: dict
+    ) -> tuple[dict, list[TrazabilidadAgente]]:
+        """
+        Ejecuta un agente y maneja errores.
+
+        Las trazas se recogen en un contexto propio y se devuelven junto al
+        output; solo pasan a la evaluacion si el coordinador acepta el
+        resultado (ver _aceptar), asi una llamada que vencio no deja traza.
+        """
+        with ContextoTraza() as parcial:
+            try:
+                agente = self.agentes[nombre]
+                output = agente._ejecutar_con_trazabilidad(input_data)
+            except Exception as e:
+                logger.error(f"Error en agente {nombre}: {e}")
+                output = {"error": str(e)}
+        return output, parcial.trazas
+
+    async def _aejecutar_agente(
+        self, nombre: str, input_data: dict
+    ) -> tuple[dict, list[TrazabilidadAgente]]:
+        """Version asincrona de _ejecutar_agente"""
+        with ContextoTraza() as parcial:
+            try:
+                agente = self.agentes[nombre]
+                output = await agente._aejecutar_con_trazabilidad(input_data)
+            except Exception as e:
+                logger.error(f"Error en agente {nombre}: {e}")
+                output = {"error": str(e)}
+        return output, parcial.trazas
+
+    def _cerrar_trazas(self, trazas: ContextoTraza):
+        self.almacen_trazas.guardar(trazas)
+        self._ultimo_contexto = trazas
+
+    def _crear_resultado_error(
+        self,
+        error: str,
+        inicio: datetime,
+        trazas: Optional[list[TrazabilidadAgente]] = None,
+    ) -> ResultadoCompleto:
         """Crea un resultado de error"""
         resultado = ResultadoEvaluacion(
             porcentaje_match=0,
@@ -186,20 +606,27 @@ class AgenteCoordinador:
 
         return ResultadoCompleto(
             resultado=resultado,
-            trazabilidad=self.trazabilidad_global,
+            trazabilidad=list(trazas or []),
             metodo="error",
             timestamp=inicio.isoformat(),
         )
 
+    @property
+    def trazabilidad_global(self) -> list[TrazabilidadAgente]:
+        return self.obtener_trazabilidad()
+
     def obtener_trazabilidad(self) -> list[TrazabilidadAgente]:
         """Retorna la trazabilidad de la ultima evaluacion"""
-        return self.trazabilidad_global
+        if self._ultimo_contexto is None:
+            return []
+        return self._ultimo_contexto.trazas
 
     def limpiar_trazabilidad(self):
         """Limpia la trazabilidad"""
-        self.trazabilidad_global = []
+        self._ultimo_contexto = None
+        self.almacen_trazas.limpiar()
         for agente in self.agentes.values():
-            agente.trazabilidad = []
+            agente.trazabilidad.clear()
 
 
 def crear_coordinador(api_key: Optional[str] = None) -> AgenteCoordinador:
@@ -208,3 +635,36 @@ def crear_coordinador(api_key: Optional[str] = None) -> AgenteCoordinador:
         api_key=api_key, usar_langchain=api_key is not None
     )
     return AgenteCoordinador(config)
+
+
+_REGISTRO_COORDINADORES = RegistroLRU(max_entradas=8)
+
+
+def obtener_coordinador(
+    api_key: Optional[str] = None, modelo: str = "gpt-4", modo_fusionado: bool = False
+) -> AgenteCoordinador:
+    """
+    Devuelve un coordinador "caliente" para (hash de api_key, modelo, modo).
+
+    Reutiliza el cliente LLM y los agentes entre evaluaciones; las entradas
+    menos usadas se expulsan cuando el registro se llena.
+    """
+
+    def _crear() -> AgenteCoordinador:
+        config = ConfiguracionEvaluacion(
+            api_key=api_key,
+            modelo=modelo,
+            usar_langchain=api_key is not None,
+            modo_fusionado=modo_fusionado,
+        )
+        return AgenteCoordinador(config)
+
+    return _REGISTRO_COORDINADORES.obtener(
+        (*clave_configuracion(api_key, modelo), modo_fusionado), _crear
+    )
+
+
+def limpiar_registro():
+    """Descarta todos los coordinadores y clientes LLM retenidos"""
+    _REGISTRO_COORDINADORES.limpiar()
+    limpiar_registro_clientes()
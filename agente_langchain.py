@@ -1,11 +1,12 @@
-from langchain.agents import AgentExecutor, create_openai_functions_agent
-from langchain_openai import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain.tools import Tool
-from langchain.schema import HumanMessage, SystemMessage
 from typing import Optional
 import json
 
+from compactador_cv import compactar_cv
+from llm_client import clase_mensaje_humano
+
+# langchain y langchain_openai se importan dentro de los metodos que los
+# usan, para que importar este modulo no cueste nada sin API key.
+
 
 class AgenteLangChain:
     """
@@ -24,6 +25,8 @@ class AgenteLangChain:
     def _inicializar_llm(self):
         """Inicializa el modelo de LangChain"""
         try:
+            from langchain_openai import ChatOpenAI
+
             self.llm = ChatOpenAI(
                 model=self.model, api_key=self.api_key, temperature=0.3
             )
@@ -37,6 +40,10 @@ class AgenteLangChain:
         if not self.llm:
             return {"error": "LLM no disponible"}
 
+        from langchain.prompts import ChatPromptTemplate
+        from langchain.schema import SystemMessage
+        from langchain.tools import Tool
+
         tools = [
             Tool(
                 name="ExtraerSkills",
@@ -67,12 +74,12 @@ Tu tarea es analizar currículums y evaluar:
 
 Responde en formato JSON."""
                 ),
-                HumanMessage(
+                clase_mensaje_humano()(
                     content=f"""
 Analiza el siguiente CV:
 
 CV:
-{cv_texto[:3000]}
+{compactar_cv(cv_texto, 750, requisitos.get("stack_tecnico", []))}
 
 REQUISITOS DEL PUESTO:
 - Stack requerido: {", ".join(requisitos.get("stack_tecnico", []))}
@@ -103,10 +110,10 @@ Proporciona:
 Extrae todas las habilidades técnicas mencionadas en este CV.
 Lista solo las habilidades, una por línea:
 
-{cv_texto[:2000]}
+{compactar_cv(cv_texto)}
 """
         if self.llm:
-            response = self.llm.invoke([HumanMessage(content=prompt)])
+            response = self.llm.invoke([clase_mensaje_humano()(content=prompt)])
             return response.content
         return ""
 
@@ -117,12 +124,12 @@ Evalúa el nivel de seniority basándote en el CV.
 Niveles: junior (0-2 años), semi-senior (2-4), senior (4-7), staff (7-10), principal (10+)
 
 CV:
-{cv_texto[:2000]}
+{compactar_cv(cv_texto)}
 
 Responde solo con el nivel estimado.
 """
         if self.llm:
-            response = self.llm.invoke([HumanMessage(content=prompt)])
+            response = self.llm.invoke([clase_mensaje_humano()(content=prompt)])
             return response.content.strip()
         return "semi-senior"
 
@@ -131,11 +138,11 @@ Responde solo con el nivel estimado.
         if self.llm:
             response = self.llm.invoke(
                 [
-                    HumanMessage(
+                    clase_mensaje_humano()(
                         content=f"""
 Identifica las brechas técnicas entre el CV y los requisitos.
 CV y requisitos:
-{datos[:2000]}
+{compactar_cv(datos)}
 
 Lista las skills que faltan.
 """
@@ -167,6 +174,8 @@ class AgenteCrewAI:
         self.llm = None
         if api_key:
             try:
+                from langchain_openai import ChatOpenAI
+
                 self.llm = ChatOpenAI(api_key=api_key, temperature=0.3)
             except:
                 pass
@@ -184,10 +193,14 @@ class AgenteCrewAI:
             ("DetectorBrechas", self._detector_brechas),
         ]
 
+        # Los tres prompts comparten la misma version compacta del CV
+        cv_compacto = compactar_cv(
+            cv_texto, terminos=requisitos.get("stack_tecnico", [])
+        )
         resultados = {}
         for nombre, func in agentes:
             try:
-                resultados[nombre] = func(cv_texto, requisitos)
+                resultados[nombre] = func(cv_compacto, requisitos)
             except Exception as e:
                 resultados[nombre] = {"error": str(e)}
 
@@ -199,18 +212,18 @@ class AgenteCrewAI:
 2. Años de experiencia mencionados
 3. Certificaciones
 
-CV: {cv[:2000]}"""
-        response = self.llm.invoke([HumanMessage(content=prompt)])
+CV: {cv}"""
+        response = self.llm.invoke([clase_mensaje_humano()(content=prompt)])
         return {"skills": response.content}
 
     def _evaluador_seniority(self, cv: str, req: dict) -> dict:
         prompt = f"""Evalúa el seniority apropiado para este CV.
 Nivel solicitado: {req.get("nivel_solicitado", "senior")}
 
-CV: {cv[:2000]}
+CV: {cv}
 
 Responde con nivel estimado y justificación breve."""
-        response = self.llm.invoke([HumanMessage(content=prompt)])
+        response = self.llm.invoke([clase_mensaje_humano()(content=prompt)])
         return {"seniority": response.content}
 
     def _detector_brechas(self, cv: str, req: dict) -> dict:
@@ -218,8 +231,8 @@ Responde con nivel estimado y justificación breve."""
         prompt = f"""Dado el stack requerido: {", ".join(stack_req)}
 ¿Qué skills faltan en este CV?
 
-CV: {cv[:2000]}"""
-        response = self.llm.invoke([HumanMessage(content=prompt)])
+CV: {cv}"""
+        response = self.llm.invoke([clase_mensaje_humano()(content=prompt)])
         return {"brechas": response.content}
 
     def _consolidar_resultados(self, resultados: dict, requisitos: dict) -> dict:
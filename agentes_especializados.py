@@ -1,6 +1,8 @@
 from typing import Dict, Any
 from agente_base import AgenteBase, PROMPTS
-import re
+from automata_skills import AutomataSkills
+from compactador_cv import compactar_cv
+from documento_cv import DocumentoCV, obtener_documento
 import logging
 
 logger = logging.getLogger(__name__)
@@ -65,47 +67,98 @@ CATEGORIAS_SKILLS = {
     "metodologias": ["agile", "scrum", "devops", "ci/cd", "tdd"],
 }
 
+AUTOMATA_SKILLS = AutomataSkills(CATEGORIAS_SKILLS)
+
+
+def coincide_skill(requerida: str, skill: str) -> bool:
+    """Indica si una skill del CV cubre una skill requerida (ambas en minusculas)"""
+    return requerida in skill or skill in requerida
+
+
+JERARQUIA_MATCH = {
+    "junior": 1,
+    "semi-senior": 2,
+    "senior": 3,
+    "staff": 4,
+    "principal": 5,
+}
+
+
+def clasificar_match(porcentaje: float) -> str:
+    """Clasificacion del candidato segun su porcentaje de match"""
+    if porcentaje >= 80:
+        return "excelente"
+    elif porcentaje >= 60:
+        return "bueno"
+    elif porcentaje >= 40:
+        return "regular"
+    return "no_recomendado"
+
+
+def calcular_puntaje(
+    n_coincidentes: int,
+    n_requeridas: int,
+    nivel_est: str,
+    nivel_sol: str,
+    n_brechas: int,
+) -> dict:
+    """Formula de match local a partir de conteos de skills y niveles"""
+    match_tecnico = (n_coincidentes / n_requeridas * 100) if n_requeridas else 100
+    match_tecnico = min(match_tecnico, 100)
+
+    diff = abs(JERARQUIA_MATCH.get(nivel_est, 2) - JERARQUIA_MATCH.get(nivel_sol, 3))
+    match_seniority = 100 - (diff * 25)
+
+    penalizacion = min(n_brechas * 10, 50)
+    match_total = (match_tecnico * 0.7 + match_seniority * 0.3) - penalizacion
+    match_total = max(0, min(match_total, 100))
+
+    return {
+        "porcentaje_match": round(match_total, 1),
+        "match_tecnico": round(match_tecnico, 1),
+        "match_seniority": round(match_seniority, 1),
+        "clasificacion": clasificar_match(match_total),
+        "resumen": f"Match tecnico: {match_tecnico:.0f}%, Match seniority: {match_seniority:.0f}%",
+    }
+
 
 class AgenteAnalistaSkills(AgenteBase):
     """Agente especializado en extraer skills del CV"""
 
+    ENTRADAS = {"cv_texto": "cv_texto", "_documento": "_documento"}
+    SALIDAS = {"skills_tecnicas": []}
+
     def __init__(self, llm_client):
         super().__init__("AnalistaSkills", llm_client)
         self.prompt = PROMPTS["analista_skills"]
 
-    def ejecutar(self, input_data: dict) -> dict:
-        cv_texto = input_data.get("cv_texto", "")
+    def _construir_prompt(self, input_data: dict) -> str:
+        return self.prompt.user_template.format(cv_texto=input_data.get("cv_texto", ""))
 
-        if self.llm.disponible:
-            prompt_completo = self.prompt.user_template.format(cv_texto=cv_texto)
-            respuesta = self.llm.generate_json(prompt_completo)
-            return self._parsear_respuesta(respuesta, cv_texto)
+    def _procesar_respuesta(self, respuesta: dict, input_data: dict) -> dict:
+        return self._parsear_respuesta(respuesta, obtener_documento(input_data))
 
-        return self._extraer_local(cv_texto)
+    def _ejecutar_local(self, input_data: dict) -> dict:
+        return self._extraer_local(obtener_documento(input_data))
 
-    def _parsear_respuesta(self, respuesta: dict, cv_texto: str) -> dict:
+    def _parsear_respuesta(self, respuesta: dict, cv: DocumentoCV | str) -> dict:
+        experiencia = respuesta.get("experiencia_anios")
+        if experiencia is None:
+            experiencia = DocumentoCV.de(cv).experiencia_anios
         return {
             "skills_tecnicas": respuesta.get("skills_tecnicas", []),
             "skills_blandas": respuesta.get("skills_blandas", []),
-            "experiencia_anios": respuesta.get(
-                "experiencia_anios", self._extraer_experiencia(cv_texto)
-            ),
+            "experiencia_anios": experiencia,
             "nivel_autodetectado": respuesta.get("nivel_autodetectado", "senior"),
         }
 
-    def _extraer_local(self, cv_texto: str) -> dict:
-        cv_lower = cv_texto.lower()
-        skills_encontradas = []
-
-        for categoria, skills in CATEGORIAS_SKILLS.items():
-            for skill in skills:
-                if skill in cv_lower:
-                    skills_encontradas.append(skill)
-
-        experiencia = self._extraer_experiencia(cv_texto)
+    def _extraer_local(self, cv: DocumentoCV | str) -> dict:
+        documento = DocumentoCV.de(cv)
+        skills_encontradas = documento.skills(AUTOMATA_SKILLS)
+        experiencia = documento.experiencia_anios
 
         return {
-            "skills_tecnicas": list(set(skills_encontradas)),
+            "skills_tecnicas": skills_encontradas,
             "skills_blandas": [],
             "experiencia_anios": experiencia,
             "nivel_autodetectado": "senior"
@@ -115,43 +168,41 @@ class AgenteAnalistaSkills(AgenteBase):
             else "semi-senior",
         }
 
-    def _extraer_experiencia(self, texto: str) -> int:
-        patrones = [
-            r"(\d+)\+?\s*años?\s+de\s+experiencia",
-            r"(\d+)\+?\s*years?\s+experience",
-            r"experiencia:\s*(\d+)\s*años?",
-        ]
-        for patron in patrones:
-            match = re.search(patron, texto, re.IGNORECASE)
-            if match:
-                return int(match.group(1))
-        return 0
-
 
 class AgenteEvaluadorSeniority(AgenteBase):
     """Agente especializado en evaluar nivel de seniority"""
 
+    ENTRADAS = {
+        "cv_texto": "cv_texto",
+        "nivel_solicitado": "nivel_solicitado",
+        "experiencia_minima": "experiencia_minima",
+        "_documento": "_documento",
+    }
+    SALIDAS = {"seniority_estimado": "senior", "coherente": True}
+
     def __init__(self, llm_client):
         super().__init__("EvaluadorSeniority", llm_client)
         self.prompt = PROMPTS["evaluador_seniority"]
 
-    def ejecutar(self, input_data: dict) -> dict:
-        cv_texto = input_data.get("cv_texto", "")
-        nivel_solicitado = input_data.get("nivel_solicitado", "senior")
-        exp_minima = input_data.get("experiencia_minima", 0)
-
-        if self.llm.disponible:
-            prompt_completo = self.prompt.user_template.format(
-                cv_texto=cv_texto,
-                nivel_solicitado=nivel_solicitado,
-                exp_minima=exp_minima,
-            )
-            return self.llm.generate_json(prompt_completo)
+    def _construir_prompt(self, input_data: dict) -> str:
+        return self.prompt.user_template.format(
+            cv_texto=input_data.get("cv_texto", ""),
+            nivel_solicitado=input_data.get("nivel_solicitado", "senior"),
+            exp_minima=input_data.get("experiencia_minima", 0),
+        )
 
-        return self._evaluar_local(cv_texto, nivel_solicitado, exp_minima)
+    def _ejecutar_local(self, input_data: dict) -> dict:
+        return self._evaluar_local(
+            obtener_documento(input_data),
+            input_data.get("nivel_solicitado", "senior"),
+            input_data.get("experiencia_minima", 0),
+        )
 
-    def _evaluar_local(self, cv: str, nivel_sol: str, exp_min: int) -> dict:
-        experiencia = self._extraer_experiencia(cv)
+    def _evaluar_local(
+        self, cv: DocumentoCV | str, nivel_sol: str, exp_min: int
+    ) -> dict:
+        documento = DocumentoCV.de(cv)
+        experiencia = documento.experiencia_anios
 
         if experiencia <= 2:
             nivel = "junior"
@@ -179,28 +230,17 @@ class AgenteEvaluadorSeniority(AgenteBase):
             "experiencia_detectada": experiencia,
             "fundamento": f"Basado en {experiencia} anos de experiencia",
             "coherente": coherente,
-            "indicadores_encontrados": self._buscar_indicadores(cv),
+            "indicadores_encontrados": self._buscar_indicadores(documento),
         }
 
-    def _extraer_experiencia(self, texto: str) -> int:
-        import re
-
-        patrones = [r"(\d+)\+?\s*años?", r"(\d+)\+?\s*years?"]
-        for patron in patrones:
-            match = re.search(patron, texto, re.IGNORECASE)
-            if match:
-                return int(match.group(1))
-        return 0
-
-    def _buscar_indicadores(self, cv: str) -> list:
+    def _buscar_indicadores(self, documento: DocumentoCV) -> list:
         indicadores = []
-        cv_lower = cv.lower()
 
-        if "senior" in cv_lower or "sr" in cv_lower:
+        if documento.contiene("senior", "sr"):
             indicadores.append("senior")
-        if "lead" in cv_lower or "arquitecto" in cv_lower:
+        if documento.contiene("lead", "arquitecto"):
             indicadores.append("lead")
-        if "principal" in cv_lower or "staff" in cv_lower:
+        if documento.contiene("principal", "staff"):
             indicadores.append("staff")
 
         return indicadores
@@ -209,22 +249,32 @@ class AgenteEvaluadorSeniority(AgenteBase):
 class AgenteDetectorBrechas(AgenteBase):
     """Agente especializado en detectar brechas tecnicas"""
 
+    ENTRADAS = {
+        "skills_encontradas": "skills_tecnicas",
+        "stack_requerido": "stack_requerido",
+        "cv_texto": "cv_texto",
+        "_documento": "_documento",
+    }
+    SALIDAS = {"skills_coincidentes": [], "brechas_criticas": []}
+
     def __init__(self, llm_client):
         super().__init__("DetectorBrechas", llm_client)
         self.prompt = PROMPTS["detector_brechas"]
 
-    def ejecutar(self, input_data: dict) -> dict:
-        skills_encontradas = input_data.get("skills_encontradas", [])
-        stack_requerido = input_data.get("stack_requerido", [])
-
-        if self.llm.disponible:
-            prompt_completo = self.prompt.user_template.format(
-                cv_texto=input_data.get("cv_texto", "")[:2000],
-                stack_requerido=", ".join(stack_requerido),
-            )
-            return self.llm.generate_json(prompt_completo)
+    def _construir_prompt(self, input_data: dict) -> str:
+        return self.prompt.user_template.format(
+            cv_texto=compactar_cv(
+                obtener_documento(input_data),
+                terminos=input_data.get("stack_requerido", []),
+            ),
+            stack_requerido=", ".join(input_data.get("stack_requerido", [])),
+        )
 
-        return self._detectar_local(skills_encontradas, stack_requerido)
+    def _ejecutar_local(self, input_data: dict) -> dict:
+        return self._detectar_local(
+            input_data.get("skills_encontradas", []),
+            input_data.get("stack_requerido", []),
+        )
 
     def _detectar_local(self, skills_cv: list, requerido: list) -> dict:
         skills_cv_lower = [s.lower() for s in skills_cv]
@@ -236,7 +286,7 @@ class AgenteDetectorBrechas(AgenteBase):
             encontrado = False
             req_lower = req.lower()
             for skill in skills_cv_lower:
-                if req_lower in skill or skill in req_lower:
+                if coincide_skill(req_lower, skill):
                     skills_coincidentes.append(req)
                     encontrado = True
                     break
@@ -254,33 +304,35 @@ class AgenteDetectorBrechas(AgenteBase):
 class AgenteCalculadorMatch(AgenteBase):
     """Agente especializado en calcular porcentaje de match"""
 
+    ENTRADAS = {
+        "skills_encontradas": "skills_coincidentes",
+        "stack_requerido": "stack_requerido",
+        "seniority_estimado": "seniority_estimado",
+        "nivel_solicitado": "nivel_solicitado",
+        "brechas_criticas": "brechas_criticas",
+    }
+    SALIDAS = {"porcentaje_match": 0, "resumen": ""}
+
     def __init__(self, llm_client):
         super().__init__("CalculadorMatch", llm_client)
         self.prompt = PROMPTS["calculador_match"]
 
-    def ejecutar(self, input_data: dict) -> dict:
-        skills_encontradas = input_data.get("skills_encontradas", [])
-        stack_requerido = input_data.get("stack_requerido", [])
-        seniority_estimado = input_data.get("seniority_estimado", "semi-senior")
-        nivel_solicitado = input_data.get("nivel_solicitado", "senior")
-        brechas = input_data.get("brechas_criticas", [])
-
-        if self.llm.disponible:
-            prompt_completo = self.prompt.user_template.format(
-                skills_encontradas=", ".join(skills_encontradas),
-                stack_requerido=", ".join(stack_requerido),
-                seniority_estimado=seniority_estimado,
-                nivel_solicitado=nivel_solicitado,
-                brechas=", ".join(brechas),
-            )
-            return self.llm.generate_json(prompt_completo)
+    def _construir_prompt(self, input_data: dict) -> str:
+        return self.prompt.user_template.format(
+            skills_encontradas=", ".join(input_data.get("skills_encontradas", [])),
+            stack_requerido=", ".join(input_data.get("stack_requerido", [])),
+            seniority_estimado=input_data.get("seniority_estimado", "semi-senior"),
+            nivel_solicitado=input_data.get("nivel_solicitado", "senior"),
+            brechas=", ".join(input_data.get("brechas_criticas", [])),
+        )
 
+    def _ejecutar_local(self, input_data: dict) -> dict:
         return self._calcular_local(
-            skills_encontradas,
-            stack_requerido,
-            seniority_estimado,
-            nivel_solicitado,
-            brechas,
+            input_data.get("skills_encontradas", []),
+            input_data.get("stack_requerido", []),
+            input_data.get("seniority_estimado", "semi-senior"),
+            input_data.get("nivel_solicitado", "senior"),
+            input_data.get("brechas_criticas", []),
         )
 
     def _calcular_local(
@@ -291,37 +343,6 @@ class AgenteCalculadorMatch(AgenteBase):
         nivel_sol: str,
         brechas: list,
     ) -> dict:
-
-        match_tecnico = (len(skills_cv) / len(requerido) * 100) if requerido else 100
-        match_tecnico = min(match_tecnico, 100)
-
-        jerarquia = {
-            "junior": 1,
-            "semi-senior": 2,
-            "senior": 3,
-            "staff": 4,
-            "principal": 5,
-        }
-        diff = abs(jerarquia.get(nivel_est, 2) - jerarquia.get(nivel_sol, 3))
-        match_seniority = 100 - (diff * 25)
-
-        penalizacion = min(len(brechas) * 10, 50)
-        match_total = (match_tecnico * 0.7 + match_seniority * 0.3) - penalizacion
-        match_total = max(0, min(match_total, 100))
-
-        if match_total >= 80:
-            clasificacion = "excelente"
-        elif match_total >= 60:
-            clasificacion = "bueno"
-        elif match_total >= 40:
-            clasificacion = "regular"
-        else:
-            clasificacion = "no_recomendado"
-
-        return {
-            "porcentaje_match": round(match_total, 1),
-            "match_tecnico": round(match_tecnico, 1),
-            "match_seniority": round(match_seniority, 1),
-            "clasificacion": clasificacion,
-            "resumen": f"Match tecnico: {match_tecnico:.0f}%, Match seniority: {match_seniority:.0f}%",
-        }
+        return calcular_puntaje(
+            len(skills_cv), len(requerido), nivel_est, nivel_sol, len(brechas)
+        )
@@ -0,0 +1,145 @@
+"""
+Automata Aho-Corasick para detectar skills en un CV.
+
+Compila todo el vocabulario de skills una sola vez y recorre el texto en
+una unica pasada, devolviendo cada skill con su categoria y posicion.
+Solo acepta coincidencias delimitadas por limites de palabra, de modo que
+"r" o "go" no coinciden dentro de "react" o "google". "&" cuenta como
+parte de la palabra ("R&D" y "AT&T" no contienen la skill "r" ni "t").
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Iterable
+
+
+@dataclass(frozen=True)
+class CoincidenciaSkill:
+    skill: str
+    categoria: str
+    inicio: int
+    fin: int
+
+
+# Patrones mas cortos no admiten la "s" de plural: "gos" no es "go"
+_MIN_PLURAL = 3
+
+
+def _es_palabra(caracter: str) -> bool:
+    return caracter.isalnum() or caracter in "_&"
+
+
+class AutomataSkills:
+    """
+    Automata multi-patron construido a partir de {categoria: [skills]}.
+
+    Los patrones vacios se ignoran. Un patron puede pertenecer a varias
+    categorias. Se admite una "s" final de plural ("LLMs", "APIs") en los
+    patrones de al menos tres caracteres.
+    """
+
+    def __init__(self, categorias: dict[str, Iterable[str]]):
+        self._transiciones: list[dict[str, int]] = [{}]
+        self._fallo: list[int] = [0]
+        self._salidas: list[list[int]] = [[]]
+        self._patrones: list[str] = []
+        self._categorias: list[list[str]] = []
+
+        indice_patron: dict[str, int] = {}
+        for categoria, skills in categorias.items():
+            for skill in skills:
+                patron = skill.strip().lower()
+                if not patron:
+                    continue
+                if patron not in indice_patron:
+                    indice_patron[patron] = len(self._patrones)
+                    self._patrones.append(patron)
+                    self._categorias.append([])
+                    self._insertar(patron, indice_patron[patron])
+                categorias_patron = self._categorias[indice_patron[patron]]
+                if categoria not in categorias_patron:
+                    categorias_patron.append(categoria)
+
+        self._construir_fallos()
+
+    @property
+    def vocabulario(self) -> list[str]:
+        return list(self._patrones)
+
+    def _insertar(self, patron: str, indice: int):
+        estado = 0
+        for caracter in patron:
+            siguiente = self._transiciones[estado].get(caracter)
+            if siguiente is None:
+                siguiente = len(self._transiciones)
+                self._transiciones[estado][caracter] = siguiente
+                self._transiciones.append({})
+                self._fallo.append(0)
+                self._salidas.append([])
+            estado = siguiente
+        self._salidas[estado].append(indice)
+
+    def _construir_fallos(self):
+        cola = deque(self._transiciones[0].values())
+        while cola:
+            estado = cola.popleft()
+            for caracter, siguiente in self._transiciones[estado].items():
+                cola.append(siguiente)
+                fallo = self._fallo[estado]
+                while fallo and caracter not in self._transiciones[fallo]:
+                    fallo = self._fallo[fallo]
+                destino = self._transiciones[fallo].get(caracter, 0)
+                self._fallo[siguiente] = destino if destino != siguiente else 0
+                self._salidas[siguiente].extend(self._salidas[self._fallo[siguiente]])
+
+    def buscar(self, texto: str) -> list[CoincidenciaSkill]:
+        """Devuelve todas las coincidencias (en orden de aparicion)"""
+        texto_lower = texto.lower()
+        longitud = len(texto_lower)
+        transiciones = self._transiciones
+        fallo = self._fallo
+        salidas = self._salidas
+        coincidencias = []
+
+        estado = 0
+        for posicion, caracter in enumerate(texto_lower):
+            while estado and caracter not in transiciones[estado]:
+                estado = fallo[estado]
+            estado = transiciones[estado].get(caracter, 0)
+            if not salidas[estado]:
+                continue
+
+            for indice in salidas[estado]:
+                patron = self._patrones[indice]
+                inicio = posicion - len(patron) + 1
+                fin = posicion + 1
+                if inicio > 0 and _es_palabra(texto_lower[inicio - 1]) and _es_palabra(
+                    patron[0]
+                ):
+                    continue
+                if fin < longitud and _es_palabra(patron[-1]):
+                    if texto_lower[fin] == "s" and len(patron) >= _MIN_PLURAL and (
+                        fin + 1 == longitud or not _es_palabra(texto_lower[fin + 1])
+                    ):
+                        fin += 1
+                    elif _es_palabra(texto_lower[fin]):
+                        continue
+                for categoria in self._categorias[indice]:
+                    coincidencias.append(
+                        CoincidenciaSkill(patron, categoria, inicio, fin)
+                    )
+
+        return coincidencias
+
+    def extraer(self, texto: str) -> dict[str, list[str]]:
+        """Agrupa las skills encontradas por categoria, sin duplicados"""
+        por_categoria: dict[str, list[str]] = {}
+        for coincidencia in self.buscar(texto):
+            skills = por_categoria.setdefault(coincidencia.categoria, [])
+            if coincidencia.skill not in skills:
+                skills.append(coincidencia.skill)
+        return por_categoria
+
+    def skills(self, texto: str) -> list[str]:
+        """Lista de skills encontradas, sin duplicados y en orden de aparicion"""
+        return list(dict.fromkeys(c.skill for c in self.buscar(texto)))
@@ -0,0 +1,321 @@
+"""
+Benchmark reproducible del flujo de evaluacion.
+
+Genera casos a partir de TEMPLATES_CV y STACKS_REQUERIDOS (con semilla
+fija) y mide throughput y latencia extremo a extremo, y latencia por
+agente, para lotes de tamano creciente en modo local y en modo LLM
+simulado. Los resultados se escriben en JSON y pueden compararse con una
+linea base guardada:
+
+    python benchmark.py --salida bench.json
+    python benchmark.py --baseline bench.json --tolerancia 0.15
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from datetime import datetime
+from typing import Optional
+import argparse
+import json
+import logging
+import platform
+import random
+import sys
+import time
+
+from agente_coordinador import AgenteCoordinador, ConfiguracionEvaluacion
+from codec_resultados import codificar_lote, decodificar_lote
+from modelos import ResultadoCompleto
+from llm_simulado import DISTRIBUCIONES, ConfiguracionSimulacion
+from templates import EXPERIENCIA_MINIMA, NIVELES_DEFAULT, STACKS_REQUERIDOS, TEMPLATES_CV
+
+logger = logging.getLogger(__name__)
+
+MODOS = ("local", "simulado")
+TAMANOS_DEFAULT = (1, 10, 100, 1000)
+
+
+def generar_casos(n: int, semilla: int = 42) -> list[dict]:
+    """n casos (cv_texto, stack, nivel, experiencia) deterministas"""
+    rng = random.Random(semilla)
+    plantillas = list(TEMPLATES_CV.items())
+    puestos = list(STACKS_REQUERIDOS)
+    casos = []
+    for i in range(n):
+        _, cv = plantillas[i % len(plantillas)]
+        puesto = puestos[rng.randrange(len(puestos))]
+        casos.append(
+            {
+                "cv_texto": cv.replace("[X]", str(rng.randint(1, 12))),
+                "stack_requerido": STACKS_REQUERIDOS[puesto],
+                "nivel_solicitado": NIVELES_DEFAULT.get(puesto, "senior"),
+                "experiencia_minima": EXPERIENCIA_MINIMA.get(puesto, 0),
+            }
+        )
+    return casos
+
+
+def crear_coordinador(
+    modo: str, simulacion: ConfiguracionSimulacion
+) -> AgenteCoordinador:
+    coordinador = AgenteCoordinador(
+        ConfiguracionEvaluacion(
+            nivel_traza="compacto",
+            max_trazas_retenidas=16,
+            simulacion=simulacion if modo == "simulado" else None,
+        )
+    )
+    if modo == "simulado":
+        # Los casos se repiten entre lotes; se mide el backend, no el cache
+        coordinador.llm.cache = None
+    return coordinador
+
+
+def percentiles(valores: list[float]) -> dict:
+    """p50/p95/p99 por rango mas cercano, y media"""
+    if not valores:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "media": 0.0}
+    ordenados = sorted(valores)
+
+    def _p(q: float) -> float:
+        return ordenados[min(len(ordenados) - 1, max(0, round(q * len(ordenados)) - 1))]
+
+    return {
+        "p50": round(_p(0.50), 3),
+        "p95": round(_p(0.95), 3),
+        "p99": round(_p(0.99), 3),
+        "media": round(sum(ordenados) / len(ordenados), 3),
+    }
+
+
+def medir_lote(coordinador: AgenteCoordinador, casos: list[dict], workers: int) -> dict:
+    """Evalua los casos en un pool de hilos y devuelve las medidas"""
+    latencias: list[float] = []
+    por_agente: dict[str, list[float]] = {}
+
+    def _evaluar(caso: dict):
+        inicio = time.perf_counter()
+        resultado = coordinador.evaluar(**caso)
+        return (time.perf_counter() - inicio) * 1000, resultado
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for latencia, resultado in executor.map(_evaluar, casos):
+            latencias.append(latencia)
+            for traza in resultado.trazabilidad:
+                por_agente.setdefault(traza.agente, []).append(traza.duracion_ms)
+    total = time.perf_counter() - inicio
+
+    return {
+        "evaluaciones_por_segundo": round(len(casos) / total, 2) if total else 0.0,
+        "duracion_total_s": round(total, 4),
+        "latencia_ms": percentiles(latencias),
+        "agentes_ms": {a: percentiles(v) for a, v in sorted(por_agente.items())},
+    }
+
+
+def ejecutar_benchmark(
+    modos: tuple = MODOS,
+    tamanos: tuple = TAMANOS_DEFAULT,
+    workers: int = 4,
+    repeticiones: int = 3,
+    simulacion: Optional[ConfiguracionSimulacion] = None,
+    semilla: int = 42,
+) -> dict:
+    """
+    Ejecuta el benchmark completo.
+
+    Cada (modo, tamano) se repite `repeticiones` veces y se conserva la
+    repeticion con throughput mediano.
+    """
+    simulacion = simulacion or ConfiguracionSimulacion(
+        latencia_ms=50, distribucion="fija", semilla=semilla
+    )
+    resultados = []
+    for modo in modos:
+        coordinador = crear_coordinador(modo, simulacion)
+        medir_lote(coordinador, generar_casos(min(workers, 4), semilla), workers)
+
+        for tamano in tamanos:
+            casos = generar_casos(tamano, semilla)
+            medidas = sorted(
+                (medir_lote(coordinador, casos, workers) for _ in range(repeticiones)),
+                key=lambda m: m["evaluaciones_por_segundo"],
+            )
+            mediana = medidas[len(medidas) // 2]
+            resultados.append({"modo": modo, "tamano": tamano, **mediana})
+            logger.info(
+                f"{modo:>9} n={tamano:<6} "
+                f"{mediana['evaluaciones_por_segundo']:>10.1f} eval/s  "
+                f"p95={mediana['latencia_ms']['p95']:.2f}ms"
+            )
+
+    return {
+        "meta": {
+            "fecha": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "workers": workers,
+            "repeticiones": repeticiones,
+            "simulacion": asdict(simulacion),
+            "semilla": semilla,
+        },
+        "resultados": resultados,
+    }
+
+
+def medir_serializacion(n: int, semilla: int = 42) -> dict:
+    """
+    Compara to_json (indentado), JSON compacto y el codec binario.
+
+    Serializa n ResultadoCompleto con trazas compactas (el caso de archivo)
+    y mide microsegundos por resultado al codificar y decodificar, y bytes
+    por resultado.
+    """
+    coordinador = crear_coordinador("local", ConfiguracionSimulacion())
+    casos = generar_casos(min(n, 200), semilla)
+    base = [coordinador.evaluar(**caso) for caso in casos]
+    resultados = [base[i % len(base)] for i in range(n)]
+
+    def _medir(codificar, decodificar) -> dict:
+        inicio = time.perf_counter()
+        datos = codificar(resultados)
+        medio = time.perf_counter()
+        decodificados = decodificar(datos)
+        fin = time.perf_counter()
+        assert decodificados[-1] == resultados[-1]
+        tamano = len(datos) if isinstance(datos, bytes) else sum(map(len, datos))
+        return {
+            "bytes_por_resultado": round(tamano / n, 1),
+            "codificar_us": round((medio - inicio) / n * 1e6, 2),
+            "decodificar_us": round((fin - medio) / n * 1e6, 2),
+        }
+
+    formatos = {
+        "json_indentado": _medir(
+            lambda rs: [r.to_json().encode("utf-8") for r in rs],
+            lambda ds: [ResultadoCompleto.from_dict(json.loads(d)) for d in ds],
+        ),
+        "json_compacto": _medir(
+            lambda rs: "\n".join(
+                json.dumps(r.to_dict(), ensure_ascii=False, separators=(",", ":"))
+                for r in rs
+            ).encode("utf-8"),
+            lambda d: [
+                ResultadoCompleto.from_dict(json.loads(linea))
+                for linea in d.decode("utf-8").split("\n")
+            ],
+        ),
+        "binario": _medir(codificar_lote, decodificar_lote),
+    }
+    for nombre, medida in formatos.items():
+        logger.info(
+            f"{nombre:>15} {medida['bytes_por_resultado']:>8.1f} B/res  "
+            f"cod {medida['codificar_us']:>7.2f}us  dec {medida['decodificar_us']:>7.2f}us"
+        )
+    return {"resultados": n, "formatos": formatos}
+
+
+def comparar_con_baseline(
+    actual: dict, baseline: dict, tolerancia: float = 0.10
+) -> list[dict]:
+    """
+    Compara throughput y p95 por (modo, tamano) con la linea base.
+
+    Returns:
+        Una fila por caso comun, con las razones actual/baseline y la
+        marca "regresion" si alguna empeora mas que la tolerancia.
+    """
+    base = {(r["modo"], r["tamano"]): r for r in baseline.get("resultados", [])}
+    filas = []
+    for r in actual["resultados"]:
+        previo = base.get((r["modo"], r["tamano"]))
+        if previo is None:
+            continue
+        razon_throughput = r["evaluaciones_por_segundo"] / max(
+            previo["evaluaciones_por_segundo"], 1e-9
+        )
+        razon_p95 = r["latencia_ms"]["p95"] / max(previo["latencia_ms"]["p95"], 1e-9)
+        filas.append(
+            {
+                "modo": r["modo"],
+                "tamano": r["tamano"],
+                "razon_throughput": round(razon_throughput, 3),
+                "razon_p95": round(razon_p95, 3),
+                "regresion": razon_throughput < 1 - tolerancia
+                or razon_p95 > 1 + tolerancia,
+            }
+        )
+    return filas
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark del evaluador de CVs")
+    parser.add_argument("--modos", nargs="+", choices=MODOS, default=list(MODOS))
+    parser.add_argument(
+        "--tamanos", nargs="+", type=int, default=list(TAMANOS_DEFAULT)
+    )
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--latencia-ms", type=float, default=50)
+    parser.add_argument("--distribucion", choices=DISTRIBUCIONES, default="fija")
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--tasa-error", type=float, default=0.0)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument(
+        "--n-serializacion",
+        type=int,
+        default=10000,
+        help="Resultados para el benchmark de serializacion (0 lo omite)",
+    )
+    parser.add_argument("--salida", default="benchmark_resultados.json")
+    parser.add_argument("--baseline", help="JSON de una ejecucion anterior")
+    parser.add_argument("--tolerancia", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    for nombre in ("agente_base", "agente_coordinador", "llm_client"):
+        logging.getLogger(nombre).setLevel(logging.WARNING)
+
+    resultado = ejecutar_benchmark(
+        modos=tuple(args.modos),
+        tamanos=tuple(args.tamanos),
+        workers=args.workers,
+        repeticiones=args.repeticiones,
+        simulacion=ConfiguracionSimulacion(
+            latencia_ms=args.latencia_ms,
+            distribucion=args.distribucion,
+            jitter_ms=args.jitter_ms,
+            tasa_error=args.tasa_error,
+            semilla=args.semilla,
+        ),
+        semilla=args.semilla,
+    )
+    if args.n_serializacion > 0:
+        resultado["serializacion"] = medir_serializacion(
+            args.n_serializacion, args.semilla
+        )
+
+    codigo = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            comparacion = comparar_con_baseline(resultado, json.load(f), args.tolerancia)
+        resultado["comparacion"] = comparacion
+        for fila in comparacion:
+            marca = "REGRESION" if fila["regresion"] else "ok"
+            logger.info(
+                f"{fila['modo']:>9} n={fila['tamano']:<6} "
+                f"throughput x{fila['razon_throughput']:.2f}  "
+                f"p95 x{fila['razon_p95']:.2f}  {marca}"
+            )
+        if any(fila["regresion"] for fila in comparacion):
+            codigo = 1
+
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False)
+    logger.info(f"Resultados guardados en {args.salida}")
+    return codigo
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Presupuesto de tiempo de arranque en frio.
+
+Lanza procesos nuevos que importan main y evaluan un CV en modo fallback
+(sin API key), descuenta el arranque del interprete y falla si el tiempo
+supera el presupuesto o si se ha cargado alguna dependencia pesada que
+solo deberia usarse con LLM:
+
+    python benchmark_arranque.py --presupuesto-ms 150 --detalle
+"""
+
+from typing import Optional
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+PRESUPUESTO_MS = 150
+PROHIBIDOS = (
+    "langchain",
+    "langchain_openai",
+    "langchain_core",
+    "openai",
+    "pandas",
+    "numpy",
+)
+
+_DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+_CODIGO_ARRANQUE = f"""
+import json, sys
+import main
+main.evaluar_cv("Python developer, 5 anos de experiencia", ["Python"], "senior")
+print(json.dumps(sorted(m for m in {PROHIBIDOS!r} if m in sys.modules)))
+"""
+
+
+def _ejecutar(argumentos: list[str]) -> tuple[float, subprocess.CompletedProcess]:
+    inicio = time.perf_counter()
+    proceso = subprocess.run(
+        [sys.executable, *argumentos],
+        cwd=_DIRECTORIO,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "OPENAI_API_KEY": ""},
+    )
+    duracion = (time.perf_counter() - inicio) * 1000
+    if proceso.returncode != 0:
+        raise RuntimeError(proceso.stderr.strip())
+    return duracion, proceso
+
+
+def medir_arranque(repeticiones: int = 5) -> dict:
+    """Mejor tiempo (ms) del arranque completo y del interprete vacio"""
+    interprete = min(_ejecutar(["-c", "pass"])[0] for _ in range(repeticiones))
+    tiempos = []
+    cargados: list[str] = []
+    for _ in range(repeticiones):
+        duracion, proceso = _ejecutar(["-c", _CODIGO_ARRANQUE])
+        tiempos.append(duracion)
+        cargados = json.loads(proceso.stdout.strip().splitlines()[-1])
+    return {
+        "interprete_ms": round(interprete, 1),
+        "total_ms": round(min(tiempos), 1),
+        "arranque_ms": round(min(tiempos) - interprete, 1),
+        "dependencias_pesadas": cargados,
+    }
+
+
+def modulos_mas_lentos(n: int = 10) -> list[tuple[str, int]]:
+    """Modulos con mas tiempo propio de importacion (us), via -X importtime"""
+    _, proceso = _ejecutar(["-X", "importtime", "-c", "import main"])
+    tiempos = []
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:") or "self [us]" in linea:
+            continue
+        propio, _, nombre = linea[len("import time:") :].split("|")
+        tiempos.append((nombre.strip(), int(propio)))
+    return sorted(tiempos, key=lambda t: t[1], reverse=True)[:n]
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Presupuesto de arranque en frio")
+    parser.add_argument("--presupuesto-ms", type=float, default=PRESUPUESTO_MS)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--detalle", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    medida = medir_arranque(args.repeticiones)
+    logger.info(
+        f"Arranque de main en modo fallback: {medida['arranque_ms']:.1f}ms "
+        f"(interprete {medida['interprete_ms']:.1f}ms, "
+        f"presupuesto {args.presupuesto_ms:.0f}ms)"
+    )
+    if args.detalle:
+        for nombre, propio in modulos_mas_lentos():
+            logger.info(f"  {propio / 1000:>7.1f}ms  {nombre}")
+
+    codigo = 0
+    if medida["dependencias_pesadas"]:
+        logger.error(f"Dependencias cargadas sin LLM: {medida['dependencias_pesadas']}")
+        codigo = 1
+    if medida["arranque_ms"] > args.presupuesto_ms:
+        logger.error("Presupuesto de arranque superado")
+        codigo = 1
+    return codigo
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+Representacion de skills como bitsets empaquetados con NumPy.
+
+Cada skill del vocabulario recibe un id entero; los skills de un CV se
+guardan como una fila de bits empaquetada en palabras uint64 y un lote
+de CVs como una matriz (N, palabras). La cobertura del stack requerido,
+las brechas y el match tecnico salen de operaciones AND sobre la matriz
+completa, sin bucles Python por CV.
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+from agentes_especializados import (
+    AUTOMATA_SKILLS,
+    JERARQUIA_MATCH,
+    calcular_puntaje,
+    coincide_skill,
+)
+
+
+class VocabularioSkills:
+    """Asigna un id entero a cada skill (en minusculas)"""
+
+    def __init__(self, skills: Iterable[str]):
+        self._ids: dict[str, int] = {}
+        self._skills: list[str] = []
+        for skill in skills:
+            skill = skill.strip().lower()
+            if skill and skill not in self._ids:
+                self._ids[skill] = len(self._skills)
+                self._skills.append(skill)
+
+    @classmethod
+    def por_defecto(cls, extra: Iterable[str] = ()) -> "VocabularioSkills":
+        """Vocabulario del automata de skills mas skills adicionales (p.ej. del LLM)"""
+        return cls([*AUTOMATA_SKILLS.vocabulario, *extra])
+
+    @property
+    def skills(self) -> list[str]:
+        return list(self._skills)
+
+    @property
+    def n_palabras(self) -> int:
+        return max(1, (len(self._skills) + 63) // 64)
+
+    def id_de(self, skill: str) -> Optional[int]:
+        return self._ids.get(skill.strip().lower())
+
+    def __len__(self) -> int:
+        return len(self._skills)
+
+    def codificar(self, skills: Iterable[str]) -> np.ndarray:
+        """Bitset (uint64, n_palabras) de una lista de skills; ignora las desconocidas"""
+        return self.codificar_lote([skills])[0]
+
+    def codificar_lote(self, listas: Sequence[Iterable[str]]) -> np.ndarray:
+        """Matriz de bitsets (N, n_palabras) para N listas de skills"""
+        filas, columnas = [], []
+        for fila, skills in enumerate(listas):
+            for skill in skills:
+                skill_id = self.id_de(skill)
+                if skill_id is not None:
+                    filas.append(fila)
+                    columnas.append(skill_id)
+
+        bits = np.zeros((len(listas), self.n_palabras * 64), dtype=bool)
+        bits[filas, columnas] = True
+        return np.packbits(bits, axis=1).view(np.uint64)
+
+    def mascara_requerida(self, requerida: str) -> np.ndarray:
+        """Bitset de las skills del vocabulario que cubren una skill requerida"""
+        requerida_lower = requerida.lower()
+        return self.codificar(
+            s for s in self._skills if coincide_skill(requerida_lower, s)
+        )
+
+
+@dataclass
+class StackCompilado:
+    """Stack requerido compilado a una mascara de bits por skill requerida"""
+
+    requeridas: list[str]
+    mascaras: np.ndarray
+
+    @classmethod
+    def compilar(
+        cls, vocabulario: VocabularioSkills, stack_requerido: Sequence[str]
+    ) -> "StackCompilado":
+        mascaras = np.zeros(
+            (len(stack_requerido), vocabulario.n_palabras), dtype=np.uint64
+        )
+        for i, requerida in enumerate(stack_requerido):
+            mascaras[i] = vocabulario.mascara_requerida(requerida)
+        return cls(requeridas=list(stack_requerido), mascaras=mascaras)
+
+    def cobertura(self, matriz_cv: np.ndarray) -> np.ndarray:
+        """Matriz booleana (N, K): True si el CV i cubre la skill requerida k"""
+        cubre = np.zeros((matriz_cv.shape[0], len(self.requeridas)), dtype=bool)
+        for palabra in range(self.mascaras.shape[1]):
+            cubre |= (matriz_cv[:, palabra, None] & self.mascaras[None, :, palabra]) != 0
+        return cubre
+
+    def brechas(self, cubre: np.ndarray) -> list[list[str]]:
+        """Skills requeridas no cubiertas por cada CV, en el orden del stack"""
+        return [
+            [req for req, cubierta in zip(self.requeridas, fila) if not cubierta]
+            for fila in cubre
+        ]
+
+
+def codificar_niveles(niveles: Sequence[str]) -> np.ndarray:
+    """Valores de jerarquia (1-5) de cada nivel; desconocido = semi-senior"""
+    return np.fromiter(
+        (JERARQUIA_MATCH.get(nivel, 2) for nivel in niveles),
+        dtype=np.int8,
+        count=len(niveles),
+    )
+
+
+def tabla_puntajes(n_requeridas: int, nivel_solicitado: str) -> dict[str, np.ndarray]:
+    """
+    Precalcula calcular_puntaje para cada (skills cubiertas, nivel estimado).
+
+    Indices: [cubiertas (0..K), valor de jerarquia - 1 (0..4)]. Usar la
+    formula escalar garantiza los mismos redondeos y clasificacion que
+    AgenteCalculadorMatch._calcular_local.
+    """
+    niveles = sorted(JERARQUIA_MATCH, key=JERARQUIA_MATCH.get)
+    forma = (n_requeridas + 1, len(niveles))
+    tabla = {
+        "porcentaje_match": np.zeros(forma),
+        "match_tecnico": np.zeros(forma),
+        "match_seniority": np.zeros(forma),
+        "clasificacion": np.empty(forma, dtype=object),
+    }
+    for cubiertas in range(n_requeridas + 1):
+        for j, nivel in enumerate(niveles):
+            puntaje = calcular_puntaje(
+                cubiertas,
+                n_requeridas,
+                nivel,
+                nivel_solicitado,
+                n_requeridas - cubiertas,
+            )
+            for clave in tabla:
+                tabla[clave][cubiertas, j] = puntaje[clave]
+    return tabla
+
+
+def puntuar_lote(
+    matriz_cv: np.ndarray,
+    niveles_cv: np.ndarray,
+    stack: StackCompilado,
+    nivel_solicitado: str,
+) -> dict[str, np.ndarray]:
+    """
+    Puntua N CVs contra un stack en modo local.
+
+    Args:
+        matriz_cv: Bitsets de skills de los CVs (N, n_palabras)
+        niveles_cv: Valores de jerarquia de cada CV (ver codificar_niveles)
+        stack: Stack requerido compilado con el mismo vocabulario
+        nivel_solicitado: Nivel requerido por el puesto
+
+    Returns:
+        Arrays de longitud N con skills cubiertas, brechas, match tecnico,
+        match seniority, porcentaje de match y clasificacion; mas la matriz
+        de cobertura (N, K) en "cobertura".
+    """
+    cubre = stack.cobertura(matriz_cv)
+    cubiertas = cubre.sum(axis=1)
+    n_requeridas = len(stack.requeridas)
+    tabla = tabla_puntajes(n_requeridas, nivel_solicitado)
+    columna = niveles_cv.astype(np.intp) - 1
+
+    return {
+        "cobertura": cubre,
+        "skills_cubiertas": cubiertas,
+        "n_brechas": n_requeridas - cubiertas,
+        "match_tecnico": tabla["match_tecnico"][cubiertas, columna],
+        "match_seniority": tabla["match_seniority"][cubiertas, columna],
+        "porcentaje_match": tabla["porcentaje_match"][cubiertas, columna],
+        "clasificacion": tabla["clasificacion"][cubiertas, columna],
+    }
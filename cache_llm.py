@@ -0,0 +1,181 @@
+"""
+Cache de respuestas LLM direccionado por contenido.
+
+La clave es el hash de (modelo, temperatura, prompt). Hay dos niveles:
+un LRU en memoria y, opcionalmente, una tabla SQLite en disco con TTL y
+expulsion por tamano. Ambos niveles son seguros entre hilos.
+"""
+
+from collections import OrderedDict
+from typing import Optional
+import hashlib
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CacheRespuestasLLM:
+    """
+    Cache de dos niveles para respuestas del LLM.
+
+    Args:
+        max_memoria: Entradas maximas del LRU en memoria
+        ttl_segundos: Vida maxima de una respuesta (None para no expirar)
+        ruta_sqlite: Ruta del fichero SQLite; None desactiva el nivel en disco
+        max_entradas_disco: Entradas maximas en disco antes de expulsar
+            las mas antiguas
+    """
+
+    def __init__(
+        self,
+        max_memoria: int = 1024,
+        ttl_segundos: Optional[float] = 7 * 24 * 3600,
+        ruta_sqlite: Optional[str] = None,
+        max_entradas_disco: int = 100_000,
+    ):
+        self.max_memoria = max_memoria
+        self.ttl_segundos = ttl_segundos
+        self.max_entradas_disco = max_entradas_disco
+        self._memoria: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conexion = None
+        self._escrituras_desde_poda = 0
+        self.contadores = {
+            "hits_memoria": 0,
+            "hits_disco": 0,
+            "misses": 0,
+            "escrituras": 0,
+            "expulsiones": 0,
+        }
+        if ruta_sqlite:
+            self.activar_disco(ruta_sqlite)
+
+    @staticmethod
+    def clave(modelo: str, temperatura: float, prompt: str) -> str:
+        contenido = f"{modelo}\x00{temperatura!r}\x00{prompt}"
+        return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+    def activar_disco(self, ruta_sqlite: str):
+        """Activa (o cambia) el nivel persistente en SQLite"""
+        import sqlite3
+
+        conexion = sqlite3.connect(ruta_sqlite, check_same_thread=False)
+        conexion.execute("PRAGMA journal_mode=WAL")
+        conexion.execute(
+            "CREATE TABLE IF NOT EXISTS respuestas ("
+            "clave TEXT PRIMARY KEY, respuesta TEXT NOT NULL, creado REAL NOT NULL)"
+        )
+        conexion.execute(
+            "CREATE INDEX IF NOT EXISTS idx_respuestas_creado ON respuestas(creado)"
+        )
+        conexion.commit()
+        with self._lock:
+            if self._conexion is not None:
+                self._conexion.close()
+            self._conexion = conexion
+        logger.info(f"Cache LLM en disco: {ruta_sqlite}")
+
+    def _vigente(self, creado: float, ahora: float) -> bool:
+        return self.ttl_segundos is None or ahora - creado <= self.ttl_segundos
+
+    def obtener(self, clave: str) -> Optional[str]:
+        """Devuelve la respuesta guardada o None si no existe o expiro"""
+        ahora = time.time()
+        with self._lock:
+            entrada = self._memoria.get(clave)
+            if entrada is not None:
+                respuesta, creado = entrada
+                if self._vigente(creado, ahora):
+                    self._memoria.move_to_end(clave)
+                    self.contadores["hits_memoria"] += 1
+                    return respuesta
+                del self._memoria[clave]
+
+            if self._conexion is not None:
+                fila = self._conexion.execute(
+                    "SELECT respuesta, creado FROM respuestas WHERE clave = ?",
+                    (clave,),
+                ).fetchone()
+                if fila is not None:
+                    respuesta, creado = fila
+                    if self._vigente(creado, ahora):
+                        self._guardar_memoria(clave, respuesta, creado)
+                        self.contadores["hits_disco"] += 1
+                        return respuesta
+                    self._conexion.execute(
+                        "DELETE FROM respuestas WHERE clave = ?", (clave,)
+                    )
+                    self._conexion.commit()
+
+            self.contadores["misses"] += 1
+            return None
+
+    def guardar(self, clave: str, respuesta: str):
+        """Guarda una respuesta en ambos niveles"""
+        ahora = time.time()
+        with self._lock:
+            self._guardar_memoria(clave, respuesta, ahora)
+            self.contadores["escrituras"] += 1
+            if self._conexion is None:
+                return
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO respuestas (clave, respuesta, creado) "
+                "VALUES (?, ?, ?)",
+                (clave, respuesta, ahora),
+            )
+            self._conexion.commit()
+            self._escrituras_desde_poda += 1
+            if self._escrituras_desde_poda >= max(1, self.max_entradas_disco // 100):
+                self._podar_disco(ahora)
+
+    def _guardar_memoria(self, clave: str, respuesta: str, creado: float):
+        self._memoria[clave] = (respuesta, creado)
+        self._memoria.move_to_end(clave)
+        while len(self._memoria) > self.max_memoria:
+            self._memoria.popitem(last=False)
+            self.contadores["expulsiones"] += 1
+
+    def _podar_disco(self, ahora: float):
+        """Elimina entradas expiradas y las mas antiguas por encima del limite"""
+        self._escrituras_desde_poda = 0
+        if self.ttl_segundos is not None:
+            self._conexion.execute(
+                "DELETE FROM respuestas WHERE creado < ?", (ahora - self.ttl_segundos,)
+            )
+        (total,) = self._conexion.execute("SELECT COUNT(*) FROM respuestas").fetchone()
+        exceso = total - self.max_entradas_disco
+        if exceso > 0:
+            self._conexion.execute(
+                "DELETE FROM respuestas WHERE clave IN ("
+                "SELECT clave FROM respuestas ORDER BY creado LIMIT ?)",
+                (exceso,),
+            )
+            self.contadores["expulsiones"] += exceso
+        self._conexion.commit()
+
+    def limpiar(self):
+        """Vacia ambos niveles"""
+        with self._lock:
+            self._memoria.clear()
+            if self._conexion is not None:
+                self._conexion.execute("DELETE FROM respuestas")
+                self._conexion.commit()
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            consultas = (
+                self.contadores["hits_memoria"]
+                + self.contadores["hits_disco"]
+                + self.contadores["misses"]
+            )
+            aciertos = self.contadores["hits_memoria"] + self.contadores["hits_disco"]
+            return {
+                **self.contadores,
+                "entradas_memoria": len(self._memoria),
+                "tasa_acierto": round(aciertos / consultas, 4) if consultas else 0.0,
+            }
+
+
+CACHE_LLM = CacheRespuestasLLM()
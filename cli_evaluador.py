@@ -0,0 +1,299 @@
+"""
+Evaluacion masiva de CVs desde la linea de comandos.
+
+Lee los CVs de un directorio (un fichero .txt/.md por candidato) o de un
+JSONL ({"id": ..., "cv": ...} por linea), los evalua contra un puesto
+definido por un perfil de templates.py o por un JSON, y va escribiendo
+los resultados en JSONL o CSV a medida que terminan:
+
+    python cli_evaluador.py cvs/ --perfil backend_developer --salida out.csv
+    python cli_evaluador.py cvs.jsonl --puesto puesto.json --workers 16
+
+El progreso y el throughput se muestran por stderr.
+"""
+
+from typing import Iterator, Optional
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import time
+
+from agente_coordinador import AgenteCoordinador, ConfiguracionEvaluacion
+from agentes_especializados import clasificar_match
+from escritor_jsonl import EscritorJSONL, leer_jsonl
+from main import iterar_evaluaciones, requisitos_desde_dict
+from modelos import RequisitosPuesto, ResultadoCompleto
+from templates import STACKS_REQUERIDOS
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONES_CV = (".txt", ".md")
+CAMPOS_TEXTO = ("cv", "cv_texto", "texto")
+COLUMNAS_CSV = [
+    "cv_id",
+    "porcentaje_match",
+    "clasificacion",
+    "seniority_estimado",
+    "nivel_coherente",
+    "skills_encontradas",
+    "skills_faltantes",
+    "brechas_tecnicas",
+    "resumen_evaluacion",
+    "metodo",
+    "timestamp",
+]
+
+
+def leer_cvs(entrada: str) -> Iterator[tuple[str, str]]:
+    """
+    Itera pares (cv_id, texto) de un directorio o de un JSONL.
+
+    En un directorio, el id es el nombre del fichero. En un JSONL, el id es
+    el campo "id" (o el numero de linea) y el texto el primer campo de
+    CAMPOS_TEXTO presente; las lineas que no son un objeto o no tienen
+    texto se omiten con un aviso.
+    """
+    if os.path.isdir(entrada):
+        for nombre in sorted(os.listdir(entrada)):
+            ruta = os.path.join(entrada, nombre)
+            if nombre.lower().endswith(EXTENSIONES_CV) and os.path.isfile(ruta):
+                with open(ruta, encoding="utf-8", errors="replace") as f:
+                    yield nombre, f.read()
+        return
+
+    for numero, datos in enumerate(leer_jsonl(entrada), 1):
+        if not isinstance(datos, dict):
+            logger.warning(f"Linea {numero} no es un objeto JSON, se omite")
+            continue
+        texto = next(
+            (v for v in map(datos.get, CAMPOS_TEXTO) if v and isinstance(v, str)),
+            None,
+        )
+        if texto is None:
+            logger.warning(f"Linea {numero} sin texto de CV, se omite")
+            continue
+        yield str(datos.get("id", numero)), texto
+
+
+def contar_cvs(entrada: str) -> Optional[int]:
+    """Total de CVs de un directorio; None para JSONL (no se lee dos veces)"""
+    if not os.path.isdir(entrada):
+        return None
+    return sum(
+        1
+        for nombre in os.listdir(entrada)
+        if nombre.lower().endswith(EXTENSIONES_CV)
+        and os.path.isfile(os.path.join(entrada, nombre))
+    )
+
+
+def cargar_puesto(
+    perfil: Optional[str] = None, ruta_puesto: Optional[str] = None
+) -> RequisitosPuesto:
+    """
+    Requisitos del puesto desde un perfil de templates.py y/o un JSON.
+
+    El JSON admite las claves de requisitos_desde_dict; si se indica
+    tambien un perfil, el JSON solo sobrescribe las claves presentes.
+    """
+    if perfil is None and ruta_puesto is None:
+        raise ValueError("Indica un perfil o un JSON de puesto")
+
+    datos: dict = {}
+    if ruta_puesto is not None:
+        with open(ruta_puesto, encoding="utf-8") as f:
+            datos = json.load(f)
+    if perfil is not None:
+        datos["perfil"] = perfil
+    return requisitos_desde_dict(datos)
+
+
+class EscritorCSV:
+    """Escritor CSV con la misma interfaz que EscritorJSONL (una fila por CV)"""
+
+    def __init__(self, ruta: str, lote_flush: int = 100):
+        self.ruta = ruta
+        self.lote_flush = max(1, lote_flush)
+        self._fichero = open(ruta, "w", encoding="utf-8", newline="")
+        self._csv = csv.DictWriter(self._fichero, fieldnames=COLUMNAS_CSV)
+        self._csv.writeheader()
+        self.lineas_escritas = 0
+
+    def escribir(self, resultado: ResultadoCompleto, cv_id: str = ""):
+        r = resultado.resultado
+        self._csv.writerow(
+            {
+                "cv_id": cv_id,
+                "porcentaje_match": r.porcentaje_match,
+                "clasificacion": clasificar_match(r.porcentaje_match),
+                "seniority_estimado": r.seniority_estimado,
+                "nivel_coherente": r.nivel_coherente,
+                "skills_encontradas": "; ".join(r.skills_encontradas),
+                "skills_faltantes": "; ".join(r.skills_faltantes),
+                "brechas_tecnicas": "; ".join(r.brechas_tecnicas),
+                "resumen_evaluacion": r.resumen_evaluacion,
+                "metodo": resultado.metodo,
+                "timestamp": resultado.timestamp,
+            }
+        )
+        self.lineas_escritas += 1
+        if self.lineas_escritas % self.lote_flush == 0:
+            self._fichero.flush()
+
+    def cerrar(self):
+        if not self._fichero.closed:
+            self._fichero.close()
+            logger.info(f"{self.lineas_escritas} resultados escritos en {self.ruta}")
+
+    def __enter__(self) -> "EscritorCSV":
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+class Progreso:
+    """Linea de progreso en stderr, como mucho una vez por intervalo"""
+
+    def __init__(self, total: Optional[int] = None, intervalo_s: float = 1.0):
+        self.total = total
+        self.intervalo_s = intervalo_s
+        self.hechos = 0
+        self.errores = 0
+        self.inicio = time.perf_counter()
+        self._ultimo = self.inicio
+        self._tty = sys.stderr.isatty()
+
+    def avanzar(self, error: bool = False):
+        self.hechos += 1
+        self.errores += error
+        ahora = time.perf_counter()
+        if ahora - self._ultimo >= self.intervalo_s:
+            self._ultimo = ahora
+            self._mostrar(ahora, final=False)
+
+    def terminar(self) -> dict:
+        ahora = time.perf_counter()
+        self._mostrar(ahora, final=True)
+        duracion = ahora - self.inicio
+        return {
+            "evaluados": self.hechos,
+            "errores": self.errores,
+            "duracion_s": round(duracion, 3),
+            "cvs_por_segundo": round(self.hechos / duracion, 2) if duracion else 0.0,
+        }
+
+    def _mostrar(self, ahora: float, final: bool):
+        duracion = ahora - self.inicio
+        ritmo = self.hechos / duracion if duracion else 0.0
+        avance = f"{self.hechos}/{self.total}" if self.total else f"{self.hechos}"
+        linea = (
+            f"{avance} CVs  {ritmo:.1f} CV/s  {self.errores} errores  {duracion:.1f}s"
+        )
+        if self._tty:
+            sys.stderr.write(f"\r{linea}" + ("\n" if final else ""))
+        else:
+            sys.stderr.write(linea + "\n")
+        sys.stderr.flush()
+
+
+def evaluar_masivo(
+    entrada: str,
+    salida: str,
+    puesto: RequisitosPuesto,
+    workers: int = 4,
+    formato: Optional[str] = None,
+    api_key: Optional[str] = None,
+    modelo: str = "gpt-4",
+    modo_fusionado: bool = False,
+    incluir_trazabilidad: bool = False,
+    intervalo_progreso_s: float = 1.0,
+) -> dict:
+    """
+    Evalua todos los CVs de `entrada` y escribe los resultados en `salida`.
+
+    El formato (jsonl o csv) se deduce de la extension de `salida` si no
+    se indica. Devuelve el resumen de la ejecucion (evaluados, errores,
+    duracion y CVs por segundo).
+    """
+    formato = formato or ("csv" if salida.lower().endswith(".csv") else "jsonl")
+    coordinador = AgenteCoordinador(
+        ConfiguracionEvaluacion(
+            api_key=api_key,
+            modelo=modelo,
+            usar_langchain=api_key is not None,
+            modo_fusionado=modo_fusionado,
+            nivel_traza="completo" if incluir_trazabilidad else "compacto",
+            max_trazas_retenidas=16,
+        )
+    )
+    if formato == "csv":
+        escritor = EscritorCSV(salida)
+    else:
+        escritor = EscritorJSONL(salida, incluir_trazabilidad=incluir_trazabilidad)
+
+    progreso = Progreso(contar_cvs(entrada), intervalo_progreso_s)
+    with escritor:
+        for cv_id, resultado in iterar_evaluaciones(
+            coordinador,
+            leer_cvs(entrada),
+            puesto.stack_tecnico,
+            puesto.nivel_solicitado,
+            puesto.experiencia_minima_anios,
+            puesto.habilidades_blandas,
+            workers,
+        ):
+            escritor.escribir(resultado, cv_id=cv_id)
+            progreso.avanzar(error=resultado.metodo == "error")
+    return progreso.terminar()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Evaluacion masiva de CVs")
+    parser.add_argument("entrada", help="Directorio de CVs (.txt/.md) o fichero JSONL")
+    puesto = parser.add_argument_group("puesto (al menos uno)")
+    puesto.add_argument("--perfil", choices=sorted(STACKS_REQUERIDOS))
+    puesto.add_argument("--puesto", help="JSON con stack_requerido, nivel_solicitado...")
+    parser.add_argument("--salida", default="resultados.jsonl")
+    parser.add_argument("--formato", choices=("jsonl", "csv"))
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--api-key", default=os.environ.get("OPENAI_API_KEY") or None)
+    parser.add_argument("--modelo", default="gpt-4")
+    parser.add_argument("--modo-fusionado", action="store_true")
+    parser.add_argument(
+        "--trazabilidad", action="store_true", help="Incluye trazas completas (JSONL)"
+    )
+    parser.add_argument("--intervalo-progreso", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    for nombre in ("agente_base", "agente_coordinador", "llm_client"):
+        logging.getLogger(nombre).setLevel(logging.WARNING)
+
+    if not os.path.exists(args.entrada):
+        parser.error(f"No existe la entrada: {args.entrada}")
+    try:
+        requisitos = cargar_puesto(args.perfil, args.puesto)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    resumen = evaluar_masivo(
+        args.entrada,
+        args.salida,
+        requisitos,
+        workers=args.workers,
+        formato=args.formato,
+        api_key=args.api_key,
+        modelo=args.modelo,
+        modo_fusionado=args.modo_fusionado,
+        incluir_trazabilidad=args.trazabilidad,
+        intervalo_progreso_s=args.intervalo_progreso,
+    )
+    return 1 if resumen["evaluados"] and resumen["errores"] == resumen["evaluados"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
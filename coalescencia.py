@@ -0,0 +1,121 @@
+"""
+Coalescencia de trabajo identico en vuelo ("single flight").
+
+Mientras una operacion con una clave esta en curso, las siguientes
+peticiones con la misma clave no la repiten: esperan el futuro de la
+primera (la lider) y reciben su mismo resultado o excepcion. La entrada
+se borra al terminar la lider, de modo que no es un cache: solo agrupa
+peticiones simultaneas.
+
+Lideres y seguidores pueden ser hilos o tareas asyncio indistintamente.
+Si la lider es cancelada (p.ej. por un timeout de su llamador), sus
+seguidores no heredan la cancelacion: uno de ellos pasa a ser lider.
+"""
+
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Hashable
+import hashlib
+import threading
+
+from metricas import METRICAS
+
+
+class _LiderCancelada(Exception):
+    """La lider se cancelo antes de terminar; el seguidor debe reintentar"""
+
+
+def huella(*partes: str) -> str:
+    """sha256 de varias cadenas, separadas para que no colisionen al concatenar"""
+    h = hashlib.sha256()
+    for parte in partes:
+        h.update(parte.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class CoalescedorVuelo:
+    """
+    Agrupa llamadas simultaneas con la misma clave.
+
+    Args:
+        ambito: Etiqueta de las metricas (p.ej. "evaluacion" o "llm")
+    """
+
+    def __init__(self, ambito: str):
+        self.ambito = ambito
+        self._en_vuelo: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def _unirse(self, clave: Hashable) -> tuple[bool, Future]:
+        with self._lock:
+            futuro = self._en_vuelo.get(clave)
+            if futuro is None:
+                futuro = self._en_vuelo[clave] = Future()
+                return True, futuro
+        METRICAS.incrementar("coalescencia_seguidores_total", {"ambito": self.ambito})
+        return False, futuro
+
+    def _terminar(self, clave: Hashable, futuro: Future):
+        with self._lock:
+            if self._en_vuelo.get(clave) is futuro:
+                del self._en_vuelo[clave]
+
+    def ejecutar(self, clave: Hashable, funcion: Callable[[], Any]) -> Any:
+        """Ejecuta funcion(), o espera a la llamada en vuelo con la misma clave"""
+        while True:
+            lider, futuro = self._unirse(clave)
+            if lider:
+                break
+            try:
+                return futuro.result()
+            except _LiderCancelada:
+                continue
+
+        try:
+            resultado = funcion()
+        except BaseException as e:
+            futuro.set_exception(
+                e if isinstance(e, Exception) else _LiderCancelada(repr(e))
+            )
+            raise
+        else:
+            futuro.set_result(resultado)
+            return resultado
+        finally:
+            self._terminar(clave, futuro)
+
+    async def aejecutar(
+        self, clave: Hashable, funcion: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Version asincrona de ejecutar; funcion() devuelve un awaitable"""
+        import asyncio
+
+        while True:
+            lider, futuro = self._unirse(clave)
+            if lider:
+                break
+            comun = asyncio.wrap_future(futuro)
+            # Si este seguidor se cancela nadie leeria la excepcion del futuro
+            comun.add_done_callback(lambda f: f.cancelled() or f.exception())
+            try:
+                # shield: cancelar a un seguidor no debe cancelar el futuro comun
+                return await asyncio.shield(comun)
+            except _LiderCancelada:
+                continue
+
+        try:
+            resultado = await funcion()
+        except BaseException as e:
+            futuro.set_exception(
+                e if isinstance(e, Exception) else _LiderCancelada(repr(e))
+            )
+            raise
+        else:
+            futuro.set_result(resultado)
+            return resultado
+        finally:
+            self._terminar(clave, futuro)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._en_vuelo)
@@ -0,0 +1,216 @@
+"""
+Codificacion binaria compacta de resultados para archivo.
+
+Formato (solo biblioteca estandar):
+
+    cabecera:  b"EVCV" + version (uint8)
+    trama:     longitud (uint32 LE) + marshal((cadenas_nuevas, registro))
+
+Los nombres de skills, niveles, agentes y metodos se internan: la primera
+vez que aparece una cadena se anade a la tabla y las siguientes se
+referencian por su indice. La tabla se reconstruye al decodificar las
+tramas en orden, de modo que un archivo se puede escribir y leer en
+streaming. marshal es rapido pero especifico de CPython, asi que el
+formato esta pensado para archivo interno, no para intercambio.
+"""
+
+from typing import BinaryIO, Iterable, Iterator, Union
+import marshal
+import struct
+
+from modelos import ResultadoCompleto, ResultadoEvaluacion, TrazabilidadAgente
+
+MAGIA = b"EVCV"
+VERSION = 1
+VERSION_MARSHAL = 4
+
+_CABECERA = struct.Struct("<4sB")
+_LONGITUD = struct.Struct("<I")
+
+_TIPO_EVALUACION = 1
+_TIPO_COMPLETO = 2
+
+Resultado = Union[ResultadoEvaluacion, ResultadoCompleto]
+
+
+class CodificadorBinario:
+    """Codifica resultados en tramas; mantiene la tabla de cadenas internadas"""
+
+    def __init__(self):
+        self._ids: dict[str, int] = {}
+        self._nuevas: list[str] = []
+
+    def _id(self, cadena: str) -> int:
+        indice = self._ids.get(cadena)
+        if indice is None:
+            indice = self._ids[cadena] = len(self._ids)
+            self._nuevas.append(cadena)
+        return indice
+
+    def _ids_lista(self, cadenas: list[str]) -> tuple:
+        return tuple(self._id(c) for c in cadenas)
+
+    def _evaluacion(self, r: ResultadoEvaluacion) -> tuple:
+        return (
+            r.porcentaje_match,
+            self._id(r.seniority_estimado),
+            r.nivel_coherente,
+            r.resumen_evaluacion,
+            self._ids_lista(r.brechas_tecnicas),
+            self._ids_lista(r.skills_encontradas),
+            self._ids_lista(r.skills_faltantes),
+        )
+
+    def codificar(self, resultado: Resultado) -> bytes:
+        """Trama (con prefijo de longitud) de un resultado"""
+        if isinstance(resultado, ResultadoCompleto):
+            registro = (
+                _TIPO_COMPLETO,
+                self._evaluacion(resultado.resultado),
+                self._id(resultado.metodo),
+                resultado.timestamp,
+                tuple(
+                    (
+                        self._id(t.agente),
+                        self._id(t.status),
+                        t.duracion_ms,
+                        t.input_data,
+                        t.output_data,
+                        t.error,
+                        t.fallback,
+                    )
+                    for t in resultado.trazabilidad
+                ),
+            )
+        else:
+            registro = (_TIPO_EVALUACION, self._evaluacion(resultado))
+
+        nuevas, self._nuevas = tuple(self._nuevas), []
+        cuerpo = marshal.dumps((nuevas, registro), VERSION_MARSHAL)
+        return _LONGITUD.pack(len(cuerpo)) + cuerpo
+
+
+class DecodificadorBinario:
+    """Inversa de CodificadorBinario; las tramas deben leerse en orden"""
+
+    def __init__(self):
+        self._tabla: list[str] = []
+
+    def _evaluacion(self, registro: tuple) -> ResultadoEvaluacion:
+        tabla = self._tabla
+        porcentaje, seniority, coherente, resumen, brechas, encontradas, faltantes = (
+            registro
+        )
+        return ResultadoEvaluacion(
+            porcentaje_match=porcentaje,
+            seniority_estimado=tabla[seniority],
+            brechas_tecnicas=[tabla[i] for i in brechas],
+            skills_encontradas=[tabla[i] for i in encontradas],
+            skills_faltantes=[tabla[i] for i in faltantes],
+            nivel_coherente=coherente,
+            resumen_evaluacion=resumen,
+        )
+
+    def decodificar(self, cuerpo: bytes) -> Resultado:
+        """Decodifica el cuerpo de una trama (sin el prefijo de longitud)"""
+        nuevas, registro = marshal.loads(cuerpo)
+        self._tabla.extend(nuevas)
+        if registro[0] == _TIPO_EVALUACION:
+            return self._evaluacion(registro[1])
+
+        _, evaluacion, metodo, timestamp, trazas = registro
+        tabla = self._tabla
+        return ResultadoCompleto(
+            resultado=self._evaluacion(evaluacion),
+            trazabilidad=[
+                TrazabilidadAgente(
+                    agente=tabla[agente],
+                    status=tabla[status],
+                    duracion_ms=duracion,
+                    input_data=entrada,
+                    output_data=salida,
+                    error=error,
+                    fallback=fallback,
+                )
+                for agente, status, duracion, entrada, salida, error, fallback in trazas
+            ],
+            metodo=tabla[metodo],
+            timestamp=timestamp,
+        )
+
+
+def escribir_binario(destino: BinaryIO, resultados: Iterable[Resultado]) -> int:
+    """Escribe cabecera y tramas en un fichero binario; devuelve cuantas"""
+    codificador = CodificadorBinario()
+    destino.write(_CABECERA.pack(MAGIA, VERSION))
+    total = 0
+    for resultado in resultados:
+        destino.write(codificador.codificar(resultado))
+        total += 1
+    return total
+
+
+def _truncado(posicion: int, esperado: int, leido: int) -> ValueError:
+    return ValueError(
+        f"Archivo truncado en el byte {posicion}: "
+        f"se esperaban {esperado} bytes y hay {leido}"
+    )
+
+
+def _comprobar_cabecera(cabecera: bytes):
+    if len(cabecera) < _CABECERA.size:
+        raise _truncado(0, _CABECERA.size, len(cabecera))
+    magia, version = _CABECERA.unpack(cabecera)
+    if magia != MAGIA or version != VERSION:
+        raise ValueError(f"Formato no reconocido: {magia!r} v{version}")
+
+
+def leer_binario(origen: BinaryIO) -> Iterator[Resultado]:
+    """
+    Itera los resultados de un fichero escrito con escribir_binario.
+
+    Un fichero cortado a mitad de una trama lanza ValueError al llegar a
+    ella; los resultados anteriores ya se habran entregado.
+    """
+    _comprobar_cabecera(origen.read(_CABECERA.size))
+    decodificador = DecodificadorBinario()
+    posicion = _CABECERA.size
+    while True:
+        prefijo = origen.read(_LONGITUD.size)
+        if not prefijo:
+            return
+        if len(prefijo) < _LONGITUD.size:
+            raise _truncado(posicion, _LONGITUD.size, len(prefijo))
+        (longitud,) = _LONGITUD.unpack(prefijo)
+        posicion += _LONGITUD.size
+        cuerpo = origen.read(longitud)
+        if len(cuerpo) < longitud:
+            raise _truncado(posicion, longitud, len(cuerpo))
+        posicion += longitud
+        yield decodificador.decodificar(cuerpo)
+
+
+def codificar_lote(resultados: Iterable[Resultado]) -> bytes:
+    """Cabecera y tramas de varios resultados en un unico bytes"""
+    codificador = CodificadorBinario()
+    partes = [_CABECERA.pack(MAGIA, VERSION)]
+    partes.extend(codificador.codificar(r) for r in resultados)
+    return b"".join(partes)
+
+
+def decodificar_lote(datos: bytes) -> list[Resultado]:
+    """Inversa de codificar_lote; lanza ValueError si los datos estan truncados"""
+    _comprobar_cabecera(datos[: _CABECERA.size])
+    decodificador = DecodificadorBinario()
+    resultados = []
+    posicion = _CABECERA.size
+    while posicion < len(datos):
+        if posicion + _LONGITUD.size > len(datos):
+            raise _truncado(posicion, _LONGITUD.size, len(datos) - posicion)
+        (longitud,) = _LONGITUD.unpack_from(datos, posicion)
+        posicion += _LONGITUD.size
+        if posicion + longitud > len(datos):
+            raise _truncado(posicion, longitud, len(datos) - posicion)
+        resultados.append(decodificador.decodificar(datos[posicion : posicion + longitud]))
+        posicion += longitud
+    return resultados
@@ -0,0 +1,179 @@
+"""
+Compactacion de CVs por relevancia para un presupuesto de tokens.
+
+En lugar de cortar el texto a ciegas ([:2000]), se quedan las lineas con
+senal para la evaluacion y se empaquetan en el presupuesto:
+
+1. Se colapsan espacios, se quitan lineas vacias, separadores decorativos
+   ("-----", "====") y lineas repetidas.
+2. Si el resultado ya cabe, se devuelve tal cual.
+3. Si no, cada linea puntua por skills detectadas con el automata local,
+   por requisitos del puesto que menciona, por cargos y por fechas o anos
+   de experiencia. Se eligen las lineas de mas puntuacion que caben, se
+   anaden los encabezados de sus secciones si queda sitio y se devuelve
+   todo en el orden original.
+
+Con un DocumentoCV, las skills y las secciones salen de lo que ya calculo
+el documento: el automata no vuelve a recorrer el texto si otro agente
+lo uso antes sobre el mismo documento.
+"""
+
+from bisect import bisect_right
+from typing import Iterable, Optional
+import re
+
+from automata_skills import AutomataSkills, CoincidenciaSkill
+from documento_cv import DocumentoCV
+from limites_llm import estimar_tokens
+
+PRESUPUESTO_CV_TOKENS = 500
+
+PESO_SKILL = 3
+PESO_REQUISITO = 5
+PESO_CARGO = 2
+PESO_FECHA = 2
+PESO_PRIMERA_LINEA = 2
+MAX_CARACTERES_LINEA = 300
+
+_ESPACIOS = re.compile(r"[ \t\u00a0]+")
+_DECORATIVA = re.compile(r"^[\W_]+$")
+# Texto extraido de PDF suele llegar en lineas enormes: se parte por frases
+_CORTE_FRASE = re.compile(r"(?<=[.;•|])\s+")
+_CARGO = re.compile(
+    r"\b(ingenier[oa]|desarrollador(?:a)?|developer|engineer|arquitect[oa]|"
+    r"architect|lead|l[ií]der|manager|director(?:a)?|cient[ií]fic[oa]|scientist|"
+    r"analista|analyst|consultor(?:a)?|consultant|devops|sre|cto|head|"
+    r"junior|semi-senior|senior|staff|principal)\b",
+    re.IGNORECASE,
+)
+_FECHA = re.compile(
+    r"\b(?:19|20)\d{2}\b|\b\d+\+?\s*(?:años?|anos?|years?)\b|"
+    r"\b(?:actualidad|presente|present|actual)\b",
+    re.IGNORECASE,
+)
+
+
+def _fragmentos(texto: str) -> Iterable[tuple[int, int, str]]:
+    """(inicio, fin, texto limpio) de cada linea, o de cada frase si es larga"""
+    posicion = 0
+    for linea in texto.splitlines(keepends=True):
+        inicio_linea = posicion
+        posicion += len(linea)
+        tramos = [(0, len(linea))]
+        if len(_ESPACIOS.sub(" ", linea).strip()) > MAX_CARACTERES_LINEA:
+            cortes = [(m.start(), m.end()) for m in _CORTE_FRASE.finditer(linea)]
+            tramos = zip(
+                [0] + [fin for _, fin in cortes],
+                [inicio for inicio, _ in cortes] + [len(linea)],
+            )
+        for inicio, fin in tramos:
+            fragmento = _ESPACIOS.sub(" ", linea[inicio:fin]).strip()
+            yield inicio_linea + inicio, inicio_linea + fin, fragmento
+
+
+def _lineas_limpias(texto: str) -> list[tuple[int, int, str]]:
+    """Lineas sin espacios redundantes, separadores ni repeticiones"""
+    lineas = []
+    vistas = set()
+    for inicio, fin, linea in _fragmentos(texto):
+        if not linea or _DECORATIVA.match(linea):
+            continue
+        clave = linea.lower()
+        if clave in vistas:
+            continue
+        vistas.add(clave)
+        lineas.append((inicio, fin, linea))
+    return lineas
+
+
+def _skills_por_linea(
+    lineas: list[tuple[int, int, str]], coincidencias: Iterable[CoincidenciaSkill]
+) -> list[set[str]]:
+    """Reparte coincidencias sobre todo el texto entre las lineas que las contienen"""
+    inicios = [inicio for inicio, _, _ in lineas]
+    skills: list[set[str]] = [set() for _ in lineas]
+    for coincidencia in coincidencias:
+        indice = bisect_right(inicios, coincidencia.inicio) - 1
+        if indice >= 0 and coincidencia.fin <= lineas[indice][1]:
+            skills[indice].add(coincidencia.skill)
+    return skills
+
+
+def compactar_cv(
+    cv: DocumentoCV | str,
+    presupuesto_tokens: int = PRESUPUESTO_CV_TOKENS,
+    terminos: Iterable[str] = (),
+    automata: Optional[AutomataSkills] = None,
+) -> str:
+    """
+    Devuelve el CV reducido a `presupuesto_tokens` (aprox. 4 caracteres/token).
+
+    Args:
+        cv: DocumentoCV compartido o CV en texto plano
+        presupuesto_tokens: Tokens maximos del resultado
+        terminos: Requisitos del puesto; las lineas que los mencionan pesan
+            mas que las que solo tienen otras skills
+        automata: Automata de skills a usar (por defecto AUTOMATA_SKILLS)
+    """
+    documento = DocumentoCV.de(cv)
+    lineas = _lineas_limpias(documento.texto)
+    textos = [linea for _, _, linea in lineas]
+    costes = [estimar_tokens(linea) for linea in textos]
+    if sum(costes) <= presupuesto_tokens:
+        return "\n".join(textos)
+
+    if automata is None:
+        from agentes_especializados import AUTOMATA_SKILLS
+
+        automata = AUTOMATA_SKILLS
+    skills = _skills_por_linea(lineas, documento.coincidencias(automata))
+    terminos = [t for t in terminos if t and t.strip()]
+    requisitos = (
+        _skills_por_linea(
+            lineas,
+            AutomataSkills({"requisitos": terminos}).buscar(documento.normalizado),
+        )
+        if terminos
+        else None
+    )
+    inicios_seccion = {seccion.inicio for seccion in documento.secciones}
+
+    encabezado_de: list[Optional[int]] = []
+    puntuaciones: list[int] = []
+    seccion = None
+    for indice, (inicio, _, linea) in enumerate(lineas):
+        if inicio in inicios_seccion:
+            seccion = indice
+            encabezado_de.append(None)
+            puntuaciones.append(0)
+            continue
+        encabezado_de.append(seccion)
+        puntuacion = PESO_SKILL * len(skills[indice])
+        if requisitos is not None:
+            puntuacion += PESO_REQUISITO * len(requisitos[indice])
+        puntuacion += PESO_CARGO * bool(_CARGO.search(linea))
+        puntuacion += PESO_FECHA * bool(_FECHA.search(linea))
+        if indice == 0:
+            puntuacion += PESO_PRIMERA_LINEA
+        puntuaciones.append(puntuacion)
+
+    candidatas = sorted(
+        (i for i, p in enumerate(puntuaciones) if p > 0),
+        key=lambda i: (-puntuaciones[i], i),
+    )
+    elegidas: set[int] = set()
+    restante = presupuesto_tokens
+    for indice in candidatas:
+        if costes[indice] <= restante:
+            elegidas.add(indice)
+            restante -= costes[indice]
+
+    for encabezado in sorted({encabezado_de[i] for i in elegidas} - {None}):
+        if costes[encabezado] <= restante:
+            elegidas.add(encabezado)
+            restante -= costes[encabezado]
+
+    if not elegidas:
+        # Ninguna linea con senal cabe: se recurre al corte por caracteres
+        return "\n".join(textos)[: presupuesto_tokens * 4]
+    return "\n".join(textos[i] for i in sorted(elegidas))
@@ -0,0 +1,165 @@
+"""
+Documento de CV preprocesado una sola vez por evaluacion.
+
+El coordinador construye un DocumentoCV a partir del texto y lo pasa a
+todos los agentes en la clave de contexto "_documento", de modo que el
+texto normalizado, los tokens, las secciones, los anos de experiencia
+y las skills detectadas por cada automata se calculan una vez y se
+comparten (tambien con compactador_cv al construir los prompts).
+
+El texto normalizado esta en minusculas y sin acentos ("Años" -> "anos")
+y tiene la misma longitud que el original: cualquier posicion obtenida
+sobre el normalizado sirve tambien para el texto original.
+"""
+
+from dataclasses import dataclass
+from functools import cached_property
+import re
+import unicodedata
+
+from automata_skills import AutomataSkills, CoincidenciaSkill
+
+_TOKEN = re.compile(r"\w+")
+_PATRONES_EXPERIENCIA = [
+    # Especificos primero: "5 anos de experiencia" gana a "2 anos en X"
+    re.compile(r"(\d+)\+?\s*anos?\s+de\s+experiencia"),
+    re.compile(r"(\d+)\+?\s*years?\s+(?:of\s+)?experience"),
+    re.compile(r"experiencia:\s*(\d+)\s*anos?"),
+    re.compile(r"(\d+)\+?\s*anos?\b"),
+    re.compile(r"(\d+)\+?\s*years?\b"),
+]
+
+
+def _sin_acento(caracter: str) -> str:
+    base = unicodedata.normalize("NFKD", caracter)[0]
+    return base if base.isascii() else caracter
+
+
+# Latin-1 y Latin Extended-A: cubre los acentos del espanol y del portugues
+_PLIEGUE = {
+    ord(c): _sin_acento(c)
+    for c in map(chr, range(0xC0, 0x180))
+    if _sin_acento(c) != c
+}
+
+
+def normalizar(texto: str) -> str:
+    """Minusculas sin acentos, conservando la longitud y las posiciones"""
+    normalizado = texto.translate(_PLIEGUE).lower()
+    if len(normalizado) != len(texto):
+        # Algunos caracteres (p.ej. "İ") se expanden al pasar a minusculas
+        normalizado = "".join(
+            c if len(c) == 1 else o for c, o in zip(map(str.lower, texto), texto)
+        ).translate(_PLIEGUE)
+    return normalizado
+
+
+def es_encabezado(linea: str) -> bool:
+    """Linea corta terminada en ":" o en mayusculas ("EXPERIENCIA", "Skills:")"""
+    return len(linea) <= 40 and (linea.endswith(":") or linea.isupper())
+
+
+@dataclass(frozen=True)
+class Seccion:
+    """Seccion del CV; inicio y fin son posiciones en el texto"""
+
+    nombre: str
+    inicio: int
+    fin: int
+
+
+class DocumentoCV:
+    """
+    CV con su preprocesado compartido entre agentes.
+
+    Todo se calcula de forma perezosa y se guarda la primera vez; si dos
+    agentes en paralelo lo piden a la vez, ambos obtienen el mismo valor.
+    """
+
+    def __init__(self, texto: str):
+        self.texto = texto
+        self._skills: dict[AutomataSkills, list[CoincidenciaSkill]] = {}
+
+    @classmethod
+    def de(cls, valor: "DocumentoCV | str") -> "DocumentoCV":
+        """Devuelve `valor` si ya es un DocumentoCV; si no, lo construye"""
+        return valor if isinstance(valor, cls) else cls(valor or "")
+
+    @cached_property
+    def normalizado(self) -> str:
+        return normalizar(self.texto)
+
+    @cached_property
+    def posiciones_tokens(self) -> list[tuple[int, int]]:
+        """(inicio, fin) de cada token, validos tambien sobre el texto original"""
+        return [m.span() for m in _TOKEN.finditer(self.normalizado)]
+
+    @cached_property
+    def tokens(self) -> list[str]:
+        """Tokens del texto normalizado, en orden"""
+        return [self.normalizado[i:f] for i, f in self.posiciones_tokens]
+
+    @cached_property
+    def vocabulario(self) -> frozenset[str]:
+        """Tokens distintos del texto normalizado"""
+        return frozenset(self.tokens)
+
+    @cached_property
+    def secciones(self) -> list[Seccion]:
+        """Secciones delimitadas por encabezados, en orden de aparicion"""
+        encabezados = []
+        posicion = 0
+        for linea in self.texto.splitlines(keepends=True):
+            limpia = linea.strip()
+            if limpia and es_encabezado(limpia):
+                encabezados.append((limpia.rstrip(":").strip(), posicion))
+            posicion += len(linea)
+        return [
+            Seccion(
+                nombre,
+                inicio,
+                encabezados[i + 1][1] if i + 1 < len(encabezados) else posicion,
+            )
+            for i, (nombre, inicio) in enumerate(encabezados)
+        ]
+
+    @cached_property
+    def experiencia_anios(self) -> int:
+        """Anos de experiencia declarados; 0 si no se encuentran"""
+        for patron in _PATRONES_EXPERIENCIA:
+            match = patron.search(self.normalizado)
+            if match:
+                return int(match.group(1))
+        return 0
+
+    def contiene(self, *palabras: str) -> bool:
+        """Indica si alguna de las palabras aparece como token completo"""
+        return any(palabra in self.vocabulario for palabra in palabras)
+
+    def coincidencias(self, automata: AutomataSkills) -> list[CoincidenciaSkill]:
+        """Coincidencias de `automata` sobre el texto normalizado, memorizadas"""
+        coincidencias = self._skills.get(automata)
+        if coincidencias is None:
+            coincidencias = self._skills[automata] = automata.buscar(self.normalizado)
+        return coincidencias
+
+    def skills(self, automata: AutomataSkills) -> list[str]:
+        """Skills de `automata` sin duplicados y en orden de aparicion"""
+        return list(dict.fromkeys(c.skill for c in self.coincidencias(automata)))
+
+    def skills_por_categoria(self, automata: AutomataSkills) -> dict[str, list[str]]:
+        """Como AutomataSkills.extraer, reutilizando las coincidencias"""
+        por_categoria: dict[str, list[str]] = {}
+        for coincidencia in self.coincidencias(automata):
+            skills = por_categoria.setdefault(coincidencia.categoria, [])
+            if coincidencia.skill not in skills:
+                skills.append(coincidencia.skill)
+        return por_categoria
+
+
+def obtener_documento(input_data: dict) -> DocumentoCV:
+    """DocumentoCV compartido de la entrada de un agente, o uno nuevo del cv_texto"""
+    documento = input_data.get("_documento")
+    if documento is None:
+        documento = DocumentoCV(input_data.get("cv_texto", ""))
+    return documento
@@ -0,0 +1,122 @@
+"""
+Escritura en streaming de resultados en formato JSONL.
+
+Cada evaluacion se serializa como una linea JSON compacta en cuanto
+termina; las lineas se acumulan en un buffer pequeno y se vuelcan al
+fichero por lotes. La memoria no depende del tamano de la ejecucion y
+el fichero se puede seguir con `tail -f` mientras se escribe.
+"""
+
+from typing import Union
+import json
+import threading
+import time
+import logging
+
+from modelos import ResultadoCompleto, ResultadoEvaluacion
+
+logger = logging.getLogger(__name__)
+
+
+class EscritorJSONL:
+    """
+    Escritor JSONL con volcado por lotes, seguro entre hilos.
+
+    Args:
+        ruta: Fichero de salida
+        lote_flush: Lineas acumuladas antes de volcar al fichero
+        intervalo_flush_s: Tiempo maximo que una linea espera en el buffer
+            (se comprueba al escribir la siguiente)
+        incluir_trazabilidad: Si True, serializa tambien la trazabilidad
+            de los ResultadoCompleto
+        anadir: Si True, anade al final del fichero en lugar de truncarlo
+    """
+
+    def __init__(
+        self,
+        ruta: str,
+        lote_flush: int = 100,
+        intervalo_flush_s: float = 1.0,
+        incluir_trazabilidad: bool = False,
+        anadir: bool = False,
+    ):
+        self.ruta = ruta
+        self.lote_flush = max(1, lote_flush)
+        self.intervalo_flush_s = intervalo_flush_s
+        self.incluir_trazabilidad = incluir_trazabilidad
+        self._fichero = open(ruta, "a" if anadir else "w", encoding="utf-8")
+        self._buffer: list[str] = []
+        self._ultimo_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self.lineas_escritas = 0
+
+    def escribir(
+        self, resultado: Union[ResultadoCompleto, ResultadoEvaluacion, dict], **extra
+    ):
+        """
+        Anade una linea con el resultado.
+
+        Los argumentos extra (p.ej. indice o cv_id) se incluyen como claves
+        de primer nivel de la linea.
+        """
+        if isinstance(resultado, ResultadoCompleto):
+            datos = resultado.to_dict(self.incluir_trazabilidad)
+        elif isinstance(resultado, ResultadoEvaluacion):
+            datos = resultado.to_dict()
+        else:
+            datos = resultado
+        linea = json.dumps(
+            {**extra, **datos}, ensure_ascii=False, separators=(",", ":"), default=str
+        )
+
+        with self._lock:
+            self._buffer.append(linea)
+            self.lineas_escritas += 1
+            if (
+                len(self._buffer) >= self.lote_flush
+                or time.monotonic() - self._ultimo_flush >= self.intervalo_flush_s
+            ):
+                self._volcar()
+
+    def flush(self):
+        with self._lock:
+            self._volcar()
+
+    def _volcar(self):
+        if self._buffer:
+            self._fichero.write("\n".join(self._buffer) + "\n")
+            self._buffer.clear()
+        self._fichero.flush()
+        self._ultimo_flush = time.monotonic()
+
+    def cerrar(self):
+        with self._lock:
+            if self._fichero.closed:
+                return
+            self._volcar()
+            self._fichero.close()
+        logger.info(f"{self.lineas_escritas} resultados escritos en {self.ruta}")
+
+    def __enter__(self) -> "EscritorJSONL":
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+def leer_jsonl(ruta: str):
+    """Itera los objetos de un fichero JSONL, ignorando lineas vacias"""
+    with open(ruta, encoding="utf-8") as f:
+        for linea in f:
+            if linea.strip():
+                yield json.loads(linea)
+
+
+def escribir_resultados(
+    ruta: str, resultados, incluir_trazabilidad: bool = False
+) -> int:
+    """Escribe un iterable de resultados en JSONL; devuelve las lineas escritas"""
+    with EscritorJSONL(ruta, incluir_trazabilidad=incluir_trazabilidad) as escritor:
+        for indice, resultado in enumerate(resultados):
+            escritor.escribir(resultado, indice=indice)
+    return escritor.lineas_escritas
@@ -0,0 +1,63 @@
+"""
+Grafo de dependencias entre agentes.
+
+Cada agente declara las claves de contexto que consume (ENTRADAS) y las
+que produce (SALIDAS). A partir de esas declaraciones se deriva que
+agentes dependen de cuales, para poder ejecutar en paralelo los que son
+independientes.
+"""
+
+from dataclasses import dataclass
+from typing import Iterable
+
+
+@dataclass
+class GrafoAgentes:
+    orden: list[str]
+    dependencias: dict[str, set[str]]
+
+    @classmethod
+    def desde_agentes(
+        cls, agentes: dict, entradas_iniciales: Iterable[str]
+    ) -> "GrafoAgentes":
+        """
+        Construye el grafo a partir de las ENTRADAS/SALIDAS de cada agente.
+
+        Args:
+            agentes: Diccionario nombre -> agente
+            entradas_iniciales: Claves de contexto disponibles antes de empezar
+
+        Raises:
+            ValueError: Si una clave tiene dos productores, si una entrada no
+                tiene productor o si hay un ciclo.
+        """
+        iniciales = set(entradas_iniciales)
+        productor: dict[str, str] = {}
+        for nombre, agente in agentes.items():
+            for salida in agente.SALIDAS:
+                if salida in productor or salida in iniciales:
+                    raise ValueError(f"La clave '{salida}' tiene mas de un productor")
+                productor[salida] = nombre
+
+        dependencias: dict[str, set[str]] = {}
+        for nombre, agente in agentes.items():
+            dependencias[nombre] = set()
+            for clave in agente.ENTRADAS.values():
+                if clave in productor:
+                    dependencias[nombre].add(productor[clave])
+                elif clave not in iniciales:
+                    raise ValueError(
+                        f"La entrada '{clave}' de {nombre} no tiene productor"
+                    )
+
+        orden: list[str] = []
+        pendientes = dict(dependencias)
+        while pendientes:
+            listos = [n for n, deps in pendientes.items() if deps <= set(orden)]
+            if not listos:
+                raise ValueError(f"Ciclo de dependencias entre: {list(pendientes)}")
+            for nombre in listos:
+                orden.append(nombre)
+                del pendientes[nombre]
+
+        return cls(orden=orden, dependencias=dependencias)
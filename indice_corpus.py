@@ -0,0 +1,109 @@
+"""
+Indice invertido skill -> CVs sobre un corpus de CVs historicos.
+
+Permite preseleccionar candidatos para un puesto consultando solo las
+listas de los skills requeridos, sin volver a escanear cada CV.
+"""
+
+from collections import Counter
+from typing import Hashable, Iterable, Optional
+import logging
+
+from modelos import RequisitosPuesto
+from agentes_especializados import AUTOMATA_SKILLS, coincide_skill
+from documento_cv import DocumentoCV
+
+logger = logging.getLogger(__name__)
+
+
+class IndiceCorpus:
+    """
+    Indice invertido construido con la misma extraccion que AgenteAnalistaSkills.
+
+    Cada skill del vocabulario apunta al conjunto de ids de CV que la
+    mencionan. Una skill requerida se considera cubierta con la misma regla
+    que AgenteDetectorBrechas (coincidencia por subcadena en ambos sentidos).
+    """
+
+    def __init__(self):
+        self._postings: dict[str, set[Hashable]] = {}
+        self._documentos: dict[Hashable, str] = {}
+        self._skills_por_cv: dict[Hashable, list[str]] = {}
+
+    def agregar(self, cv_id: Hashable, cv_texto: str):
+        """Indexa un CV; si el id ya existia se reemplaza"""
+        if cv_id in self._documentos:
+            self.eliminar(cv_id)
+
+        skills = DocumentoCV(cv_texto).skills(AUTOMATA_SKILLS)
+        self._documentos[cv_id] = cv_texto
+        self._skills_por_cv[cv_id] = skills
+        for skill in skills:
+            self._postings.setdefault(skill, set()).add(cv_id)
+
+    def agregar_varios(self, cvs: Iterable[tuple[Hashable, str]]):
+        """Indexa pares (cv_id, cv_texto)"""
+        for cv_id, cv_texto in cvs:
+            self.agregar(cv_id, cv_texto)
+
+    def eliminar(self, cv_id: Hashable):
+        """Quita un CV del indice"""
+        self._documentos.pop(cv_id, None)
+        for skill in self._skills_por_cv.pop(cv_id, []):
+            postings = self._postings.get(skill)
+            if postings is None:
+                continue
+            postings.discard(cv_id)
+            if not postings:
+                del self._postings[skill]
+
+    def buscar(
+        self, requisitos: RequisitosPuesto, min_skills: Optional[int] = 1
+    ) -> list[tuple[Hashable, int]]:
+        """
+        Devuelve los CVs que cubren al menos `min_skills` skills requeridas.
+
+        Args:
+            requisitos: Requisitos del puesto
+            min_skills: Minimo de skills cubiertas (None = todo el stack)
+
+        Returns:
+            Lista de (cv_id, skills cubiertas) ordenada de mayor a menor cobertura
+        """
+        if min_skills is None:
+            min_skills = len(requisitos.stack_tecnico)
+
+        cobertura: Counter = Counter()
+        for requerida in requisitos.stack_tecnico:
+            requerida_lower = requerida.lower()
+            candidatos: set[Hashable] = set()
+            for skill, postings in self._postings.items():
+                if coincide_skill(requerida_lower, skill):
+                    candidatos |= postings
+            cobertura.update(candidatos)
+        if min_skills <= 0:
+            # Con minimo 0 (o stack vacio y min_skills=None) todo CV cumple
+            for cv_id in self._documentos:
+                cobertura.setdefault(cv_id, 0)
+
+        preseleccion = [
+            (cv_id, cubiertas)
+            for cv_id, cubiertas in cobertura.most_common()
+            if cubiertas >= min_skills
+        ]
+        logger.info(
+            f"Preseleccion: {len(preseleccion)} de {len(self._documentos)} CVs"
+        )
+        return preseleccion
+
+    def obtener_texto(self, cv_id: Hashable) -> str:
+        return self._documentos[cv_id]
+
+    def obtener_skills(self, cv_id: Hashable) -> list[str]:
+        return list(self._skills_por_cv[cv_id])
+
+    def __len__(self) -> int:
+        return len(self._documentos)
+
+    def __contains__(self, cv_id: Hashable) -> bool:
+        return cv_id in self._documentos
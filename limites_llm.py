@@ -0,0 +1,322 @@
+"""
+Limites de uso del proveedor LLM en el lado del cliente.
+
+- Cubos de tokens para peticiones y tokens por minuto. La reserva se
+  descuenta al pedirla (el cubo puede quedar en deuda) y devuelve cuanto
+  hay que esperar, asi sirve igual para hilos (time.sleep) que para
+  tareas asyncio (asyncio.sleep).
+- Un semaforo de llamadas en curso compartido entre hilos y tareas.
+- Reintentos con backoff exponencial y jitter completo para errores
+  transitorios (429, timeouts, 5xx, conexion).
+
+Un LimitadorLLM se puede compartir entre varios LLMClient que usen la
+misma cuenta del proveedor; obtener_limitador devuelve el de cada
+(api_key, modelo) para que N clientes no multipliquen por N los limites.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+import random
+import threading
+import time
+import weakref
+import logging
+
+from metricas import METRICAS
+from registro import clave_configuracion
+
+logger = logging.getLogger(__name__)
+
+ESTADOS_TRANSITORIOS = (408, 409, 429, 500, 502, 503, 504)
+ERRORES_TRANSITORIOS = (
+    "RateLimitError",
+    "APITimeoutError",
+    "APIConnectionError",
+    "InternalServerError",
+    "ServiceUnavailableError",
+    "LimiteTasaSimulado",
+    "ErrorLLMSimulado",
+)
+
+
+class ErrorLLM(Exception):
+    """La llamada al LLM fallo (tras agotar los reintentos si era transitoria)"""
+
+    def __init__(self, mensaje: str, intentos: int = 1):
+        super().__init__(mensaje)
+        self.intentos = intentos
+
+
+@dataclass
+class ConfiguracionLimites:
+    """
+    Limites del cliente LLM.
+
+    Args:
+        peticiones_por_minuto: Limite de peticiones (None sin limite)
+        tokens_por_minuto: Limite de tokens estimados (None sin limite)
+        max_en_curso: Llamadas simultaneas al proveedor (None sin limite)
+        max_reintentos: Reintentos tras un error transitorio
+        espera_base_s: Espera del primer reintento antes del jitter
+        espera_max_s: Tope de la espera entre reintentos
+        tokens_respuesta: Tokens de respuesta estimados por llamada, que se
+            suman a los del prompt al reservar
+    """
+
+    peticiones_por_minuto: Optional[float] = None
+    tokens_por_minuto: Optional[float] = None
+    max_en_curso: Optional[int] = 32
+    max_reintentos: int = 4
+    espera_base_s: float = 0.5
+    espera_max_s: float = 20.0
+    tokens_respuesta: int = 500
+
+
+class CuboTokens:
+    """Token bucket que se recarga a `por_minuto` con rafaga `capacidad`"""
+
+    def __init__(self, por_minuto: float, capacidad: Optional[float] = None):
+        self.tasa = por_minuto / 60
+        self.capacidad = capacidad or por_minuto
+        self._nivel = self.capacidad
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reservar(self, cantidad: float = 1) -> float:
+        """Descuenta `cantidad` y devuelve los segundos a esperar antes de usarla"""
+        with self._lock:
+            ahora = time.monotonic()
+            self._nivel = min(
+                self.capacidad, self._nivel + (ahora - self._ultimo) * self.tasa
+            )
+            self._ultimo = ahora
+            # Una reserva mayor que la rafaga nunca cabria entera
+            self._nivel -= min(cantidad, self.capacidad)
+            return 0.0 if self._nivel >= 0 else -self._nivel / self.tasa
+
+
+class _EsperaAsincrona:
+    __slots__ = ("futuro", "concedida")
+
+    def __init__(self, futuro):
+        self.futuro = futuro
+        self.concedida = False
+
+
+class SemaforoCompartido:
+    """
+    Semaforo FIFO que pueden usar a la vez hilos y tareas asyncio.
+
+    Al liberar, la plaza pasa directamente al primero en espera: un
+    threading.Event para hilos o un futuro resuelto en su propio loop
+    (call_soon_threadsafe) para tareas.
+    """
+
+    def __init__(self, maximo: int):
+        self.maximo = maximo
+        self.en_curso = 0
+        self._espera: deque = deque()
+        self._lock = threading.Lock()
+
+    def adquirir(self):
+        with self._lock:
+            if self.en_curso < self.maximo and not self._espera:
+                self.en_curso += 1
+                return
+            evento = threading.Event()
+            self._espera.append(evento)
+        evento.wait()
+
+    async def aadquirir(self):
+        import asyncio
+
+        with self._lock:
+            if self.en_curso < self.maximo and not self._espera:
+                self.en_curso += 1
+                return
+            espera = _EsperaAsincrona(asyncio.get_running_loop().create_future())
+            self._espera.append(espera)
+        try:
+            await espera.futuro
+        except asyncio.CancelledError:
+            with self._lock:
+                concedida = espera.concedida
+                if not concedida and espera in self._espera:
+                    self._espera.remove(espera)
+            if concedida:
+                self.liberar()
+            raise
+
+    def liberar(self):
+        with self._lock:
+            while self._espera:
+                espera = self._espera.popleft()
+                if isinstance(espera, threading.Event):
+                    espera.set()
+                    return
+                if not espera.futuro.done():
+                    espera.concedida = True
+                    espera.futuro.get_loop().call_soon_threadsafe(
+                        _conceder, espera.futuro
+                    )
+                    return
+            self.en_curso -= 1
+
+    @property
+    def en_espera(self) -> int:
+        return len(self._espera)
+
+
+def _conceder(futuro):
+    if not futuro.done():
+        futuro.set_result(None)
+
+
+def es_transitorio(error: Exception) -> bool:
+    """429, timeouts, 5xx y errores de conexion se reintentan"""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    if type(error).__name__ in ERRORES_TRANSITORIOS:
+        return True
+    estado = getattr(error, "status_code", None)
+    return estado in ESTADOS_TRANSITORIOS
+
+
+def _espera_indicada(error: Exception) -> Optional[float]:
+    """Retry-After de la respuesta HTTP del proveedor, si lo trae"""
+    cabeceras = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(cabeceras.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def estimar_tokens(prompt: str) -> int:
+    """Aproximacion de ~4 caracteres por token"""
+    return len(prompt) // 4 + 1
+
+
+class LimitadorLLM:
+    """Aplica limites de tasa, de concurrencia y reintentos a cada llamada"""
+
+    def __init__(self, config: Optional[ConfiguracionLimites] = None):
+        self.config = config or ConfiguracionLimites()
+        c = self.config
+        self._peticiones = (
+            CuboTokens(c.peticiones_por_minuto) if c.peticiones_por_minuto else None
+        )
+        self._tokens = CuboTokens(c.tokens_por_minuto) if c.tokens_por_minuto else None
+        self._semaforo = SemaforoCompartido(c.max_en_curso) if c.max_en_curso else None
+        self._rng = random.Random()
+
+    def _reservar(self, tokens: int) -> float:
+        espera = 0.0
+        if self._peticiones is not None:
+            espera = self._peticiones.reservar(1)
+        if self._tokens is not None:
+            espera = max(
+                espera, self._tokens.reservar(tokens + self.config.tokens_respuesta)
+            )
+        if espera > 0:
+            METRICAS.observar("llm_espera_limite_ms", espera * 1000)
+        return espera
+
+    def _backoff(self, intento: int, error: Exception) -> float:
+        indicada = _espera_indicada(error)
+        if indicada is not None:
+            return min(indicada, self.config.espera_max_s)
+        tope = min(self.config.espera_max_s, self.config.espera_base_s * 2**intento)
+        return self._rng.uniform(0, tope)
+
+    def _decidir(self, intento: int, error: Exception, modelo: str) -> float:
+        """Espera antes del siguiente intento, o ErrorLLM si no se reintenta"""
+        if not es_transitorio(error):
+            raise ErrorLLM(f"{type(error).__name__}: {error}", intento + 1) from error
+        if intento >= self.config.max_reintentos:
+            METRICAS.incrementar("llm_reintentos_agotados_total", {"modelo": modelo})
+            raise ErrorLLM(
+                f"{type(error).__name__} tras {intento + 1} intentos: {error}",
+                intento + 1,
+            ) from error
+        espera = self._backoff(intento, error)
+        METRICAS.incrementar(
+            "llm_reintentos_total", {"modelo": modelo, "motivo": type(error).__name__}
+        )
+        logger.warning(
+            f"Error transitorio del LLM ({type(error).__name__}), "
+            f"reintento {intento + 1} en {espera:.2f}s"
+        )
+        return espera
+
+    def ejecutar(self, llamada: Callable[[], Any], tokens: int, modelo: str = "") -> Any:
+        """Ejecuta `llamada` respetando los limites; reintenta los transitorios"""
+        intento = 0
+        while True:
+            espera = self._reservar(tokens)
+            if espera > 0:
+                time.sleep(espera)
+            if self._semaforo is not None:
+                self._semaforo.adquirir()
+            try:
+                return llamada()
+            except Exception as e:
+                error = e
+            finally:
+                if self._semaforo is not None:
+                    self._semaforo.liberar()
+            time.sleep(self._decidir(intento, error, modelo))
+            intento += 1
+
+    async def aejecutar(
+        self, llamada: Callable[[], Awaitable[Any]], tokens: int, modelo: str = ""
+    ) -> Any:
+        """Version asincrona de ejecutar; `llamada` devuelve un awaitable"""
+        import asyncio
+
+        intento = 0
+        while True:
+            espera = self._reservar(tokens)
+            if espera > 0:
+                await asyncio.sleep(espera)
+            if self._semaforo is not None:
+                await self._semaforo.aadquirir()
+            try:
+                return await llamada()
+            except Exception as e:
+                error = e
+            finally:
+                if self._semaforo is not None:
+                    self._semaforo.liberar()
+            await asyncio.sleep(self._decidir(intento, error, modelo))
+            intento += 1
+
+
+_LIMITADORES: "weakref.WeakValueDictionary[tuple, LimitadorLLM]" = (
+    weakref.WeakValueDictionary()
+)
+_LOCK_LIMITADORES = threading.Lock()
+
+
+def obtener_limitador(
+    api_key: Optional[str],
+    modelo: str,
+    limites: Optional[ConfiguracionLimites] = None,
+) -> LimitadorLLM:
+    """
+    LimitadorLLM compartido por (hash de api_key, modelo).
+
+    Vive mientras algun cliente lo use. Si ya existe, `limites` no lo
+    cambia: manda la configuracion del primero y se avisa si difiere.
+    """
+    clave = clave_configuracion(api_key, modelo)
+    with _LOCK_LIMITADORES:
+        limitador = _LIMITADORES.get(clave)
+        if limitador is None:
+            limitador = _LIMITADORES[clave] = LimitadorLLM(limites)
+        elif limites is not None and limites != limitador.config:
+            logger.warning(
+                f"Ya hay un limitador para el modelo {modelo} con otros limites; "
+                "se comparte el existente"
+            )
+    return limitador
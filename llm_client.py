@@ -1,26 +1,72 @@
-from typing import Optional, Any
+from functools import lru_cache
+from typing import Callable, Optional, Any
+import json
+import time
 import logging
 
+from metricas import METRICAS
+from registro import RegistroLRU, clave_configuracion
+from cache_llm import CacheRespuestasLLM, CACHE_LLM
+from coalescencia import CoalescedorVuelo
+from limites_llm import (
+    ConfiguracionLimites,
+    ErrorLLM,
+    LimitadorLLM,
+    estimar_tokens,
+    obtener_limitador,
+)
+from llm_simulado import ConfiguracionSimulacion, LLMSimulado
+
 logger = logging.getLogger(__name__)
 
 
 class LLMClient:
-    """Cliente LLM con soporte para OpenAI y fallback"""
+    """
+    Cliente LLM con soporte para OpenAI y fallback
+
+    Con `simulacion` usa el backend LLMSimulado en lugar de OpenAI, para
+    pruebas de carga sin red. Las llamadas al proveedor pasan por un
+    LimitadorLLM (limites de tasa, llamadas en curso y reintentos), propio
+    o compartido con otros clientes de la misma cuenta. Los prompts
+    identicos en vuelo a la vez se resuelven con una sola llamada.
+    """
 
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4"):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "gpt-4",
+        temperature: float = 0.3,
+        cache: Optional[CacheRespuestasLLM] = None,
+        simulacion: Optional[ConfiguracionSimulacion] = None,
+        limites: Optional[ConfiguracionLimites] = None,
+        limitador: Optional[LimitadorLLM] = None,
+        coalescer: bool = True,
+    ):
         self.api_key = api_key
         self.model = model
+        self.temperature = temperature
+        self.cache = cache
+        self.simulacion = simulacion
+        self.limitador = limitador or LimitadorLLM(limites)
+        self._vuelos = CoalescedorVuelo("llm") if coalescer else None
         self._client = None
         self._inicializar()
 
     def _inicializar(self):
         """Inicializa el cliente LLM"""
-        if self.api_key:
+        if self.simulacion is not None:
+            self._client = LLMSimulado(self.simulacion)
+            logger.info(f"LLM simulado ({self.simulacion.distribucion})")
+        elif self.api_key:
             try:
                 from langchain_openai import ChatOpenAI
 
+                # Los reintentos los gestiona el limitador
                 self._client = ChatOpenAI(
-                    model=self.model, api_key=self.api_key, temperature=0.3
+                    model=self.model,
+                    api_key=self.api_key,
+                    temperature=self.temperature,
+                    max_retries=0,
                 )
                 logger.info(f"LLM inicializado con modelo: {self.model}")
             except ImportError:
@@ -33,28 +79,170 @@ class LLMClient:
             logger.info("Sin API key, usando modo fallback")
             self._client = FallbackLLM()
 
-    def generate(self, prompt: str) -> str:
-        """Genera una respuesta"""
+    def generate(
+        self, prompt: str, validar: Optional[Callable[[str], bool]] = None
+    ) -> str:
+        """
+        Genera una respuesta, consultando antes el cache si esta activo.
+
+        Con `validar`, solo se guardan en el cache las respuestas para las
+        que devuelve True: una respuesta mala no se repite hasta el TTL.
+
+        Raises:
+            ErrorLLM: si el proveedor falla con un error no transitorio o
+                se agotan los reintentos
+        """
+        if not self.disponible:
+            return (self._client or FallbackLLM()).generate(prompt)
+
+        clave, respuesta = self._buscar_en_cache(prompt)
+        if respuesta is not None:
+            self._contar_llamada("cache")
+            return respuesta
+
+        if self._vuelos is None:
+            return self._llamar(prompt, clave, validar)
+        return self._vuelos.ejecutar(
+            clave or self._clave(prompt), lambda: self._llamar(prompt, clave, validar)
+        )
+
+    def _llamar(
+        self,
+        prompt: str,
+        clave: Optional[str],
+        validar: Optional[Callable[[str], bool]] = None,
+    ) -> str:
+        mensajes = self._mensajes(prompt)
+        inicio = time.perf_counter()
         try:
-            if self._client is None:
-                return FallbackLLM().generate(prompt)
+            response = self.limitador.ejecutar(
+                lambda: self._client.invoke(mensajes), estimar_tokens(prompt), self.model
+            )
+        except ErrorLLM as e:
+            logger.error(f"Error en generacion: {e}")
+            self._contar_llamada("error")
+            raise
+        self._medir_llamada(inicio)
+        self._guardar_en_cache(clave, response.content, validar)
+        return response.content
 
-            from langchain.schema import HumanMessage
+    async def agenerate(
+        self, prompt: str, validar: Optional[Callable[[str], bool]] = None
+    ) -> str:
+        """Version asincrona de generate, basada en ainvoke"""
+        if not self.disponible:
+            return self.generate(prompt, validar)
 
-            response = self._client.invoke([HumanMessage(content=prompt)])
-            return response.content
-        except Exception as e:
+        clave, respuesta = self._buscar_en_cache(prompt)
+        if respuesta is not None:
+            self._contar_llamada("cache")
+            return respuesta
+
+        if self._vuelos is None:
+            return await self._allamar(prompt, clave, validar)
+        return await self._vuelos.aejecutar(
+            clave or self._clave(prompt),
+            lambda: self._allamar(prompt, clave, validar),
+        )
+
+    async def _allamar(
+        self,
+        prompt: str,
+        clave: Optional[str],
+        validar: Optional[Callable[[str], bool]] = None,
+    ) -> str:
+        mensajes = self._mensajes(prompt)
+        inicio = time.perf_counter()
+        try:
+            response = await self.limitador.aejecutar(
+                lambda: self._client.ainvoke(mensajes), estimar_tokens(prompt), self.model
+            )
+        except ErrorLLM as e:
             logger.error(f"Error en generacion: {e}")
-            return f"{{'error': '{str(e)}'}}"
+            self._contar_llamada("error")
+            raise
+        self._medir_llamada(inicio)
+        self._guardar_en_cache(clave, response.content, validar)
+        return response.content
+
+    def _mensajes(self, prompt: str):
+        if isinstance(self._client, LLMSimulado):
+            return prompt
+        return [clase_mensaje_humano()(content=prompt)]
+
+    def _contar_llamada(self, resultado: str):
+        METRICAS.incrementar(
+            "llm_llamadas_total", {"modelo": self.model, "resultado": resultado}
+        )
+
+    def _medir_llamada(self, inicio: float):
+        METRICAS.observar(
+            "llm_duracion_ms",
+            (time.perf_counter() - inicio) * 1000,
+            {"modelo": self.model},
+        )
+        self._contar_llamada("ok")
+
+    def _clave(self, prompt: str) -> str:
+        return CacheRespuestasLLM.clave(self.model, self.temperature, prompt)
+
+    def _buscar_en_cache(self, prompt: str) -> tuple[Optional[str], Optional[str]]:
+        if self.cache is None or not self.disponible:
+            return None, None
+        clave = self._clave(prompt)
+        return clave, self.cache.obtener(clave)
+
+    def _guardar_en_cache(
+        self,
+        clave: Optional[str],
+        respuesta: str,
+        validar: Optional[Callable[[str], bool]] = None,
+    ):
+        if clave is None:
+            return
+        if validar is not None and not validar(respuesta):
+            METRICAS.incrementar("llm_cache_descartes_total", {"modelo": self.model})
+            return
+        self.cache.guardar(clave, respuesta)
 
     def generate_json(self, prompt: str) -> dict:
         """Genera respuesta en formato JSON"""
-        prompt_json = prompt + "\n\nResponde SOLO con JSON valido, sin texto adicional."
-        respuesta = self.generate(prompt_json)
+        respuesta = self.generate(self._prompt_json(prompt), validar=self._es_json)
+        return self._parsear_json_contando(respuesta)
+
+    async def agenerate_json(self, prompt: str) -> dict:
+        """Version asincrona de generate_json"""
+        respuesta = await self.agenerate(
+            self._prompt_json(prompt), validar=self._es_json
+        )
+        return self._parsear_json_contando(respuesta)
+
+    def _parsear_json_contando(self, respuesta: str) -> dict:
+        resultado = self._parsear_json(respuesta)
+        if "raw_response" in resultado:
+            METRICAS.incrementar("llm_json_invalido_total", {"modelo": self.model})
+        return resultado
 
+    @staticmethod
+    def _prompt_json(prompt: str) -> str:
+        return prompt + "\n\nResponde SOLO con JSON valido, sin texto adicional."
+
+    @staticmethod
+    def _es_json(respuesta: str) -> bool:
+        """Indica si _parsear_json encontraria un objeto JSON valido"""
+        inicio = respuesta.find("{")
+        fin = respuesta.rfind("}") + 1
+        if inicio == -1 or fin <= inicio:
+            return False
         try:
-            import json
+            json.loads(respuesta[inicio:fin])
+        except ValueError:
+            return False
+        return True
 
+    @staticmethod
+    def _parsear_json(respuesta: str) -> dict:
+        try:
             inicio = respuesta.find("{")
             fin = respuesta.rfind("}") + 1
             if inicio != -1 and fin > inicio:
@@ -69,6 +257,14 @@ class LLMClient:
         return self._client is not None and not isinstance(self._client, FallbackLLM)
 
 
+@lru_cache(maxsize=None)
+def clase_mensaje_humano():
+    """Importa HumanMessage la primera vez que se usa un LLM real"""
+    from langchain.schema import HumanMessage
+
+    return HumanMessage
+
+
 class FallbackLLM:
     """Fallback para testing sin API"""
 
@@ -84,6 +280,49 @@ class FallbackLLM:
         return '{"resultado": "simulado"}'
 
 
-def create_llm_client(api_key: Optional[str] = None, model: str = "gpt-4") -> LLMClient:
-    """Factory para crear cliente LLM"""
-    return LLMClient(api_key=api_key, model=model)
+def create_llm_client(
+    api_key: Optional[str] = None,
+    model: str = "gpt-4",
+    cache: Optional[CacheRespuestasLLM] = None,
+    usar_cache: bool = True,
+    simulacion: Optional[ConfiguracionSimulacion] = None,
+    limites: Optional[ConfiguracionLimites] = None,
+    limitador: Optional[LimitadorLLM] = None,
+) -> LLMClient:
+    """
+    Factory para crear cliente LLM (por defecto con el cache compartido CACHE_LLM)
+
+    Un cliente simulado usa un cache propio para no mezclar sus respuestas
+    con las del proveedor real. Con `limites` y sin `limitador`, los
+    clientes reales de la misma (api_key, modelo) comparten el limitador
+    de obtener_limitador; los simulados tienen uno propio salvo que se
+    pase `limitador`.
+    """
+    if usar_cache and cache is None:
+        cache = CACHE_LLM if simulacion is None else CacheRespuestasLLM()
+    if limitador is None and limites is not None and simulacion is None:
+        limitador = obtener_limitador(api_key, model, limites)
+    return LLMClient(
+        api_key=api_key,
+        model=model,
+        cache=cache if usar_cache else None,
+        simulacion=simulacion,
+        limites=limites,
+        limitador=limitador,
+    )
+
+
+_REGISTRO_CLIENTES = RegistroLRU(max_entradas=8)
+
+
+def obtener_llm_client(api_key: Optional[str] = None, model: str = "gpt-4") -> LLMClient:
+    """Devuelve un cliente LLM compartido por (hash de api_key, modelo)"""
+    return _REGISTRO_CLIENTES.obtener(
+        clave_configuracion(api_key, model),
+        lambda: create_llm_client(api_key=api_key, model=model),
+    )
+
+
+def limpiar_registro_clientes():
+    """Descarta los clientes LLM retenidos"""
+    _REGISTRO_CLIENTES.limpiar()
@@ -0,0 +1,243 @@
+"""
+Backend LLM simulado para pruebas de carga sin red.
+
+Imita la interfaz invoke/ainvoke de los chat models de LangChain con
+latencia configurable (fija, uniforme, normal o lognormal, con jitter),
+inyeccion de errores, limites de tasa y timeouts, y respuestas JSON que
+cumplen el esquema de cada prompt de agente_base.PROMPTS. Las respuestas
+son deterministas por prompt, de modo que el cache se comporta igual que
+con un proveedor real.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Optional
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+import logging
+
+from reglas import get_clasificacion
+
+logger = logging.getLogger(__name__)
+
+DISTRIBUCIONES = ("fija", "uniforme", "normal", "lognormal")
+NIVELES = ["junior", "semi-senior", "senior", "staff", "principal"]
+
+
+class ErrorLLMSimulado(Exception):
+    """Error inyectado por el backend simulado"""
+
+
+class LimiteTasaSimulado(ErrorLLMSimulado):
+    """Equivalente simulado a un HTTP 429 del proveedor"""
+
+
+@dataclass
+class ConfiguracionSimulacion:
+    """
+    Parametros del backend simulado.
+
+    Args:
+        latencia_ms: Latencia media de cada llamada
+        distribucion: fija, uniforme, normal o lognormal
+        jitter_ms: Semiancho (uniforme) o desviacion (normal/lognormal)
+        tasa_error: Probabilidad de que una llamada lance ErrorLLMSimulado
+        tasa_limite: Probabilidad de que una llamada lance LimiteTasaSimulado
+        tasa_timeout: Probabilidad de que una llamada se cuelgue timeout_s
+            segundos y termine con TimeoutError
+        timeout_s: Duracion de las llamadas colgadas
+        semilla: Semilla del generador de latencias y fallos
+    """
+
+    latencia_ms: float = 800
+    distribucion: str = "lognormal"
+    jitter_ms: float = 200
+    tasa_error: float = 0.0
+    tasa_limite: float = 0.0
+    tasa_timeout: float = 0.0
+    timeout_s: float = 30.0
+    semilla: Optional[int] = None
+
+    def __post_init__(self):
+        if self.distribucion not in DISTRIBUCIONES:
+            raise ValueError(
+                f"distribucion debe ser una de {DISTRIBUCIONES}: {self.distribucion}"
+            )
+
+
+@dataclass
+class RespuestaSimulada:
+    content: str
+
+
+class LLMSimulado:
+    """Chat model simulado con invoke/ainvoke"""
+
+    def __init__(self, config: Optional[ConfiguracionSimulacion] = None):
+        self.config = config or ConfiguracionSimulacion()
+        self._rng = random.Random(self.config.semilla)
+        self._lock = threading.Lock()
+        self.contadores = {"llamadas": 0, "errores": 0, "limites": 0, "timeouts": 0}
+
+    def invoke(self, mensajes: Any) -> RespuestaSimulada:
+        espera, fallo = self._sortear()
+        time.sleep(espera)
+        if fallo is not None:
+            raise fallo
+        return RespuestaSimulada(responder(_texto(mensajes)))
+
+    async def ainvoke(self, mensajes: Any) -> RespuestaSimulada:
+        import asyncio
+
+        espera, fallo = self._sortear()
+        await asyncio.sleep(espera)
+        if fallo is not None:
+            raise fallo
+        return RespuestaSimulada(responder(_texto(mensajes)))
+
+    def _sortear(self) -> tuple[float, Optional[Exception]]:
+        """Segundos de espera y, si toca, la excepcion a lanzar"""
+        c = self.config
+        with self._lock:
+            self.contadores["llamadas"] += 1
+            azar = self._rng.random()
+            if azar < c.tasa_timeout:
+                self.contadores["timeouts"] += 1
+                return c.timeout_s, TimeoutError("timeout simulado del proveedor")
+            azar -= c.tasa_timeout
+            if azar < c.tasa_limite:
+                self.contadores["limites"] += 1
+                return 0.0, LimiteTasaSimulado("limite de tasa simulado (429)")
+            azar -= c.tasa_limite
+            latencia = self._latencia_ms()
+            if azar < c.tasa_error:
+                self.contadores["errores"] += 1
+                return latencia / 1000, ErrorLLMSimulado("error simulado del proveedor")
+            return latencia / 1000, None
+
+    def _latencia_ms(self) -> float:
+        c = self.config
+        if c.distribucion == "fija":
+            latencia = c.latencia_ms
+        elif c.distribucion == "uniforme":
+            latencia = self._rng.uniform(
+                c.latencia_ms - c.jitter_ms, c.latencia_ms + c.jitter_ms
+            )
+        elif c.distribucion == "normal":
+            latencia = self._rng.gauss(c.latencia_ms, c.jitter_ms)
+        else:
+            # Parametros de la normal subyacente para media y desviacion dadas
+            media = max(c.latencia_ms, 1e-3)
+            sigma2 = math.log1p((c.jitter_ms / media) ** 2)
+            latencia = self._rng.lognormvariate(
+                math.log(media) - sigma2 / 2, math.sqrt(sigma2)
+            )
+        return max(0.0, latencia)
+
+
+def _texto(mensajes: Any) -> str:
+    if isinstance(mensajes, str):
+        return mensajes
+    return "\n".join(getattr(m, "content", str(m)) for m in mensajes)
+
+
+def _campo(prompt: str, etiqueta: str) -> str:
+    coincidencia = re.search(rf"^{re.escape(etiqueta)}:[ \t]*(.*)$", prompt, re.M)
+    return coincidencia.group(1).strip() if coincidencia else ""
+
+
+def _cv(prompt: str) -> str:
+    coincidencia = re.search(
+        r"^CV:\n(.*?)(?=\n(?:Stack requerido|Nivel solicitado|Responde SOLO)|\Z)",
+        prompt,
+        re.S | re.M,
+    )
+    return coincidencia.group(1) if coincidencia else ""
+
+
+def _lista(valor: str) -> list[str]:
+    return [v.strip() for v in valor.split(",") if v.strip()]
+
+
+def responder(prompt: str) -> str:
+    """
+    Respuesta JSON que cumple el esquema del prompt recibido.
+
+    El tipo de prompt se reconoce por la primera linea de cada plantilla de
+    PROMPTS; los valores se derivan del contenido y de un generador con
+    semilla en el hash del prompt.
+    """
+    from agentes_especializados import AUTOMATA_SKILLS, coincide_skill
+
+    rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).digest())
+    cv = _cv(prompt)
+    skills_cv = AUTOMATA_SKILLS.skills(cv)
+    stack = _lista(_campo(prompt, "Stack requerido"))
+
+    def _skills() -> dict:
+        experiencia = rng.randint(0, 12)
+        return {
+            "skills_tecnicas": skills_cv,
+            "skills_blandas": rng.sample(
+                ["comunicacion", "liderazgo", "trabajo en equipo"], k=rng.randint(0, 2)
+            ),
+            "experiencia_anios": experiencia,
+            "nivel_autodetectado": NIVELES[min(4, experiencia // 3)],
+        }
+
+    def _seniority() -> dict:
+        experiencia = rng.randint(0, 12)
+        nivel = NIVELES[min(4, experiencia // 3)]
+        return {
+            "seniority_estimado": nivel,
+            "experiencia_detectada": experiencia,
+            "fundamento": "respuesta simulada",
+            "coherente": nivel == (_campo(prompt, "Nivel solicitado") or nivel),
+            "indicadores_encontrados": [],
+        }
+
+    def _brechas() -> dict:
+        coincidentes = [
+            r for r in stack if any(coincide_skill(r.lower(), s) for s in skills_cv)
+        ]
+        return {
+            "brechas_criticas": [r for r in stack if r not in coincidentes],
+            "brechas_deseables": [],
+            "skills_coincidentes": coincidentes,
+            "evaluacion_global": "respuesta simulada",
+        }
+
+    def _match() -> dict:
+        tecnico = round(rng.uniform(0, 100), 1)
+        seniority = rng.choice([0, 50, 100])
+        porcentaje = round(tecnico * 0.7 + seniority * 0.3, 1)
+        return {
+            "porcentaje_match": porcentaje,
+            "match_tecnico": tecnico,
+            "match_seniority": seniority,
+            "clasificacion": get_clasificacion(porcentaje),
+            "resumen": "respuesta simulada",
+        }
+
+    if "Evalua este candidato contra el puesto" in prompt:
+        respuesta = {
+            "analista_skills": _skills(),
+            "evaluador_seniority": _seniority(),
+            "detector_brechas": _brechas(),
+            "calculador_match": _match(),
+        }
+    elif "Analiza el siguiente CV" in prompt:
+        respuesta = _skills()
+    elif "Evalua el seniority" in prompt:
+        respuesta = _seniority()
+    elif "Detecta las brechas" in prompt:
+        respuesta = _brechas()
+    elif "Calcula el porcentaje de match" in prompt:
+        respuesta = _match()
+    else:
+        respuesta = {"resultado": "simulado"}
+    return json.dumps(respuesta, ensure_ascii=False)
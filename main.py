@@ -4,7 +4,9 @@ Evaluador de CV - Sistema Multiagente con LangChain
 Funcion principal para evaluar candidatos tecnicos.
 """
 
-from typing import Optional
+from typing import Hashable, Iterable, Iterator, Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from datetime import datetime
 import logging
 import json
 
@@ -12,10 +14,13 @@ from modelos import ResultadoEvaluacion, ResultadoCompleto, RequisitosPuesto
 from agente_coordinador import (
     AgenteCoordinador,
     crear_coordinador,
+    obtener_coordinador,
     ConfiguracionEvaluacion,
 )
+from indice_corpus import IndiceCorpus
+from escritor_jsonl import EscritorJSONL
+from templates import EXPERIENCIA_MINIMA, NIVELES_DEFAULT, STACKS_REQUERIDOS
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -58,11 +63,7 @@ def evaluar_cv(
     """
     logger.info(f"Iniciando evaluacion para nivel: {nivel_solicitado}")
 
-    config = ConfiguracionEvaluacion(
-        api_key=api_key, modelo=modelo, usar_langchain=api_key is not None
-    )
-
-    coordinador = AgenteCoordinador(config)
+    coordinador = obtener_coordinador(api_key=api_key, modelo=modelo)
 
     resultado_completo = coordinador.evaluar(
         cv_texto=cv_texto,
@@ -78,6 +79,245 @@ def evaluar_cv(
     return resultado_completo.resultado
 
 
+def evaluar_lote(
+    cvs: list[str],
+    stack_requerido: list[str],
+    nivel_solicitado: str,
+    experiencia_minima: int = 0,
+    habilidades_blandas: list[str] | None = None,
+    api_key: str | None = None,
+    modelo: str = "gpt-4",
+    devolver_trazabilidad: bool = False,
+    max_workers: int = 4,
+) -> list[ResultadoEvaluacion | ResultadoCompleto]:
+    """
+    Evalua varios CVs contra los mismos requisitos del puesto.
+
+    Usa un unico AgenteCoordinador (y su cliente LLM) y reparte los CVs
+    en un pool de hilos. Un error en un CV no afecta al resto: ese elemento
+    se devuelve como resultado de error.
+
+    Args:
+        cvs: Lista de CVs en texto plano
+        stack_requerido: Lista de tecnologias/skills requeridas
+        nivel_solicitado: Nivel buscado (junior/semi-senior/senior/staff/principal)
+        experiencia_minima: Anos de experiencia minimos requeridos
+        habilidades_blandas: Habilidades blandas requeridas
+        api_key: Clave API de OpenAI (opcional)
+        modelo: Modelo a usar (default: gpt-4)
+        devolver_trazabilidad: Si True, devuelve ResultadoCompleto con trazabilidad
+        max_workers: Numero de hilos del pool
+
+    Returns:
+        Lista de resultados en el mismo orden que `cvs`
+    """
+    logger.info(f"Iniciando evaluacion por lote de {len(cvs)} CVs")
+
+    coordinador = obtener_coordinador(api_key=api_key, modelo=modelo)
+
+    def _evaluar_uno(cv_texto: str) -> ResultadoCompleto:
+        return _evaluar_protegido(
+            coordinador,
+            cv_texto,
+            stack_requerido,
+            nivel_solicitado,
+            experiencia_minima,
+            habilidades_blandas,
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        resultados = list(executor.map(_evaluar_uno, cvs))
+
+    if devolver_trazabilidad:
+        return resultados
+
+    return [r.resultado for r in resultados]
+
+
+def evaluar_lote_jsonl(
+    cvs: Iterable[str],
+    ruta_salida: str,
+    stack_requerido: list[str],
+    nivel_solicitado: str,
+    experiencia_minima: int = 0,
+    habilidades_blandas: list[str] | None = None,
+    api_key: str | None = None,
+    modelo: str = "gpt-4",
+    incluir_trazabilidad: bool = False,
+    max_workers: int = 4,
+    lote_flush: int = 100,
+) -> int:
+    """
+    Evalua un lote de CVs escribiendo cada resultado en un JSONL al terminar.
+
+    A diferencia de evaluar_lote, no acumula resultados (ver
+    iterar_evaluaciones); cada linea se escribe en orden de finalizacion
+    con su "indice" en la entrada.
+
+    Returns:
+        Numero de lineas escritas
+    """
+    logger.info(f"Iniciando evaluacion por lote hacia {ruta_salida}")
+
+    coordinador = obtener_coordinador(api_key=api_key, modelo=modelo)
+
+    with EscritorJSONL(
+        ruta_salida, lote_flush=lote_flush, incluir_trazabilidad=incluir_trazabilidad
+    ) as escritor:
+        for indice, resultado in iterar_evaluaciones(
+            coordinador,
+            enumerate(cvs),
+            stack_requerido,
+            nivel_solicitado,
+            experiencia_minima,
+            habilidades_blandas,
+            max_workers,
+        ):
+            escritor.escribir(resultado, indice=indice)
+
+    return escritor.lineas_escritas
+
+
+def iterar_evaluaciones(
+    coordinador: AgenteCoordinador,
+    cvs: Iterable[tuple[Hashable, str]],
+    stack_requerido: list[str],
+    nivel_solicitado: str,
+    experiencia_minima: int = 0,
+    habilidades_blandas: list[str] | None = None,
+    max_workers: int = 4,
+) -> Iterator[tuple[Hashable, ResultadoCompleto]]:
+    """
+    Evalua pares (cv_id, texto) en un pool de hilos y los va devolviendo.
+
+    Los CVs se leen del iterable a medida que hay hueco en el pool (como
+    mucho 2 * max_workers en curso) y los resultados salen en orden de
+    finalizacion, de modo que la memoria no depende del tamano del lote.
+    """
+    max_workers = max(1, max_workers)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        en_curso = {}
+        for cv_id, cv_texto in cvs:
+            if len(en_curso) >= 2 * max_workers:
+                hechos, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+                for futuro in hechos:
+                    yield en_curso.pop(futuro), futuro.result()
+            futuro = executor.submit(
+                _evaluar_protegido,
+                coordinador,
+                cv_texto,
+                stack_requerido,
+                nivel_solicitado,
+                experiencia_minima,
+                habilidades_blandas,
+            )
+            en_curso[futuro] = cv_id
+
+        for futuro in as_completed(list(en_curso)):
+            yield en_curso.pop(futuro), futuro.result()
+
+
+def _evaluar_protegido(
+    coordinador: AgenteCoordinador,
+    cv_texto: str,
+    stack_requerido: list[str],
+    nivel_solicitado: str,
+    experiencia_minima: int,
+    habilidades_blandas: list[str] | None,
+) -> ResultadoCompleto:
+    """Evalua un CV de un lote; un error se devuelve como resultado de error"""
+    try:
+        return coordinador.evaluar(
+            cv_texto=cv_texto,
+            stack_requerido=stack_requerido,
+            nivel_solicitado=nivel_solicitado,
+            experiencia_minima=experiencia_minima,
+            habilidades_blandas=habilidades_blandas or [],
+        )
+    except Exception as e:
+        logger.error(f"Error evaluando CV del lote: {e}")
+        return coordinador._crear_resultado_error(str(e), datetime.now())
+
+
+def evaluar_corpus(
+    indice: IndiceCorpus,
+    requisitos: RequisitosPuesto,
+    min_skills: int | None = 1,
+    api_key: str | None = None,
+    modelo: str = "gpt-4",
+    devolver_trazabilidad: bool = False,
+    max_workers: int = 4,
+) -> dict[Hashable, ResultadoEvaluacion | ResultadoCompleto]:
+    """
+    Evalua solo los CVs del corpus preseleccionados por el indice invertido.
+
+    Args:
+        indice: Indice con los CVs historicos
+        requisitos: Requisitos del puesto
+        min_skills: Minimo de skills requeridas que debe cubrir un CV
+            (None = todo el stack)
+        api_key: Clave API de OpenAI (opcional)
+        modelo: Modelo a usar (default: gpt-4)
+        devolver_trazabilidad: Si True, devuelve ResultadoCompleto con trazabilidad
+        max_workers: Numero de hilos del pool
+
+    Returns:
+        Diccionario cv_id -> resultado, ordenado por cobertura descendente
+    """
+    preseleccion = [cv_id for cv_id, _ in indice.buscar(requisitos, min_skills)]
+
+    resultados = evaluar_lote(
+        cvs=[indice.obtener_texto(cv_id) for cv_id in preseleccion],
+        stack_requerido=requisitos.stack_tecnico,
+        nivel_solicitado=requisitos.nivel_solicitado,
+        experiencia_minima=requisitos.experiencia_minima_anios,
+        habilidades_blandas=requisitos.habilidades_blandas,
+        api_key=api_key,
+        modelo=modelo,
+        devolver_trazabilidad=devolver_trazabilidad,
+        max_workers=max_workers,
+    )
+
+    return dict(zip(preseleccion, resultados))
+
+
+def requisitos_desde_dict(datos: dict) -> RequisitosPuesto:
+    """
+    Requisitos del puesto desde un diccionario.
+
+    Acepta las claves de evaluar_cv_desde_dict (stack_requerido o
+    stack_tecnico, nivel_solicitado, experiencia_minima,
+    habilidades_blandas) y, opcionalmente, "perfil" con un nombre de
+    templates.py como base; las claves presentes sobrescriben el perfil.
+    """
+    base: dict = {}
+    perfil = datos.get("perfil")
+    if perfil is not None:
+        if perfil not in STACKS_REQUERIDOS:
+            raise ValueError(
+                f"Perfil desconocido: {perfil}. Disponibles: {sorted(STACKS_REQUERIDOS)}"
+            )
+        base = {
+            "stack_requerido": STACKS_REQUERIDOS[perfil],
+            "nivel_solicitado": NIVELES_DEFAULT.get(perfil, "senior"),
+            "experiencia_minima": EXPERIENCIA_MINIMA.get(perfil, 0),
+        }
+    datos = {k: v for k, v in datos.items() if v is not None}
+    if "stack_tecnico" in datos:
+        datos.setdefault("stack_requerido", datos["stack_tecnico"])
+    datos = {**base, **datos}
+
+    if not datos.get("stack_requerido") or not datos.get("nivel_solicitado"):
+        raise ValueError("El puesto necesita stack_requerido y nivel_solicitado")
+
+    return RequisitosPuesto(
+        stack_tecnico=list(datos["stack_requerido"]),
+        nivel_solicitado=datos["nivel_solicitado"],
+        experiencia_minima_anios=int(datos.get("experiencia_minima", 0)),
+        habilidades_blandas=list(datos.get("habilidades_blandas") or []),
+    )
+
+
 def evaluar_cv_desde_dict(datos: dict) -> dict:
     """
     Evalua un CV desde un diccionario.
@@ -89,6 +329,7 @@ def evaluar_cv_desde_dict(datos: dict) -> dict:
             - nivel_solicitado: nivel requerido
             - experiencia_minima: (opcional) anos minimos
             - api_key: (opcional) API key
+            - modelo: (opcional) modelo a usar
 
     Returns:
         Diccionario con el resultado en JSON
@@ -100,6 +341,7 @@ def evaluar_cv_desde_dict(datos: dict) -> dict:
         experiencia_minima=datos.get("experiencia_minima", 0),
         habilidades_blandas=datos.get("habilidades_blandas", []),
         api_key=datos.get("api_key"),
+        modelo=datos.get("modelo", "gpt-4"),
     )
 
     return {
@@ -185,4 +427,5 @@ def ejemplo_ejecucion():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     ejemplo_ejecucion()
@@ -0,0 +1,248 @@
+"""
+Registro de metricas del camino caliente.
+
+Histogramas de latencia (en ms, medidos con perf_counter), contadores y
+medidores con etiquetas, seguros entre hilos. Se exportan en formato de texto de
+Prometheus o como instantanea JSON, que puede volcarse periodicamente a
+un fichero. Los percentiles p50/p95/p99 se estiman por interpolacion
+dentro de los buckets, asi la memoria no depende del numero de muestras.
+"""
+
+from datetime import datetime
+from typing import Optional
+import json
+import math
+import os
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+BUCKETS_MS = (
+    1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, math.inf
+)
+PERCENTILES = (0.5, 0.95, 0.99)
+
+Etiquetas = tuple[tuple[str, str], ...]
+
+
+class HistogramaLatencia:
+    """Histograma de buckets acumulables al estilo Prometheus"""
+
+    def __init__(self, limites: tuple = BUCKETS_MS):
+        self.limites = limites
+        self.cuentas = [0] * len(limites)
+        self.total = 0
+        self.suma = 0.0
+        self.maximo = 0.0
+
+    def observar(self, valor: float):
+        for i, limite in enumerate(self.limites):
+            if valor <= limite:
+                self.cuentas[i] += 1
+                break
+        self.total += 1
+        self.suma += valor
+        self.maximo = max(self.maximo, valor)
+
+    def percentil(self, q: float) -> float:
+        """Estimacion del percentil q (0-1) interpolando dentro del bucket"""
+        if not self.total:
+            return 0.0
+        objetivo = q * self.total
+        acumulado = 0
+        inferior = 0.0
+        for limite, cuenta in zip(self.limites, self.cuentas):
+            if cuenta and acumulado + cuenta >= objetivo:
+                superior = min(limite, self.maximo)
+                fraccion = (objetivo - acumulado) / cuenta
+                return inferior + (superior - inferior) * fraccion
+            acumulado += cuenta
+            inferior = limite
+        return self.maximo
+
+    def resumen(self) -> dict:
+        return {
+            "count": self.total,
+            "sum": round(self.suma, 3),
+            "max": round(self.maximo, 3),
+            **{f"p{round(q * 100)}": round(self.percentil(q), 3) for q in PERCENTILES},
+        }
+
+
+def _clave_etiquetas(etiquetas: Optional[dict]) -> Etiquetas:
+    return tuple(sorted((k, str(v)) for k, v in (etiquetas or {}).items()))
+
+
+def _formatear_etiquetas(etiquetas: Etiquetas, extra: Etiquetas = ()) -> str:
+    pares = [*etiquetas, *extra]
+    if not pares:
+        return ""
+    escapar = (
+        lambda v: v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    )
+    return "{" + ",".join(f'{k}="{escapar(v)}"' for k, v in pares) + "}"
+
+
+def _formatear_limite(limite: float) -> str:
+    return "+Inf" if math.isinf(limite) else f"{limite:g}"
+
+
+class RegistroMetricas:
+    """
+    Histogramas y contadores identificados por nombre y etiquetas.
+
+    Args:
+        prefijo: Prefijo de los nombres en la exportacion Prometheus
+    """
+
+    def __init__(self, prefijo: str = "evaluador_cv"):
+        self.prefijo = prefijo
+        self._histogramas: dict[str, dict[Etiquetas, HistogramaLatencia]] = {}
+        self._contadores: dict[str, dict[Etiquetas, float]] = {}
+        self._medidores: dict[str, dict[Etiquetas, float]] = {}
+        self._lock = threading.Lock()
+        self._volcado: Optional[threading.Thread] = None
+        self._detener_volcado = threading.Event()
+
+    def observar(self, nombre: str, valor_ms: float, etiquetas: Optional[dict] = None):
+        """Registra una latencia en el histograma nombre/etiquetas"""
+        clave = _clave_etiquetas(etiquetas)
+        with self._lock:
+            serie = self._histogramas.setdefault(nombre, {})
+            histograma = serie.get(clave)
+            if histograma is None:
+                histograma = serie[clave] = HistogramaLatencia()
+            histograma.observar(valor_ms)
+
+    def incrementar(
+        self, nombre: str, etiquetas: Optional[dict] = None, valor: float = 1
+    ):
+        clave = _clave_etiquetas(etiquetas)
+        with self._lock:
+            serie = self._contadores.setdefault(nombre, {})
+            serie[clave] = serie.get(clave, 0) + valor
+
+    def contador(self, nombre: str, etiquetas: Optional[dict] = None) -> float:
+        with self._lock:
+            return self._contadores.get(nombre, {}).get(_clave_etiquetas(etiquetas), 0)
+
+    def fijar(self, nombre: str, valor: float, etiquetas: Optional[dict] = None):
+        """Fija el valor actual de un medidor (p.ej. profundidad de una cola)"""
+        clave = _clave_etiquetas(etiquetas)
+        with self._lock:
+            self._medidores.setdefault(nombre, {})[clave] = valor
+
+    def medidor(self, nombre: str, etiquetas: Optional[dict] = None) -> float:
+        with self._lock:
+            return self._medidores.get(nombre, {}).get(_clave_etiquetas(etiquetas), 0)
+
+    def histograma(
+        self, nombre: str, etiquetas: Optional[dict] = None
+    ) -> Optional[dict]:
+        """Resumen (count, sum, max, p50, p95, p99) de un histograma"""
+        with self._lock:
+            histograma = self._histogramas.get(nombre, {}).get(
+                _clave_etiquetas(etiquetas)
+            )
+            return histograma.resumen() if histograma else None
+
+    def reiniciar(self):
+        with self._lock:
+            self._histogramas.clear()
+            self._contadores.clear()
+            self._medidores.clear()
+
+    def exportar_prometheus(self) -> str:
+        """Metricas en formato de texto de Prometheus"""
+        lineas = []
+        with self._lock:
+            for nombre, serie in sorted(self._contadores.items()):
+                metrica = f"{self.prefijo}_{nombre}"
+                lineas.append(f"# TYPE {metrica} counter")
+                for etiquetas, valor in sorted(serie.items()):
+                    lineas.append(f"{metrica}{_formatear_etiquetas(etiquetas)} {valor:g}")
+
+            for nombre, serie in sorted(self._medidores.items()):
+                metrica = f"{self.prefijo}_{nombre}"
+                lineas.append(f"# TYPE {metrica} gauge")
+                for etiquetas, valor in sorted(serie.items()):
+                    lineas.append(f"{metrica}{_formatear_etiquetas(etiquetas)} {valor:g}")
+
+            for nombre, serie in sorted(self._histogramas.items()):
+                metrica = f"{self.prefijo}_{nombre}"
+                lineas.append(f"# TYPE {metrica} histogram")
+                for etiquetas, histograma in sorted(serie.items()):
+                    acumulado = 0
+                    for limite, cuenta in zip(histograma.limites, histograma.cuentas):
+                        acumulado += cuenta
+                        le = (("le", _formatear_limite(limite)),)
+                        lineas.append(
+                            f"{metrica}_bucket{_formatear_etiquetas(etiquetas, le)} "
+                            f"{acumulado}"
+                        )
+                    sufijo = _formatear_etiquetas(etiquetas)
+                    lineas.append(f"{metrica}_sum{sufijo} {histograma.suma:g}")
+                    lineas.append(f"{metrica}_count{sufijo} {histograma.total}")
+        return "\n".join(lineas) + "\n"
+
+    def instantanea(self) -> dict:
+        """Estado actual como diccionario serializable a JSON"""
+        with self._lock:
+            return {
+                "timestamp": datetime.now().isoformat(),
+                "contadores": {
+                    nombre: [
+                        {"etiquetas": dict(etiquetas), "valor": valor}
+                        for etiquetas, valor in sorted(serie.items())
+                    ]
+                    for nombre, serie in sorted(self._contadores.items())
+                },
+                "medidores": {
+                    nombre: [
+                        {"etiquetas": dict(etiquetas), "valor": valor}
+                        for etiquetas, valor in sorted(serie.items())
+                    ]
+                    for nombre, serie in sorted(self._medidores.items())
+                },
+                "histogramas": {
+                    nombre: [
+                        {"etiquetas": dict(etiquetas), **histograma.resumen()}
+                        for etiquetas, histograma in sorted(serie.items())
+                    ]
+                    for nombre, serie in sorted(self._histogramas.items())
+                },
+            }
+
+    def escribir_instantanea(self, ruta: str):
+        """Escribe la instantanea JSON de forma atomica"""
+        temporal = f"{ruta}.tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(self.instantanea(), f, indent=2, ensure_ascii=False)
+        os.replace(temporal, ruta)
+
+    def iniciar_volcado_periodico(self, ruta: str, intervalo_segundos: float = 60):
+        """Escribe la instantanea en ruta cada intervalo_segundos (hilo daemon)"""
+        self.detener_volcado_periodico()
+        self._detener_volcado.clear()
+
+        def _volcar():
+            while not self._detener_volcado.wait(intervalo_segundos):
+                try:
+                    self.escribir_instantanea(ruta)
+                except Exception as e:
+                    logger.error(f"Error al volcar metricas: {e}")
+
+        self._volcado = threading.Thread(
+            target=_volcar, name="volcado-metricas", daemon=True
+        )
+        self._volcado.start()
+
+    def detener_volcado_periodico(self):
+        if self._volcado is not None:
+            self._detener_volcado.set()
+            self._volcado.join()
+            self._volcado = None
+
+
+METRICAS = RegistroMetricas()
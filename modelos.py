@@ -4,7 +4,6 @@ from typing import Optional
 import json
 import logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -41,21 +40,32 @@ class ResultadoEvaluacion:
     nivel_coherente: bool
     resumen_evaluacion: str
 
-    def to_json(self) -> str:
-        return json.dumps(
-            {
-                "porcentaje_match": self.porcentaje_match,
-                "seniority_estimado": self.seniority_estimado,
-                "brechas_tecnicas": self.brechas_tecnicas,
-                "skills_encontradas": self.skills_encontradas,
-                "skills_faltantes": self.skills_faltantes,
-                "nivel_coherente": self.nivel_coherente,
-                "resumen_evaluacion": self.resumen_evaluacion,
-            },
-            indent=2,
-            ensure_ascii=False,
+    def to_dict(self) -> dict:
+        return {
+            "porcentaje_match": self.porcentaje_match,
+            "seniority_estimado": self.seniority_estimado,
+            "brechas_tecnicas": self.brechas_tecnicas,
+            "skills_encontradas": self.skills_encontradas,
+            "skills_faltantes": self.skills_faltantes,
+            "nivel_coherente": self.nivel_coherente,
+            "resumen_evaluacion": self.resumen_evaluacion,
+        }
+
+    @classmethod
+    def from_dict(cls, datos: dict) -> "ResultadoEvaluacion":
+        return cls(
+            porcentaje_match=datos["porcentaje_match"],
+            seniority_estimado=datos["seniority_estimado"],
+            brechas_tecnicas=list(datos.get("brechas_tecnicas", [])),
+            skills_encontradas=list(datos.get("skills_encontradas", [])),
+            skills_faltantes=list(datos.get("skills_faltantes", [])),
+            nivel_coherente=datos.get("nivel_coherente", False),
+            resumen_evaluacion=datos.get("resumen_evaluacion", ""),
         )
 
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2, ensure_ascii=False)
+
 
 @dataclass
 class TrazabilidadAgente:
@@ -65,6 +75,7 @@ class TrazabilidadAgente:
     input_data: dict
     output_data: dict
     error: Optional[str] = None
+    fallback: Optional[str] = None
 
     def to_dict(self) -> dict:
         return {
@@ -74,8 +85,21 @@ class TrazabilidadAgente:
             "input": self.input_data,
             "output": self.output_data,
             "error": self.error,
+            "fallback": self.fallback,
         }
 
+    @classmethod
+    def from_dict(cls, datos: dict) -> "TrazabilidadAgente":
+        return cls(
+            agente=datos["agente"],
+            status=datos["status"],
+            duracion_ms=datos["duracion_ms"],
+            input_data=datos.get("input", {}),
+            output_data=datos.get("output", {}),
+            error=datos.get("error"),
+            fallback=datos.get("fallback"),
+        )
+
 
 @dataclass
 class ResultadoCompleto:
@@ -84,22 +108,25 @@ class ResultadoCompleto:
     metodo: str
     timestamp: str
 
-    def to_json(self) -> str:
-        return json.dumps(
-            {
-                "resultado": {
-                    "porcentaje_match": self.resultado.porcentaje_match,
-                    "seniority_estimado": self.resultado.seniority_estimado,
-                    "brechas_tecnicas": self.resultado.brechas_tecnicas,
-                    "skills_encontradas": self.resultado.skills_encontradas,
-                    "skills_faltantes": self.resultado.skills_faltantes,
-                    "nivel_coherente": self.resultado.nivel_coherente,
-                    "resumen_evaluacion": self.resultado.resumen_evaluacion,
-                },
-                "trazabilidad": [t.to_dict() for t in self.trazabilidad],
-                "metodo": self.metodo,
-                "timestamp": self.timestamp,
-            },
-            indent=2,
-            ensure_ascii=False,
+    def to_dict(self, incluir_trazabilidad: bool = True) -> dict:
+        datos = {"resultado": self.resultado.to_dict()}
+        if incluir_trazabilidad:
+            datos["trazabilidad"] = [t.to_dict() for t in self.trazabilidad]
+        datos["metodo"] = self.metodo
+        datos["timestamp"] = self.timestamp
+        return datos
+
+    @classmethod
+    def from_dict(cls, datos: dict) -> "ResultadoCompleto":
+        """Inversa de to_dict; admite datos sin trazabilidad"""
+        return cls(
+            resultado=ResultadoEvaluacion.from_dict(datos["resultado"]),
+            trazabilidad=[
+                TrazabilidadAgente.from_dict(t) for t in datos.get("trazabilidad", [])
+            ],
+            metodo=datos["metodo"],
+            timestamp=datos["timestamp"],
         )
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2, ensure_ascii=False)
@@ -0,0 +1,184 @@
+"""
+Motor de puntuacion matricial CV x puesto.
+
+Puntua M perfiles de CV ya extraidos contra J puestos compilados en una
+sola pasada vectorizada y devuelve matrices (M, J) con el porcentaje de
+match, el match de seniority, el numero de brechas y la clasificacion.
+Los valores son identicos a ejecutar AgenteDetectorBrechas._detectar_local
+y AgenteCalculadorMatch._calcular_local para cada par.
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence
+import logging
+
+import numpy as np
+
+from agentes_especializados import (
+    AgenteAnalistaSkills,
+    AgenteEvaluadorSeniority,
+    JERARQUIA_MATCH,
+)
+from bitset_skills import (
+    StackCompilado,
+    VocabularioSkills,
+    codificar_niveles,
+    tabla_puntajes,
+)
+from documento_cv import DocumentoCV
+from templates import STACKS_REQUERIDOS, NIVELES_DEFAULT
+
+logger = logging.getLogger(__name__)
+
+CLASIFICACIONES = ["no_recomendado", "regular", "bueno", "excelente"]
+
+
+@dataclass
+class PerfilPuesto:
+    nombre: str
+    stack_requerido: list[str]
+    nivel_solicitado: str
+
+
+@dataclass
+class ResultadoMatriz:
+    """Matrices (M, J); las filas son CVs y las columnas puestos"""
+
+    puestos: list[str]
+    porcentaje_match: np.ndarray
+    match_tecnico: np.ndarray
+    match_seniority: np.ndarray
+    n_brechas: np.ndarray
+    clasificacion: np.ndarray
+
+    def clasificacion_de(self, cv: int, puesto: int) -> str:
+        return CLASIFICACIONES[self.clasificacion[cv, puesto]]
+
+    def mejor_puesto(self) -> list[str]:
+        """Puesto con mayor porcentaje de match para cada CV"""
+        return [self.puestos[j] for j in self.porcentaje_match.argmax(axis=1)]
+
+
+def extraer_perfil_cv(cv_texto: str) -> dict:
+    """Extraccion local de skills y seniority, como en el flujo del coordinador"""
+    documento = DocumentoCV(cv_texto)
+    skills = AgenteAnalistaSkills(None)._extraer_local(documento)
+    seniority = AgenteEvaluadorSeniority(None)._evaluar_local(documento, "senior", 0)
+    return {
+        "skills_tecnicas": skills["skills_tecnicas"],
+        "seniority_estimado": seniority["seniority_estimado"],
+    }
+
+
+class MotorMatriz:
+    """
+    Compila J puestos y los puntua contra lotes de perfiles de CV.
+
+    Todos los stacks se concatenan en una unica matriz de mascaras, de modo
+    que la cobertura (M, K total) se calcula de una vez y se reduce por
+    puesto con np.add.reduceat.
+    """
+
+    def __init__(
+        self,
+        perfiles: Sequence[PerfilPuesto],
+        vocabulario: Optional[VocabularioSkills] = None,
+    ):
+        self.perfiles = list(perfiles)
+        self._compilar(vocabulario or VocabularioSkills.por_defecto())
+
+    @classmethod
+    def desde_templates(cls) -> "MotorMatriz":
+        """Motor con los perfiles de templates.STACKS_REQUERIDOS"""
+        return cls(
+            [
+                PerfilPuesto(nombre, stack, NIVELES_DEFAULT.get(nombre, "senior"))
+                for nombre, stack in STACKS_REQUERIDOS.items()
+            ]
+        )
+
+    def _compilar(self, vocabulario: VocabularioSkills):
+        self.vocabulario = vocabulario
+        todas_requeridas = [r for p in self.perfiles for r in p.stack_requerido]
+        self._stack = StackCompilado.compilar(vocabulario, todas_requeridas)
+
+        self._n_requeridas = np.array(
+            [len(p.stack_requerido) for p in self.perfiles], dtype=np.intp
+        )
+        self._inicios = np.concatenate(([0], np.cumsum(self._n_requeridas)[:-1]))
+
+        k_max = int(self._n_requeridas.max()) if self.perfiles else 0
+        forma = (len(self.perfiles), k_max + 1, len(JERARQUIA_MATCH))
+        self._tablas = {
+            "porcentaje_match": np.zeros(forma),
+            "match_tecnico": np.zeros(forma),
+            "match_seniority": np.zeros(forma),
+            "clasificacion": np.zeros(forma, dtype=np.int8),
+        }
+        for j, perfil in enumerate(self.perfiles):
+            tabla = tabla_puntajes(len(perfil.stack_requerido), perfil.nivel_solicitado)
+            k = len(perfil.stack_requerido) + 1
+            for clave in ("porcentaje_match", "match_tecnico", "match_seniority"):
+                self._tablas[clave][j, :k] = tabla[clave]
+            self._tablas["clasificacion"][j, :k] = np.vectorize(
+                CLASIFICACIONES.index, otypes=[np.int8]
+            )(tabla["clasificacion"])
+
+    def _asegurar_vocabulario(self, skills_cvs: Sequence[Iterable[str]]):
+        desconocidas = {
+            s
+            for skills in skills_cvs
+            for s in skills
+            if s.strip() and self.vocabulario.id_de(s) is None
+        }
+        if desconocidas:
+            logger.info(f"Ampliando vocabulario con {len(desconocidas)} skills")
+            self._compilar(
+                VocabularioSkills([*self.vocabulario.skills, *sorted(desconocidas)])
+            )
+
+    def puntuar(
+        self, skills_cvs: Sequence[Iterable[str]], seniority_cvs: Sequence[str]
+    ) -> ResultadoMatriz:
+        """
+        Puntua M CVs contra todos los puestos.
+
+        Args:
+            skills_cvs: Skills tecnicas de cada CV (p.ej. "skills_tecnicas")
+            seniority_cvs: Seniority estimado de cada CV
+
+        Returns:
+            ResultadoMatriz con matrices (M, J)
+        """
+        skills_cvs = [list(skills) for skills in skills_cvs]
+        self._asegurar_vocabulario(skills_cvs)
+
+        matriz_cv = self.vocabulario.codificar_lote(skills_cvs)
+        columna = codificar_niveles(seniority_cvs).astype(np.intp) - 1
+
+        n_cvs, n_puestos = len(skills_cvs), len(self.perfiles)
+        cubiertas = np.zeros((n_cvs, n_puestos), dtype=np.intp)
+        con_stack = self._n_requeridas > 0
+        if con_stack.any() and n_cvs:
+            cubre = self._stack.cobertura(matriz_cv).astype(np.intp)
+            cubiertas[:, con_stack] = np.add.reduceat(
+                cubre, self._inicios[con_stack], axis=1
+            )
+
+        puesto = np.arange(n_puestos)[None, :]
+        nivel = columna[:, None]
+        return ResultadoMatriz(
+            puestos=[p.nombre for p in self.perfiles],
+            porcentaje_match=self._tablas["porcentaje_match"][puesto, cubiertas, nivel],
+            match_tecnico=self._tablas["match_tecnico"][puesto, cubiertas, nivel],
+            match_seniority=self._tablas["match_seniority"][puesto, cubiertas, nivel],
+            n_brechas=self._n_requeridas[None, :] - cubiertas,
+            clasificacion=self._tablas["clasificacion"][puesto, cubiertas, nivel],
+        )
+
+    def puntuar_perfiles(self, perfiles_cv: Sequence[dict]) -> ResultadoMatriz:
+        """Puntua perfiles con claves skills_tecnicas y seniority_estimado"""
+        return self.puntuar(
+            [p.get("skills_tecnicas", []) for p in perfiles_cv],
+            [p.get("seniority_estimado", "senior") for p in perfiles_cv],
+        )
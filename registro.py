@@ -0,0 +1,83 @@
+"""
+Registro de objetos "calientes" reutilizables entre evaluaciones.
+
+Mantiene clientes LLM y coordinadores vivos entre llamadas para no
+reconstruir el cliente HTTP ni los agentes en cada evaluacion.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+import hashlib
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def clave_configuracion(api_key: Optional[str], modelo: str) -> tuple[str, str]:
+    """Construye la clave del registro sin guardar la API key en claro"""
+    api_key_hash = (
+        hashlib.sha256(api_key.encode("utf-8")).hexdigest() if api_key else ""
+    )
+    return (api_key_hash, modelo)
+
+
+class RegistroLRU:
+    """
+    Registro thread-safe con expulsion LRU y TTL por inactividad.
+
+    Args:
+        max_entradas: Numero maximo de objetos retenidos
+        ttl_segundos: Segundos sin uso tras los cuales se expulsa un objeto
+            (None para no expirar)
+    """
+
+    def __init__(self, max_entradas: int = 8, ttl_segundos: Optional[float] = 3600):
+        self.max_entradas = max_entradas
+        self.ttl_segundos = ttl_segundos
+        self._entradas: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: Hashable, fabrica: Callable[[], Any]) -> Any:
+        """Devuelve el objeto de `clave`, creandolo con `fabrica` si no existe"""
+        ahora = time.monotonic()
+        with self._lock:
+            self._expirar(ahora)
+            if clave in self._entradas:
+                valor, _ = self._entradas.pop(clave)
+                self._entradas[clave] = (valor, ahora)
+                return valor
+
+        nuevo = fabrica()
+
+        with self._lock:
+            if clave in self._entradas:
+                valor, _ = self._entradas.pop(clave)
+            else:
+                valor = nuevo
+            self._entradas[clave] = (valor, ahora)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                logger.info("Registro lleno, expulsando entrada menos usada")
+            return valor
+
+    def _expirar(self, ahora: float):
+        if self.ttl_segundos is None:
+            return
+        vencidas = [
+            clave
+            for clave, (_, ultimo_uso) in self._entradas.items()
+            if ahora - ultimo_uso > self.ttl_segundos
+        ]
+        for clave in vencidas:
+            del self._entradas[clave]
+
+    def limpiar(self):
+        """Vacia el registro"""
+        with self._lock:
+            self._entradas.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entradas)
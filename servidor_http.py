@@ -0,0 +1,505 @@
+"""
+Servicio HTTP de evaluacion sobre asyncio (solo biblioteca estandar).
+
+Expone el coordinador "caliente" de obtener_coordinador:
+
+    POST /evaluar   {"cv": ..., "stack_requerido": [...], "nivel_solicitado": ...}
+    POST /lote      {"cvs": [texto | {"id": ..., "cv": ...}], <requisitos>}
+    GET  /salud     profundidad de cola y evaluaciones en curso
+    GET  /metricas  METRICAS en formato Prometheus
+
+Los requisitos aceptan las claves de main.requisitos_desde_dict (incluido
+"perfil"). Los CVs que ya esperan en la cola se toman juntos en un
+micro-lote: los repetidos con los mismos requisitos se evaluan una sola
+vez y el lote se despacha de golpe al coordinador. Los duplicados que
+llegan mientras una evaluacion esta en curso los une el coordinador
+(config.coalescer), asi que por defecto no se espera a que lleguen mas
+(--ventana-ms 0). La cola es acotada; cuando se llena, el servidor
+responde 503.
+
+    python servidor_http.py --puerto 8080 --max-cola 1024
+"""
+
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Optional
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+from agente_coordinador import AgenteCoordinador, obtener_coordinador
+from main import requisitos_desde_dict
+from metricas import METRICAS
+from modelos import RequisitosPuesto
+
+logger = logging.getLogger(__name__)
+
+
+class ColaLlena(Exception):
+    """La cola de evaluaciones no admite mas peticiones"""
+
+
+class _ErrorHTTP(Exception):
+    def __init__(self, estado: int, mensaje: str):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+@dataclass
+class ConfiguracionServidor:
+    """
+    Configuracion del servicio.
+
+    Args:
+        ventana_lote_ms: Tiempo que espera el primer CV de un lote a que
+            lleguen mas antes de despachar; con 0 (por defecto) el lote es
+            lo que ya estaba en cola y no anade latencia
+        max_lote: CVs maximos por micro-lote
+        max_cola: CVs pendientes maximos; por encima se responde 503, y un
+            /lote con mas CVs que max_cola se rechaza con 413
+        max_en_curso: Evaluaciones simultaneas en el coordinador
+        timeout_peticion_s: Espera maxima de una peticion (504 al superarla)
+        timeout_conexion_s: Tiempo maximo esperando una peticion en una
+            conexion abierta (keep-alive)
+    """
+
+    host: str = "127.0.0.1"
+    puerto: int = 8080
+    api_key: Optional[str] = None
+    modelo: str = "gpt-4"
+    modo_fusionado: bool = False
+    ventana_lote_ms: float = 0.0
+    max_lote: int = 32
+    max_cola: int = 1024
+    max_en_curso: int = 64
+    timeout_peticion_s: float = 120.0
+    timeout_conexion_s: float = 30.0
+    max_cuerpo_bytes: int = 2_000_000
+
+
+@dataclass
+class _Pendiente:
+    cv_texto: str
+    requisitos: RequisitosPuesto
+    futuro: asyncio.Future
+    encolado: float = field(default_factory=time.perf_counter)
+
+    @property
+    def clave(self) -> tuple:
+        r = self.requisitos
+        return (
+            self.cv_texto,
+            tuple(r.stack_tecnico),
+            r.nivel_solicitado,
+            r.experiencia_minima_anios,
+            tuple(r.habilidades_blandas),
+        )
+
+
+class MicroLotes:
+    """
+    Cola acotada que agrupa evaluaciones en micro-lotes.
+
+    Un unico bucle toma el primer CV pendiente junto con los que ya estan
+    en cola, espera como mucho ventana_lote_ms a que lleguen mas (o hasta
+    max_lote CVs) y despacha el lote. Cada CV
+    distinto del lote se evalua en una tarea propia, limitadas a
+    max_en_curso; mientras no hay hueco el bucle no toma mas CVs y la cola
+    se llena, que es la senal de contrapresion hacia los clientes.
+    """
+
+    def __init__(self, coordinador: AgenteCoordinador, config: ConfiguracionServidor):
+        self.coordinador = coordinador
+        self.config = config
+        self._cola: asyncio.Queue = asyncio.Queue(maxsize=config.max_cola)
+        self._semaforo = asyncio.Semaphore(config.max_en_curso)
+        self._tareas: set[asyncio.Task] = set()
+        self._bucle: Optional[asyncio.Task] = None
+        self.en_curso = 0
+
+    def iniciar(self):
+        if self._bucle is None:
+            self._bucle = asyncio.ensure_future(self._consumir())
+
+    async def detener(self):
+        if self._bucle is not None:
+            self._bucle.cancel()
+            await asyncio.gather(self._bucle, return_exceptions=True)
+            self._bucle = None
+        if self._tareas:
+            await asyncio.gather(*self._tareas, return_exceptions=True)
+
+    @property
+    def profundidad(self) -> int:
+        return self._cola.qsize()
+
+    def plazas_libres(self) -> int:
+        return self.config.max_cola - self._cola.qsize()
+
+    def encolar(self, cv_texto: str, requisitos: RequisitosPuesto) -> asyncio.Future:
+        """Encola un CV; el futuro se resuelve con su ResultadoCompleto"""
+        pendiente = _Pendiente(
+            cv_texto, requisitos, asyncio.get_running_loop().create_future()
+        )
+        try:
+            self._cola.put_nowait(pendiente)
+        except asyncio.QueueFull:
+            METRICAS.incrementar("servidor_rechazos_total", {"motivo": "cola_llena"})
+            raise ColaLlena(f"Cola llena ({self.config.max_cola} CVs pendientes)")
+        self._publicar_estado()
+        return pendiente.futuro
+
+    async def _consumir(self):
+        loop = asyncio.get_running_loop()
+        ventana = self.config.ventana_lote_ms / 1000
+        while True:
+            lote = [await self._cola.get()]
+            while len(lote) < self.config.max_lote and not self._cola.empty():
+                lote.append(self._cola.get_nowait())
+            limite = loop.time() + ventana
+            while len(lote) < self.config.max_lote:
+                restante = limite - loop.time()
+                if restante <= 0:
+                    break
+                try:
+                    lote.append(await asyncio.wait_for(self._cola.get(), restante))
+                except asyncio.TimeoutError:
+                    break
+            self._publicar_estado()
+            await self._despachar(lote)
+
+    async def _despachar(self, lote: list[_Pendiente]):
+        grupos: dict[tuple, list[_Pendiente]] = {}
+        for pendiente in lote:
+            if not pendiente.futuro.done():
+                grupos.setdefault(pendiente.clave, []).append(pendiente)
+
+        METRICAS.incrementar("servidor_lotes_total")
+        METRICAS.incrementar("servidor_lote_cvs_total", valor=len(lote))
+        METRICAS.incrementar(
+            "servidor_lote_duplicados_total",
+            valor=sum(len(g) - 1 for g in grupos.values()),
+        )
+
+        for grupo in grupos.values():
+            await self._semaforo.acquire()
+            self.en_curso += 1
+            self._publicar_estado()
+            tarea = asyncio.ensure_future(self._evaluar(grupo))
+            self._tareas.add(tarea)
+            tarea.add_done_callback(self._tareas.discard)
+
+    async def _evaluar(self, grupo: list[_Pendiente]):
+        ahora = time.perf_counter()
+        for pendiente in grupo:
+            METRICAS.observar(
+                "servidor_espera_cola_ms", (ahora - pendiente.encolado) * 1000
+            )
+        r = grupo[0].requisitos
+        try:
+            resultado = await self.coordinador.aevaluar(
+                cv_texto=grupo[0].cv_texto,
+                stack_requerido=r.stack_tecnico,
+                nivel_solicitado=r.nivel_solicitado,
+                experiencia_minima=r.experiencia_minima_anios,
+                habilidades_blandas=r.habilidades_blandas,
+            )
+            for pendiente in grupo:
+                if not pendiente.futuro.done():
+                    pendiente.futuro.set_result(resultado)
+        except Exception as e:
+            logger.error(f"Error evaluando CV del micro-lote: {e}")
+            for pendiente in grupo:
+                if not pendiente.futuro.done():
+                    pendiente.futuro.set_exception(e)
+        finally:
+            self.en_curso -= 1
+            self._semaforo.release()
+            self._publicar_estado()
+
+    def _publicar_estado(self):
+        METRICAS.fijar("servidor_cola_profundidad", self._cola.qsize())
+        METRICAS.fijar("servidor_evaluaciones_en_curso", self.en_curso)
+
+
+class ServidorEvaluacion:
+    """Servidor HTTP/1.1 minimo (keep-alive, Content-Length) sobre asyncio"""
+
+    def __init__(
+        self,
+        config: Optional[ConfiguracionServidor] = None,
+        coordinador: Optional[AgenteCoordinador] = None,
+    ):
+        self.config = config or ConfiguracionServidor()
+        self.coordinador = coordinador or obtener_coordinador(
+            api_key=self.config.api_key,
+            modelo=self.config.modelo,
+            modo_fusionado=self.config.modo_fusionado,
+        )
+        self.lotes: Optional[MicroLotes] = None
+        self._servidor: Optional[asyncio.AbstractServer] = None
+        self.puerto: Optional[int] = None
+
+    async def iniciar(self):
+        """Arranca la cola y el socket; con puerto 0 se elige uno libre"""
+        self.lotes = MicroLotes(self.coordinador, self.config)
+        self.lotes.iniciar()
+        self._servidor = await asyncio.start_server(
+            self._atender, self.config.host, self.config.puerto
+        )
+        self.puerto = self._servidor.sockets[0].getsockname()[1]
+        logger.info(f"Servidor de evaluacion en http://{self.config.host}:{self.puerto}")
+
+    async def detener(self):
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+            self._servidor = None
+        if self.lotes is not None:
+            await self.lotes.detener()
+
+    async def servir(self):
+        await self.iniciar()
+        try:
+            await self._servidor.serve_forever()
+        finally:
+            await self.detener()
+
+    async def _atender(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        try:
+            while True:
+                try:
+                    peticion = await asyncio.wait_for(
+                        self._leer_peticion(reader), self.config.timeout_conexion_s
+                    )
+                except _ErrorHTTP as e:
+                    await self._responder(writer, e.estado, {"error": str(e)}, False)
+                    break
+                if peticion is None:
+                    break
+                metodo, ruta, cabeceras, cuerpo = peticion
+                mantener = cabeceras.get("connection", "").lower() != "close"
+
+                inicio = time.perf_counter()
+                try:
+                    estado, respuesta = await self._enrutar(metodo, ruta, cuerpo)
+                except _ErrorHTTP as e:
+                    estado, respuesta = e.estado, {"error": str(e)}
+                except Exception as e:
+                    logger.error(f"Error atendiendo {metodo} {ruta}: {e}")
+                    estado, respuesta = 500, {"error": "error interno"}
+                await self._responder(writer, estado, respuesta, mantener)
+                METRICAS.observar(
+                    "servidor_peticion_ms",
+                    (time.perf_counter() - inicio) * 1000,
+                    {"ruta": ruta, "estado": str(estado)},
+                )
+                if not mantener:
+                    break
+        except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _leer_peticion(self, reader: asyncio.StreamReader) -> Optional[tuple]:
+        try:
+            cabecera = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError:
+            raise _ErrorHTTP(431, "Cabeceras demasiado grandes")
+
+        lineas = cabecera.decode("latin-1").split("\r\n")
+        try:
+            metodo, objetivo, _ = lineas[0].split(" ", 2)
+        except ValueError:
+            raise _ErrorHTTP(400, "Linea de peticion invalida")
+        cabeceras = {}
+        for linea in lineas[1:]:
+            nombre, sep, valor = linea.partition(":")
+            if sep:
+                cabeceras[nombre.strip().lower()] = valor.strip()
+
+        try:
+            longitud = int(cabeceras.get("content-length", 0))
+        except ValueError:
+            raise _ErrorHTTP(400, "Content-Length invalido")
+        if longitud > self.config.max_cuerpo_bytes:
+            raise _ErrorHTTP(413, "Cuerpo demasiado grande")
+        cuerpo = await reader.readexactly(longitud) if longitud else b""
+        return metodo.upper(), objetivo.split("?", 1)[0], cabeceras, cuerpo
+
+    async def _enrutar(self, metodo: str, ruta: str, cuerpo: bytes) -> tuple:
+        rutas = {
+            ("GET", "/salud"): self._salud,
+            ("GET", "/metricas"): self._metricas,
+            ("POST", "/evaluar"): self._evaluar,
+            ("POST", "/lote"): self._lote,
+        }
+        manejador = rutas.get((metodo, ruta))
+        if manejador is None:
+            if any(r == ruta for _, r in rutas):
+                raise _ErrorHTTP(405, f"Metodo no permitido: {metodo}")
+            raise _ErrorHTTP(404, f"Ruta no encontrada: {ruta}")
+        return await manejador(cuerpo)
+
+    async def _salud(self, _cuerpo: bytes) -> tuple:
+        return 200, {
+            "estado": "ok",
+            "cola": self.lotes.profundidad,
+            "max_cola": self.config.max_cola,
+            "en_curso": self.lotes.en_curso,
+        }
+
+    async def _metricas(self, _cuerpo: bytes) -> tuple:
+        return 200, METRICAS.exportar_prometheus()
+
+    async def _evaluar(self, cuerpo: bytes) -> tuple:
+        datos = _json(cuerpo)
+        cv = datos.get("cv") or datos.get("cv_texto")
+        if not isinstance(cv, str) or not cv.strip():
+            raise _ErrorHTTP(400, "Falta el texto del CV ('cv')")
+        requisitos = _requisitos(datos)
+
+        try:
+            futuro = self.lotes.encolar(cv, requisitos)
+        except ColaLlena as e:
+            raise _ErrorHTTP(503, str(e))
+        resultado = await self._esperar(futuro)
+        return 200, resultado.to_dict(bool(datos.get("trazabilidad")))
+
+    async def _lote(self, cuerpo: bytes) -> tuple:
+        datos = _json(cuerpo)
+        cvs = datos.get("cvs")
+        if not isinstance(cvs, list) or not cvs:
+            raise _ErrorHTTP(400, "Falta la lista de CVs ('cvs')")
+        requisitos = _requisitos(datos)
+
+        entradas = []
+        for numero, cv in enumerate(cvs):
+            if isinstance(cv, dict):
+                cv_id, cv = cv.get("id", numero), cv.get("cv") or cv.get("cv_texto")
+            else:
+                cv_id = numero
+            if not isinstance(cv, str) or not cv.strip():
+                raise _ErrorHTTP(400, f"CV {cv_id} sin texto")
+            entradas.append((cv_id, cv))
+
+        # Un lote mayor que la cola no cabria nunca: reintentarlo no sirve
+        if len(entradas) > self.config.max_cola:
+            METRICAS.incrementar("servidor_rechazos_total", {"motivo": "lote_grande"})
+            raise _ErrorHTTP(
+                413, f"El lote supera el maximo de {self.config.max_cola} CVs"
+            )
+        # Todo o nada: un lote parcialmente encolado no se podria responder
+        if len(entradas) > self.lotes.plazas_libres():
+            METRICAS.incrementar("servidor_rechazos_total", {"motivo": "cola_llena"})
+            raise _ErrorHTTP(503, "No hay sitio en la cola para el lote")
+        futuros = [self.lotes.encolar(cv, requisitos) for _, cv in entradas]
+
+        incluir_trazas = bool(datos.get("trazabilidad"))
+        resultados = await self._esperar(asyncio.gather(*futuros))
+        return 200, {
+            "resultados": [
+                {"id": cv_id, **resultado.to_dict(incluir_trazas)}
+                for (cv_id, _), resultado in zip(entradas, resultados)
+            ]
+        }
+
+    async def _esperar(self, futuro):
+        try:
+            return await asyncio.wait_for(futuro, self.config.timeout_peticion_s)
+        except asyncio.TimeoutError:
+            raise _ErrorHTTP(504, "Tiempo de evaluacion agotado")
+
+    @staticmethod
+    async def _responder(
+        writer: asyncio.StreamWriter, estado: int, respuesta, mantener: bool
+    ):
+        if isinstance(respuesta, str):
+            tipo, cuerpo = "text/plain; version=0.0.4", respuesta.encode("utf-8")
+        else:
+            tipo = "application/json"
+            cuerpo = json.dumps(
+                respuesta, ensure_ascii=False, separators=(",", ":"), default=str
+            ).encode("utf-8")
+        cabecera = (
+            f"HTTP/1.1 {estado} {HTTPStatus(estado).phrase}\r\n"
+            f"Content-Type: {tipo}; charset=utf-8\r\n"
+            f"Content-Length: {len(cuerpo)}\r\n"
+            f"Connection: {'keep-alive' if mantener else 'close'}\r\n"
+        )
+        if estado == 503:
+            cabecera += "Retry-After: 1\r\n"
+        writer.write(cabecera.encode("latin-1") + b"\r\n" + cuerpo)
+        await writer.drain()
+
+
+def _json(cuerpo: bytes) -> dict:
+    try:
+        datos = json.loads(cuerpo or b"{}")
+    except ValueError:
+        raise _ErrorHTTP(400, "JSON invalido")
+    if not isinstance(datos, dict):
+        raise _ErrorHTTP(400, "Se esperaba un objeto JSON")
+    return datos
+
+
+def _requisitos(datos: dict) -> RequisitosPuesto:
+    try:
+        return requisitos_desde_dict(
+            {k: v for k, v in datos.items() if k not in ("cv", "cv_texto", "cvs")}
+        )
+    except (TypeError, ValueError) as e:
+        raise _ErrorHTTP(400, str(e))
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Servicio HTTP de evaluacion de CVs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8080)
+    parser.add_argument("--api-key", default=os.environ.get("OPENAI_API_KEY") or None)
+    parser.add_argument("--modelo", default="gpt-4")
+    parser.add_argument("--modo-fusionado", action="store_true")
+    parser.add_argument("--ventana-ms", type=float, default=0.0)
+    parser.add_argument("--max-lote", type=int, default=32)
+    parser.add_argument("--max-cola", type=int, default=1024)
+    parser.add_argument("--max-en-curso", type=int, default=64)
+    parser.add_argument("--timeout-peticion-s", type=float, default=120.0)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    for nombre in ("agente_base", "agente_coordinador", "llm_client"):
+        logging.getLogger(nombre).setLevel(logging.WARNING)
+
+    servidor = ServidorEvaluacion(
+        ConfiguracionServidor(
+            host=args.host,
+            puerto=args.puerto,
+            api_key=args.api_key,
+            modelo=args.modelo,
+            modo_fusionado=args.modo_fusionado,
+            ventana_lote_ms=args.ventana_ms,
+            max_lote=args.max_lote,
+            max_cola=args.max_cola,
+            max_en_curso=args.max_en_curso,
+            timeout_peticion_s=args.timeout_peticion_s,
+        )
+    )
+    try:
+        asyncio.run(servidor.servir())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 import json
 
 st.set_page_config(
@@ -0,0 +1,33 @@
+import os
+import random
+import sys
+
+import pytest
+
+# Los modulos del proyecto estan en la raiz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_PALABRAS_CV = (
+    "Python|JavaScript|TypeScript|Java|Go|R|C#|React|Vue|Django|FastAPI|Next.js|"
+    "Node.js|TensorFlow|PyTorch|pandas|NumPy|LangChain|OpenAI|LLMs|RAG|PostgreSQL|"
+    "MongoDB|SQL|Docker|Kubernetes|AWS|GCP|Terraform|Git|Linux|Scrum|Google|R&D|"
+    "equipo|proyectos|liderazgo|clientes|APIs REST"
+).split("|")
+_NIVELES_CV = ["Junior", "Semi-senior", "Senior", "Staff", "Principal", "Lead"]
+
+
+@pytest.fixture(scope="session")
+def corpus_aleatorio() -> list[str]:
+    """500 CVs sinteticos reproducibles con skills, ruido y anos de experiencia"""
+    aleatorio = random.Random(20261017)
+    cvs = []
+    for _ in range(500):
+        lineas = [
+            f"{aleatorio.choice(_NIVELES_CV)} developer",
+            f"{aleatorio.randint(0, 15)} anos de experiencia",
+        ]
+        for _ in range(aleatorio.randint(0, 6)):
+            palabras = aleatorio.sample(_PALABRAS_CV, aleatorio.randint(1, 6))
+            lineas.append(", ".join(palabras))
+        cvs.append("\n".join(lineas))
+    return cvs
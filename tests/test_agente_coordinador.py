@@ -0,0 +1,203 @@
+import copy
+import json
+import threading
+import time
+
+import pytest
+
+import workflows
+from agente_coordinador import (
+    AgenteCoordinador,
+    ConfiguracionEvaluacion,
+    _esperar_en_bucle_fondo,
+)
+from limites_llm import ConfiguracionLimites
+from llm_simulado import ConfiguracionSimulacion, LLMSimulado, RespuestaSimulada
+
+CV = """Desarrolladora Python con 6 anos de experiencia.
+Django, FastAPI, Docker y AWS."""
+
+WORKFLOWS = {
+    nombre: valor
+    for nombre, valor in vars(workflows).items()
+    if nombre.startswith("WORKFLOW_") and isinstance(valor, dict)
+}
+
+
+def test_hay_workflows():
+    assert {"WORKFLOW_DEFAULT", "WORKFLOW_LANGCHAIN", "WORKFLOW_CREW"} <= set(WORKFLOWS)
+
+
+@pytest.mark.parametrize("nombre", sorted(WORKFLOWS))
+def test_coordinador_con_cada_workflow(nombre):
+    coordinador = AgenteCoordinador(
+        ConfiguracionEvaluacion(workflow=WORKFLOWS[nombre], usar_langchain=False)
+    )
+    assert set(coordinador.timeouts) <= set(coordinador.agentes)
+
+    resultado = coordinador.evaluar(CV, ["python", "django", "react"], "senior", 3)
+
+    assert resultado.metodo == "estructurado"
+    assert resultado.resultado.skills_faltantes == ["react"]
+
+
+def _workflow_con_timeout(segundos: float) -> dict:
+    workflow = copy.deepcopy(workflows.WORKFLOW_DEFAULT)
+    for paso in workflow["pasos"]:
+        paso["timeout"] = segundos
+    return workflow
+
+
+async def _tareas_pendientes() -> int:
+    import asyncio
+
+    return len(asyncio.all_tasks()) - 1
+
+
+def test_timeout_sincrono_cancela_la_llamada_y_libera_el_limitador():
+    coordinador = AgenteCoordinador(
+        ConfiguracionEvaluacion(
+            workflow=_workflow_con_timeout(0.05),
+            simulacion=ConfiguracionSimulacion(latencia_ms=5000, distribucion="fija"),
+            limites=ConfiguracionLimites(max_en_curso=4),
+            coalescer=False,
+        )
+    )
+
+    inicio = time.monotonic()
+    resultado = coordinador.evaluar(CV, ["python", "django", "react"], "senior", 3)
+
+    assert time.monotonic() - inicio < 2
+    assert resultado.resultado.skills_faltantes == ["react"]
+    assert {t.agente for t in resultado.trazabilidad if t.fallback} == {
+        t.agente for t in resultado.trazabilidad
+    }
+    assert len(resultado.trazabilidad) == 4
+    assert coordinador.llm.limitador._semaforo.en_curso == 0
+    assert _esperar_en_bucle_fondo(_tareas_pendientes()) == 0
+    assert not [h for h in threading.enumerate() if h.name.startswith("agente")]
+
+
+RESPUESTA_FUSIONADA = {
+    "analista_skills": {
+        "skills_tecnicas": ["python", "django", "docker"],
+        "skills_blandas": ["liderazgo"],
+        "experiencia_anios": 6,
+        "nivel_autodetectado": "senior",
+    },
+    "evaluador_seniority": {
+        "seniority_estimado": "senior",
+        "experiencia_detectada": 6,
+        "fundamento": "6 anos con Python",
+        "coherente": True,
+        "indicadores_encontrados": [],
+    },
+    "detector_brechas": {
+        "brechas_criticas": ["kubernetes"],
+        "brechas_deseables": [],
+        "skills_coincidentes": ["python", "django"],
+        "evaluacion_global": "buena base",
+    },
+    "calculador_match": {
+        "porcentaje_match": 91.5,
+        "match_tecnico": 88,
+        "match_seniority": 100,
+        "clasificacion": "excelente",
+        "resumen": "candidata solida",
+    },
+}
+
+
+class LLMFusionado(LLMSimulado):
+    """Responde siempre `respuesta` como JSON tras `latencia_s` segundos"""
+
+    def __init__(self, respuesta: dict, latencia_s: float = 0):
+        super().__init__(ConfiguracionSimulacion(latencia_ms=0, distribucion="fija"))
+        self.respuesta = json.dumps(respuesta)
+        self.latencia_s = latencia_s
+        self.llamadas = 0
+
+    def invoke(self, mensajes):
+        self.llamadas += 1
+        time.sleep(self.latencia_s)
+        return RespuestaSimulada(self.respuesta)
+
+    async def ainvoke(self, mensajes):
+        import asyncio
+
+        self.llamadas += 1
+        await asyncio.sleep(self.latencia_s)
+        return RespuestaSimulada(self.respuesta)
+
+
+def _coordinador_fusionado(
+    respuesta: dict, latencia_s: float = 0, workflow: dict = None
+) -> AgenteCoordinador:
+    coordinador = AgenteCoordinador(
+        ConfiguracionEvaluacion(
+            modo_fusionado=True,
+            workflow=workflow,
+            simulacion=ConfiguracionSimulacion(latencia_ms=0, distribucion="fija"),
+            limites=ConfiguracionLimites(max_en_curso=1),
+            coalescer=False,
+        )
+    )
+    coordinador.llm._client = LLMFusionado(respuesta, latencia_s)
+    return coordinador
+
+
+def _trazas_por_nodo(coordinador: AgenteCoordinador, resultado) -> dict:
+    nodos = {agente.nombre: nombre for nombre, agente in coordinador.agentes.items()}
+    return {nodos[t.agente]: t for t in resultado.trazabilidad}
+
+
+def test_fusionado_reparte_la_respuesta_entre_los_cuatro_agentes():
+    coordinador = _coordinador_fusionado(RESPUESTA_FUSIONADA)
+
+    resultado = coordinador.evaluar(CV, ["python", "django", "kubernetes"], "senior", 3)
+
+    assert coordinador.llm._client.llamadas == 1
+    trazas = _trazas_por_nodo(coordinador, resultado)
+    assert set(trazas) == set(RESPUESTA_FUSIONADA)
+    for nombre, traza in trazas.items():
+        assert traza.output_data == RESPUESTA_FUSIONADA[nombre]
+        assert not traza.fallback and not traza.error
+    assert resultado.resultado.porcentaje_match == 91.5
+    assert resultado.resultado.skills_faltantes == ["kubernetes"]
+    assert resultado.resultado.resumen_evaluacion == "candidata solida"
+
+
+def test_fusionado_seccion_ausente_usa_el_metodo_local_del_agente():
+    respuesta = {
+        k: v for k, v in RESPUESTA_FUSIONADA.items() if k != "detector_brechas"
+    }
+    coordinador = _coordinador_fusionado(respuesta)
+
+    resultado = coordinador.evaluar(CV, ["python", "django", "kubernetes"], "senior", 3)
+
+    trazas = _trazas_por_nodo(coordinador, resultado)
+    assert [n for n, t in trazas.items() if t.fallback] == ["detector_brechas"]
+    assert "seccion ausente" in trazas["detector_brechas"].fallback
+    # El detector local compara las skills del analista con el stack
+    assert trazas["detector_brechas"].output_data["brechas_criticas"] == [
+        "kubernetes"
+    ]
+    assert trazas["calculador_match"].output_data == RESPUESTA_FUSIONADA[
+        "calculador_match"
+    ]
+
+
+def test_fusionado_timeout_usa_el_metodo_local_y_libera_el_limitador():
+    coordinador = _coordinador_fusionado(
+        RESPUESTA_FUSIONADA, latencia_s=5, workflow=_workflow_con_timeout(0.02)
+    )
+
+    inicio = time.monotonic()
+    resultado = coordinador.evaluar(CV, ["python", "django", "react"], "senior", 3)
+
+    assert time.monotonic() - inicio < 2
+    trazas = _trazas_por_nodo(coordinador, resultado)
+    assert len(trazas) == 4
+    assert all("timeout" in t.fallback for t in trazas.values())
+    assert resultado.resultado.skills_faltantes == ["react"]
+    assert coordinador.llm.limitador._semaforo.en_curso == 0
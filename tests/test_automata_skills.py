@@ -0,0 +1,103 @@
+import re
+
+import pytest
+
+from agentes_especializados import AUTOMATA_SKILLS, CATEGORIAS_SKILLS
+from automata_skills import AutomataSkills
+from templates import TEMPLATES_CV
+
+AUTOMATA = AutomataSkills(
+    {
+        "lenguajes": ["python", "go", "r", "c#", "java", "javascript"],
+        "frameworks": ["next.js", "react", "", "  "],
+        "ml_ai": ["llm", "api", "python"],
+    }
+)
+
+
+def _subcadena(texto: str) -> set[str]:
+    """Deteccion anterior al automata: cualquier subcadena cuenta"""
+    texto = texto.lower()
+    return {s for skills in CATEGORIAS_SKILLS.values() for s in skills if s in texto}
+
+
+@pytest.mark.parametrize(
+    "texto, esperadas",
+    [
+        ("Python y Go", ["python", "go"]),
+        ("React en Google", ["react"]),
+        ("golang, gopher", []),
+        ("JavaScript", ["javascript"]),
+        ("Java/Javascript", ["java", "javascript"]),
+        ("C# y .NET", ["c#"]),
+        ("Next.js 14", ["next.js"]),
+        ("python3", []),
+        ("skills: R, SQL", ["r"]),
+    ],
+)
+def test_limites_de_palabra(texto, esperadas):
+    assert AUTOMATA.skills(texto) == esperadas
+
+
+def test_plural_opcional():
+    assert AUTOMATA.skills("LLMs y APIs REST") == ["llm", "api"]
+    coincidencia = AUTOMATA.buscar("LLMs")[0]
+    assert (coincidencia.inicio, coincidencia.fin) == (0, 4)
+    # Solo una "s": "llmss" no es un plural
+    assert AUTOMATA.skills("llmss") == []
+
+
+def test_plural_no_aplica_a_patrones_cortos():
+    assert AUTOMATA.skills("gos") == []
+    assert AUTOMATA.skills("Rs") == []
+    assert AUTOMATA.skills("go, r") == ["go", "r"]
+
+
+def test_ampersand_forma_parte_de_la_palabra():
+    assert AUTOMATA.skills("Departamento de R&D") == []
+    assert AUTOMATA.skills("R & Python") == ["r", "python"]
+
+
+def test_patrones_vacios_se_ignoran():
+    assert "" not in AUTOMATA.vocabulario
+    assert AUTOMATA.buscar("   ") == []
+    assert AutomataSkills({"vacia": ["", " "]}).buscar("texto") == []
+
+
+def test_patron_en_varias_categorias():
+    assert AUTOMATA.extraer("Python") == {
+        "lenguajes": ["python"],
+        "ml_ai": ["python"],
+    }
+
+
+def test_patrones_solapados():
+    # "java" es prefijo de "javascript": solo cuenta el que cierra palabra
+    assert [c.skill for c in AUTOMATA.buscar("javascript java")] == [
+        "javascript",
+        "java",
+    ]
+    automata = AutomataSkills({"x": ["langchain", "langchain-architecture"]})
+    assert automata.skills("langchain-architecture") == [
+        "langchain",
+        "langchain-architecture",
+    ]
+
+
+@pytest.mark.parametrize("nombre", sorted(TEMPLATES_CV))
+def test_subconjunto_de_la_deteccion_por_subcadena(nombre):
+    """
+    El automata solo descarta coincidencias de la deteccion anterior.
+
+    Las descartadas son las que caian dentro de otra palabra ("r" en
+    "react", "go" en "google", "java" en "javascript"), que eran falsos
+    positivos.
+    """
+    texto = TEMPLATES_CV[nombre]
+    nuevas = set(AUTOMATA_SKILLS.skills(texto))
+    antiguas = _subcadena(texto)
+
+    assert nuevas <= antiguas
+    for descartada in antiguas - nuevas:
+        aislada = rf"(?<![\w&]){re.escape(descartada)}(?![\w&])"
+        assert not re.search(aislada, texto.lower()), descartada
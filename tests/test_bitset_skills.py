@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from agentes_especializados import (
+    AgenteAnalistaSkills,
+    AgenteCalculadorMatch,
+    AgenteDetectorBrechas,
+    AgenteEvaluadorSeniority,
+)
+from bitset_skills import (
+    StackCompilado,
+    VocabularioSkills,
+    codificar_niveles,
+    puntuar_lote,
+)
+from templates import NIVELES_DEFAULT, STACKS_REQUERIDOS
+
+
+@pytest.fixture(scope="module")
+def perfiles(corpus_aleatorio) -> list[tuple[list[str], str]]:
+    analista = AgenteAnalistaSkills(None)
+    evaluador = AgenteEvaluadorSeniority(None)
+    return [
+        (
+            analista._extraer_local(cv)["skills_tecnicas"],
+            evaluador._evaluar_local(cv, "senior", 0)["seniority_estimado"],
+        )
+        for cv in corpus_aleatorio
+    ]
+
+
+def test_vocabulario_y_codificacion():
+    vocabulario = VocabularioSkills(
+        ["Python", "python ", "", "Go"] + [f"s{i}" for i in range(70)]
+    )
+
+    assert len(vocabulario) == 72
+    assert vocabulario.n_palabras == 2
+    assert vocabulario.id_de(" PYTHON") == 0
+    bits = vocabulario.codificar(["go", "s69", "desconocida"])
+    assert bits.shape == (2,) and bits.dtype == np.uint64
+    assert vocabulario.codificar_lote([]).shape == (0, 2)
+    assert not vocabulario.codificar([]).any()
+
+
+def test_vocabulario_vacio():
+    vocabulario = VocabularioSkills([])
+
+    assert vocabulario.n_palabras == 1
+    assert vocabulario.codificar(["python"]).tolist() == [0]
+
+
+@pytest.mark.parametrize("nombre", sorted(STACKS_REQUERIDOS))
+def test_puntuar_lote_igual_a_los_agentes(perfiles, nombre):
+    stack, nivel = STACKS_REQUERIDOS[nombre], NIVELES_DEFAULT[nombre]
+    vocabulario = VocabularioSkills.por_defecto()
+    matriz = vocabulario.codificar_lote([skills for skills, _ in perfiles])
+    niveles = codificar_niveles([seniority for _, seniority in perfiles])
+    compilado = StackCompilado.compilar(vocabulario, stack)
+
+    lote = puntuar_lote(matriz, niveles, compilado, nivel)
+
+    detector = AgenteDetectorBrechas(None)
+    calculador = AgenteCalculadorMatch(None)
+    for i, (skills, seniority) in enumerate(perfiles):
+        brechas = detector._detectar_local(skills, stack)
+        puntaje = calculador._calcular_local(
+            brechas["skills_coincidentes"],
+            stack,
+            seniority,
+            nivel,
+            brechas["brechas_criticas"],
+        )
+        assert compilado.brechas(lote["cobertura"][i : i + 1]) == [
+            brechas["brechas_criticas"]
+        ]
+        assert lote["n_brechas"][i] == len(brechas["brechas_criticas"])
+        for clave in ("porcentaje_match", "match_tecnico", "match_seniority"):
+            assert lote[clave][i] == puntaje[clave]
+        assert lote["clasificacion"][i] == puntaje["clasificacion"]
+
+
+def test_stack_vacio_y_lote_vacio():
+    vocabulario = VocabularioSkills.por_defecto()
+    vacio = StackCompilado.compilar(vocabulario, [])
+    matriz = vocabulario.codificar_lote([["python"], []])
+    niveles = codificar_niveles(["senior", "junior"])
+
+    lote = puntuar_lote(matriz, niveles, vacio, "senior")
+
+    calculador = AgenteCalculadorMatch(None)
+    puntaje = calculador._calcular_local([], [], "senior", "senior", [])
+    assert lote["cobertura"].shape == (2, 0)
+    assert lote["n_brechas"].tolist() == [0, 0]
+    assert lote["match_tecnico"].tolist() == [100, 100]
+    assert lote["porcentaje_match"][0] == puntaje["porcentaje_match"]
+
+    sin_cvs = puntuar_lote(
+        vocabulario.codificar_lote([]),
+        codificar_niveles([]),
+        StackCompilado.compilar(vocabulario, ["Python"]),
+        "senior",
+    )
+    assert sin_cvs["porcentaje_match"].shape == (0,)
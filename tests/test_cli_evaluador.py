@@ -0,0 +1,164 @@
+import csv
+import json
+import logging
+
+import pytest
+
+import cli_evaluador
+from agentes_especializados import calcular_puntaje, clasificar_match
+from escritor_jsonl import leer_jsonl
+from modelos import ResultadoCompleto, ResultadoEvaluacion
+
+CV_PYTHON = "Desarrolladora Python con 6 anos de experiencia. Django, Docker y AWS."
+CV_JAVA = "Programador Java junior, 1 ano de experiencia con Spring."
+
+
+@pytest.fixture
+def directorio_cvs(tmp_path):
+    cvs = tmp_path / "cvs"
+    cvs.mkdir()
+    (cvs / "ana.txt").write_text(CV_PYTHON, encoding="utf-8")
+    (cvs / "luis.md").write_text(CV_JAVA, encoding="utf-8")
+    (cvs / "notas.pdf").write_text("no es un CV", encoding="utf-8")
+    return cvs
+
+
+def _jsonl(ruta, lineas: list[str]):
+    ruta.write_text("\n".join(lineas) + "\n", encoding="utf-8")
+    return ruta
+
+
+def test_leer_cvs_de_directorio(directorio_cvs):
+    assert list(cli_evaluador.leer_cvs(str(directorio_cvs))) == [
+        ("ana.txt", CV_PYTHON),
+        ("luis.md", CV_JAVA),
+    ]
+    assert cli_evaluador.contar_cvs(str(directorio_cvs)) == 2
+
+
+def test_leer_cvs_de_jsonl_omite_lineas_invalidas(tmp_path, caplog):
+    ruta = _jsonl(
+        tmp_path / "cvs.jsonl",
+        [
+            json.dumps({"id": "ana", "cv": CV_PYTHON}),
+            json.dumps(["no", "es", "un", "objeto"]),
+            json.dumps("tampoco"),
+            json.dumps({"id": "vacio", "cv": ""}),
+            json.dumps({"cv": 42, "texto": CV_JAVA}),
+            "",
+            json.dumps({"cv_texto": "Go y Rust"}),
+        ],
+    )
+
+    with caplog.at_level(logging.WARNING, logger="cli_evaluador"):
+        cvs = list(cli_evaluador.leer_cvs(str(ruta)))
+
+    assert cvs == [("ana", CV_PYTHON), ("5", CV_JAVA), ("6", "Go y Rust")]
+    avisos = [r.getMessage() for r in caplog.records]
+    assert avisos == [
+        "Linea 2 no es un objeto JSON, se omite",
+        "Linea 3 no es un objeto JSON, se omite",
+        "Linea 4 sin texto de CV, se omite",
+    ]
+
+
+def test_cargar_puesto_con_perfil_y_json(tmp_path):
+    ruta = tmp_path / "puesto.json"
+    ruta.write_text(json.dumps({"nivel_solicitado": "staff"}), encoding="utf-8")
+
+    puesto = cli_evaluador.cargar_puesto("backend_developer", str(ruta))
+
+    assert puesto.nivel_solicitado == "staff"
+    assert puesto.stack_tecnico
+    with pytest.raises(ValueError):
+        cli_evaluador.cargar_puesto()
+
+
+@pytest.mark.parametrize("porcentaje", [0, 39.9, 40, 59.9, 60, 79.9, 80, 100])
+def test_csv_usa_la_clasificacion_del_calculador(tmp_path, porcentaje):
+    resultado = ResultadoCompleto(
+        resultado=ResultadoEvaluacion(
+            porcentaje_match=porcentaje,
+            seniority_estimado="senior",
+            brechas_tecnicas=[],
+            skills_encontradas=["python"],
+            skills_faltantes=[],
+            nivel_coherente=True,
+            resumen_evaluacion="",
+        ),
+        trazabilidad=[],
+        metodo="estructurado",
+        timestamp="2026-01-01T00:00:00",
+    )
+    ruta = tmp_path / "salida.csv"
+    with cli_evaluador.EscritorCSV(str(ruta)) as escritor:
+        escritor.escribir(resultado, cv_id="ana")
+
+    with open(ruta, encoding="utf-8", newline="") as f:
+        (fila,) = list(csv.DictReader(f))
+    assert fila["clasificacion"] == clasificar_match(porcentaje)
+
+
+def test_clasificar_match_coincide_con_calcular_puntaje():
+    for coincidentes in range(6):
+        for brechas in range(6):
+            puntaje = calcular_puntaje(coincidentes, 5, "senior", "senior", brechas)
+            assert puntaje["clasificacion"] == clasificar_match(
+                puntaje["porcentaje_match"]
+            )
+
+
+def test_main_escribe_csv(directorio_cvs, tmp_path, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    salida = tmp_path / "resultados.csv"
+
+    codigo = cli_evaluador.main(
+        [
+            str(directorio_cvs),
+            "--perfil",
+            "backend_developer",
+            "--salida",
+            str(salida),
+            "--workers",
+            "2",
+        ]
+    )
+
+    assert codigo == 0
+    with open(salida, encoding="utf-8", newline="") as f:
+        filas = {fila["cv_id"]: fila for fila in csv.DictReader(f)}
+    assert set(filas) == {"ana.txt", "luis.md"}
+    for fila in filas.values():
+        assert list(fila) == cli_evaluador.COLUMNAS_CSV
+        assert fila["metodo"] == "estructurado"
+        assert fila["clasificacion"] == clasificar_match(
+            float(fila["porcentaje_match"])
+        )
+
+
+def test_main_escribe_jsonl(tmp_path):
+    entrada = _jsonl(
+        tmp_path / "cvs.jsonl",
+        [json.dumps({"id": "ana", "cv": CV_PYTHON}), json.dumps([1, 2])],
+    )
+    salida = tmp_path / "resultados.jsonl"
+
+    resumen = cli_evaluador.evaluar_masivo(
+        str(entrada),
+        str(salida),
+        cli_evaluador.cargar_puesto("backend_developer"),
+        workers=1,
+    )
+
+    assert resumen["evaluados"] == 1 and resumen["errores"] == 0
+    (linea,) = list(leer_jsonl(str(salida)))
+    assert linea["cv_id"] == "ana"
+    assert "trazabilidad" not in linea
+
+
+def test_main_sin_puesto_es_un_error_de_uso(directorio_cvs, capsys):
+    with pytest.raises(SystemExit) as salida:
+        cli_evaluador.main([str(directorio_cvs)])
+
+    assert salida.value.code == 2
+    assert "Indica un perfil o un JSON de puesto" in capsys.readouterr().err
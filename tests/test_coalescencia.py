@@ -0,0 +1,96 @@
+import asyncio
+import threading
+
+from agente_coordinador import AgenteCoordinador, ConfiguracionEvaluacion
+from coalescencia import CoalescedorVuelo
+from llm_simulado import ConfiguracionSimulacion
+
+CV = "Desarrollador Python con 5 anos de experiencia en Django y Docker."
+
+
+def test_seguidores_reciben_el_resultado_de_la_lider(monkeypatch):
+    vuelos = CoalescedorVuelo("prueba")
+    unidos = threading.Semaphore(0)
+    soltar = threading.Event()
+    ejecuciones = []
+    unirse = vuelos._unirse
+
+    def _unirse(clave):
+        resultado = unirse(clave)
+        unidos.release()
+        return resultado
+
+    def _trabajo():
+        ejecuciones.append(1)
+        soltar.wait(5)
+        return "resultado"
+
+    monkeypatch.setattr(vuelos, "_unirse", _unirse)
+    resultados = []
+
+    def _pedir():
+        resultados.append(vuelos.ejecutar("k", _trabajo))
+
+    hilos = [threading.Thread(target=_pedir) for _ in range(5)]
+    for hilo in hilos:
+        hilo.start()
+    # La lider no termina hasta que los cinco hilos se han unido al vuelo
+    for _ in hilos:
+        assert unidos.acquire(timeout=5)
+    soltar.set()
+    for hilo in hilos:
+        hilo.join(5)
+
+    assert ejecuciones == [1]
+    assert resultados == ["resultado"] * 5
+    assert len(vuelos) == 0
+
+
+def test_excepcion_de_la_lider_llega_a_los_seguidores():
+    vuelos = CoalescedorVuelo("prueba")
+
+    async def _fallar():
+        await asyncio.sleep(0.01)
+        raise ValueError("fallo")
+
+    async def _probar():
+        return await asyncio.gather(
+            *(vuelos.aejecutar("k", _fallar) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    errores = asyncio.run(_probar())
+
+    assert [type(e) for e in errores] == [ValueError] * 3
+
+
+def test_aevaluar_identicas_en_vuelo_se_ejecutan_una_vez(monkeypatch):
+    coordinador = AgenteCoordinador(
+        ConfiguracionEvaluacion(
+            simulacion=ConfiguracionSimulacion(
+                latencia_ms=20, distribucion="fija", semilla=1
+            )
+        )
+    )
+    original = coordinador._aevaluar
+    ejecuciones = []
+
+    async def _contar(*args, **kwargs):
+        ejecuciones.append(1)
+        return await original(*args, **kwargs)
+
+    monkeypatch.setattr(coordinador, "_aevaluar", _contar)
+
+    async def _probar():
+        return await asyncio.gather(
+            *(
+                coordinador.aevaluar(CV, ["python", "react"], "senior", 3)
+                for _ in range(8)
+            )
+        )
+
+    resultados = asyncio.run(_probar())
+
+    assert ejecuciones == [1]
+    assert len({r.resultado.porcentaje_match for r in resultados}) == 1
+    assert len(coordinador._vuelos) == 0
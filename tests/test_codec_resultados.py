@@ -0,0 +1,133 @@
+import io
+
+import pytest
+
+from codec_resultados import (
+    CodificadorBinario,
+    DecodificadorBinario,
+    codificar_lote,
+    decodificar_lote,
+    escribir_binario,
+    leer_binario,
+)
+from modelos import ResultadoCompleto, ResultadoEvaluacion, TrazabilidadAgente
+
+
+def _evaluacion(**cambios) -> ResultadoEvaluacion:
+    datos = dict(
+        porcentaje_match=72.5,
+        seniority_estimado="senior",
+        brechas_tecnicas=["kubernetes"],
+        skills_encontradas=["python", "django"],
+        skills_faltantes=["kubernetes"],
+        nivel_coherente=True,
+        resumen_evaluacion="Buen encaje",
+    )
+    datos.update(cambios)
+    return ResultadoEvaluacion(**datos)
+
+
+def _completo(**cambios) -> ResultadoCompleto:
+    return ResultadoCompleto(
+        resultado=_evaluacion(**cambios),
+        trazabilidad=[
+            TrazabilidadAgente(
+                agente="AnalistaSkills",
+                status="success",
+                duracion_ms=1.5,
+                input_data={"cv_texto": "Señora Núñez, 5 años"},
+                output_data={"skills_tecnicas": ["python"]},
+            ),
+            TrazabilidadAgente(
+                agente="DetectorBrechas",
+                status="error",
+                duracion_ms=0.25,
+                input_data={},
+                output_data={"error": "timeout"},
+                error="timeout",
+                fallback="timeout tras 25s",
+            ),
+        ],
+        metodo="estructurado",
+        timestamp="2026-01-01T00:00:00",
+    )
+
+
+RESULTADOS = [
+    _completo(),
+    _evaluacion(),
+    _completo(
+        seniority_estimado="semi-senior",
+        brechas_tecnicas=[],
+        skills_encontradas=[],
+        skills_faltantes=[],
+        resumen_evaluacion="Evaluación: diseño de APIs, Zürich 日本",
+    ),
+    _evaluacion(skills_encontradas=["python", "c#", "ñandú"], nivel_coherente=False),
+]
+
+
+def _escribir(resultados) -> bytes:
+    destino = io.BytesIO()
+    assert escribir_binario(destino, resultados) == len(resultados)
+    return destino.getvalue()
+
+
+def test_ida_y_vuelta_igual_a_to_dict():
+    leidos = list(leer_binario(io.BytesIO(_escribir(RESULTADOS))))
+
+    assert [type(r) for r in leidos] == [type(r) for r in RESULTADOS]
+    assert [r.to_dict() for r in leidos] == [r.to_dict() for r in RESULTADOS]
+
+
+def test_listas_vacias_no_ascii_y_cadenas_internadas():
+    datos = _escribir(RESULTADOS)
+    leidos = list(leer_binario(io.BytesIO(datos)))
+
+    assert leidos[2].resultado.skills_encontradas == []
+    assert leidos[2].resultado.resumen_evaluacion.endswith("Zürich 日本")
+    entrada = leidos[0].trazabilidad[0].input_data
+    assert entrada["cv_texto"] == "Señora Núñez, 5 años"
+    assert leidos[3].skills_encontradas == ["python", "c#", "ñandú"]
+    assert leidos[1].seniority_estimado == leidos[0].resultado.seniority_estimado
+
+
+def test_cadenas_repetidas_se_guardan_una_vez():
+    codificador = CodificadorBinario()
+    primera = codificador.codificar(_evaluacion())
+    segunda = codificador.codificar(_evaluacion())
+
+    assert primera.count(b"kubernetes") == 1
+    assert b"senior" not in segunda and b"python" not in segunda
+    decodificador = DecodificadorBinario()
+    leidas = [decodificador.decodificar(t[4:]) for t in (primera, segunda)]
+    assert leidas[0] == leidas[1] == _evaluacion()
+
+
+def test_lote_en_memoria_equivale_al_archivo():
+    datos = codificar_lote(RESULTADOS)
+
+    assert datos == _escribir(RESULTADOS)
+    assert [r.to_dict() for r in decodificar_lote(datos)] == [
+        r.to_dict() for r in RESULTADOS
+    ]
+
+
+def test_archivo_vacio_de_resultados():
+    assert list(leer_binario(io.BytesIO(_escribir([])))) == []
+    assert decodificar_lote(codificar_lote([])) == []
+
+
+@pytest.mark.parametrize("corte", [2, 6, 7, -1, -10])
+def test_archivo_truncado_se_rechaza(corte):
+    datos = _escribir(RESULTADOS)[:corte]
+
+    with pytest.raises(ValueError, match="Archivo truncado"):
+        list(leer_binario(io.BytesIO(datos)))
+    with pytest.raises(ValueError, match="Archivo truncado"):
+        decodificar_lote(datos)
+
+
+def test_formato_desconocido_se_rechaza():
+    with pytest.raises(ValueError, match="Formato no reconocido"):
+        list(leer_binario(io.BytesIO(b"JSON\x01")))
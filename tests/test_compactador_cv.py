@@ -0,0 +1,105 @@
+import pytest
+
+from agentes_especializados import AUTOMATA_SKILLS
+from compactador_cv import compactar_cv
+from documento_cv import DocumentoCV
+from limites_llm import estimar_tokens
+
+RELLENO = [
+    f"Participacion numero {i} en reuniones semanales de coordinacion interna del area"
+    for i in range(60)
+]
+
+CV = "\n".join(
+    [
+        "Ana Perez - Ingeniera de software",
+        "",
+        "PERFIL:",
+        *RELLENO[:20],
+        "",
+        "EXPERIENCIA:",
+        "-------------------------------",
+        *RELLENO[20:40],
+        "Backend con Python y Django desde 2019",
+        *RELLENO[40:60],
+        "Migracion de servicios a Kubernetes en AWS",
+        "",
+        "FORMACION:",
+        "Certificacion en Terraform",
+    ]
+)
+
+
+def _lineas(texto: str) -> list[str]:
+    return texto.split("\n")
+
+
+def test_cv_corto_se_devuelve_limpio():
+    texto = "Ana   Perez\n\n=====\nPython y Django\nPython y Django\n"
+
+    assert compactar_cv(texto) == "Ana Perez\nPython y Django"
+
+
+@pytest.mark.parametrize("presupuesto", [20, 60, 120, 300])
+def test_respeta_el_presupuesto(presupuesto):
+    compacto = compactar_cv(CV, presupuesto, terminos=["kubernetes"])
+
+    assert estimar_tokens(CV) > presupuesto
+    assert sum(estimar_tokens(linea) for linea in _lineas(compacto)) <= presupuesto
+
+
+def test_conserva_las_lineas_con_skills_y_requisitos():
+    compacto = _lineas(compactar_cv(CV, 60, terminos=["terraform"]))
+
+    assert "Backend con Python y Django desde 2019" in compacto
+    assert "Migracion de servicios a Kubernetes en AWS" in compacto
+    assert "Certificacion en Terraform" in compacto
+    assert not any(linea.startswith("Participacion") for linea in compacto)
+    assert not any(set(linea) == {"-"} for linea in compacto)
+
+
+def test_requisitos_del_puesto_ganan_a_otras_skills():
+    # Solo cabe una de las dos lineas con skills: la del requisito
+    compacto = _lineas(compactar_cv(CV, 15, terminos=["kubernetes"]))
+
+    assert "Migracion de servicios a Kubernetes en AWS" in compacto
+    assert "Backend con Python y Django desde 2019" not in compacto
+
+
+def test_conserva_encabezados_y_orden_original():
+    compacto = _lineas(compactar_cv(CV, 80, terminos=["terraform"]))
+
+    assert compacto == [
+        "Ana Perez - Ingeniera de software",
+        "EXPERIENCIA:",
+        "Backend con Python y Django desde 2019",
+        "Migracion de servicios a Kubernetes en AWS",
+        "FORMACION:",
+        "Certificacion en Terraform",
+    ]
+    assert "PERFIL:" not in compacto
+    originales = _lineas(CV)
+    posiciones = [originales.index(linea) for linea in compacto]
+    assert posiciones == sorted(posiciones)
+
+
+def test_skills_despues_de_los_primeros_2000_caracteres():
+    assert CV.index("Kubernetes") > 2000
+    assert "kubernetes" not in AUTOMATA_SKILLS.skills(CV[:2000])
+
+    compacto = compactar_cv(CV, terminos=["kubernetes"])
+
+    assert "kubernetes" in AUTOMATA_SKILLS.skills(compacto)
+    assert set(AUTOMATA_SKILLS.skills(compacto)) == set(AUTOMATA_SKILLS.skills(CV))
+
+
+def test_documento_y_texto_dan_el_mismo_resultado():
+    assert compactar_cv(DocumentoCV(CV), 80) == compactar_cv(CV, 80)
+
+
+def test_sin_lineas_con_senal_se_corta_por_caracteres():
+    texto = "\n".join(RELLENO)
+
+    compacto = compactar_cv(texto, 5)
+
+    assert compacto == texto[:20]
@@ -0,0 +1,88 @@
+from agentes_especializados import AUTOMATA_SKILLS, AgenteDetectorBrechas
+from compactador_cv import compactar_cv
+from documento_cv import DocumentoCV, normalizar
+from indice_corpus import IndiceCorpus
+
+CV = """ANA PÉREZ
+Ingeniera Sr. Backend
+
+EXPERIENCIA:
+Desarrolladora Python con 6 Años de experiencia en Django y AWS.
+
+HABILIDADES
+Python, Docker, Kubernetes, comunicación
+"""
+
+
+def test_normalizar_conserva_posiciones():
+    for texto in (CV, "İstanbul Ñandú"):
+        assert len(normalizar(texto)) == len(texto)
+    assert normalizar("Años ÑANDÚ") == "anos nandu"
+
+
+def test_experiencia_con_y_sin_acentos():
+    assert DocumentoCV(CV).experiencia_anios == 6
+    assert DocumentoCV("5 anos de experiencia con Go").experiencia_anios == 5
+    assert DocumentoCV("3 years experience").experiencia_anios == 3
+    assert DocumentoCV("[X] anos de experiencia").experiencia_anios == 0
+
+
+def test_secciones_y_palabras():
+    documento = DocumentoCV(CV)
+
+    assert [s.nombre for s in documento.secciones] == [
+        "ANA PÉREZ",
+        "EXPERIENCIA",
+        "HABILIDADES",
+    ]
+    seccion = documento.secciones[1]
+    assert CV[seccion.inicio :].startswith("EXPERIENCIA:")
+    assert documento.contiene("sr")
+    assert not documento.contiene("lead")
+
+
+def test_tokens_y_posiciones():
+    documento = DocumentoCV("Años: 5, C++ y Node.js")
+
+    assert documento.tokens == ["anos", "5", "c", "y", "node", "js"]
+    assert [documento.texto[i:f] for i, f in documento.posiciones_tokens] == [
+        "Años",
+        "5",
+        "C",
+        "y",
+        "Node",
+        "js",
+    ]
+    assert documento.vocabulario == frozenset(documento.tokens)
+
+
+def test_indice_corpus_extrae_como_el_analista():
+    indice = IndiceCorpus()
+    indice.agregar("ana", CV)
+
+    assert indice._skills_por_cv["ana"] == DocumentoCV(CV).skills(AUTOMATA_SKILLS)
+
+
+def test_compactar_reutiliza_las_coincidencias_del_documento(monkeypatch):
+    documento = DocumentoCV(CV * 20)
+    documento.skills(AUTOMATA_SKILLS)
+
+    def _no_recorrer(texto):
+        raise AssertionError("el automata no deberia volver a recorrer el CV")
+
+    monkeypatch.setattr(AUTOMATA_SKILLS, "buscar", _no_recorrer)
+    compacto = compactar_cv(documento, presupuesto_tokens=60)
+
+    assert compacto == compactar_cv(CV * 20, presupuesto_tokens=60)
+    assert "Python" in compacto
+
+
+def test_detector_brechas_usa_el_documento_compartido():
+    relleno = "\n".join(f"Linea de relleno numero {i}" for i in range(400))
+    documento = DocumentoCV("Kubernetes\n" + relleno)
+    prompt = AgenteDetectorBrechas(None)._construir_prompt(
+        {"cv_texto": "otro texto", "_documento": documento, "stack_requerido": []}
+    )
+
+    assert "Kubernetes" in prompt
+    assert AUTOMATA_SKILLS in documento._skills
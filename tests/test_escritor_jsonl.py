@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from escritor_jsonl import EscritorJSONL, escribir_resultados, leer_jsonl
+from modelos import ResultadoCompleto, ResultadoEvaluacion, TrazabilidadAgente
+
+
+def _resultado(i: int) -> ResultadoCompleto:
+    return ResultadoCompleto(
+        resultado=ResultadoEvaluacion(
+            porcentaje_match=float(i),
+            seniority_estimado="senior",
+            brechas_tecnicas=[],
+            skills_encontradas=["python"],
+            skills_faltantes=[],
+            nivel_coherente=True,
+            resumen_evaluacion=f"Evaluación {i}\ncon salto de línea",
+        ),
+        trazabilidad=[
+            TrazabilidadAgente(
+                agente="AnalistaSkills",
+                status="success",
+                duracion_ms=1.0,
+                input_data={"cv_texto": "Python"},
+                output_data={},
+            )
+        ],
+        metodo="estructurado",
+        timestamp="2026-01-01T00:00:00",
+    )
+
+
+def test_una_linea_compacta_por_resultado_con_su_indice(tmp_path):
+    ruta = tmp_path / "resultados.jsonl"
+    resultados = [_resultado(i) for i in range(5)]
+
+    assert escribir_resultados(str(ruta), resultados) == 5
+
+    lineas = ruta.read_text(encoding="utf-8").splitlines()
+    assert len(lineas) == 5
+    for i, linea in enumerate(lineas):
+        datos = json.loads(linea)
+        assert linea == json.dumps(datos, ensure_ascii=False, separators=(",", ":"))
+        assert datos["indice"] == i
+        assert datos["resultado"]["porcentaje_match"] == i
+        assert "trazabilidad" not in datos
+    assert "Evaluación" in lineas[0]
+
+
+def test_ida_y_vuelta_con_leer_jsonl(tmp_path):
+    ruta = tmp_path / "resultados.jsonl"
+    resultados = [_resultado(i) for i in range(3)]
+
+    escribir_resultados(str(ruta), resultados, incluir_trazabilidad=True)
+    leidos = list(leer_jsonl(str(ruta)))
+
+    assert [d.pop("indice") for d in leidos] == [0, 1, 2]
+    assert leidos == [r.to_dict() for r in resultados]
+    assert [ResultadoCompleto.from_dict(d) for d in leidos] == resultados
+
+
+def test_volcado_por_lotes(tmp_path):
+    ruta = tmp_path / "resultados.jsonl"
+    escritor = EscritorJSONL(str(ruta), lote_flush=3, intervalo_flush_s=3600)
+    try:
+        escritor.escribir(_resultado(0).resultado)
+        escritor.escribir({"libre": True}, cv_id="x")
+        assert ruta.read_text(encoding="utf-8") == ""
+        escritor.escribir(_resultado(2))
+        assert len(ruta.read_text(encoding="utf-8").splitlines()) == 3
+    finally:
+        escritor.cerrar()
+
+
+def test_se_vuelca_y_cierra_ante_una_excepcion(tmp_path):
+    ruta = tmp_path / "resultados.jsonl"
+
+    with pytest.raises(RuntimeError):
+        with EscritorJSONL(str(ruta), lote_flush=100, intervalo_flush_s=3600) as e:
+            e.escribir(_resultado(0), indice=0)
+            e.escribir(_resultado(1), indice=1)
+            raise RuntimeError("fallo a mitad de la ejecucion")
+
+    assert e._fichero.closed
+    assert [d["indice"] for d in leer_jsonl(str(ruta))] == [0, 1]
+    e.cerrar()
+
+
+def test_anadir_conserva_las_lineas_previas(tmp_path):
+    ruta = tmp_path / "resultados.jsonl"
+    escribir_resultados(str(ruta), [_resultado(0)])
+
+    with EscritorJSONL(str(ruta), anadir=True) as escritor:
+        escritor.escribir(_resultado(1), indice=1)
+
+    assert [d["indice"] for d in leer_jsonl(str(ruta))] == [0, 1]
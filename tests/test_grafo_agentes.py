@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+import pytest
+
+from agente_coordinador import AgenteCoordinador, ConfiguracionEvaluacion
+from agentes_especializados import AgenteDetectorBrechas
+from grafo_agentes import GrafoAgentes
+from llm_simulado import ConfiguracionSimulacion
+
+
+class _Agente:
+    def __init__(self, entradas: dict, salidas: dict):
+        self.ENTRADAS = entradas
+        self.SALIDAS = salidas
+
+
+def _grafo(**agentes) -> GrafoAgentes:
+    return GrafoAgentes.desde_agentes(agentes, entradas_iniciales=["cv"])
+
+
+def test_orden_respeta_las_dependencias():
+    grafo = _grafo(
+        d=_Agente({"b": "b", "c": "c"}, {"d": 0}),
+        b=_Agente({"a": "a"}, {"b": 0}),
+        a=_Agente({"cv": "cv"}, {"a": 0}),
+        c=_Agente({"cv": "cv"}, {"c": 0}),
+    )
+
+    assert grafo.dependencias == {"a": set(), "b": {"a"}, "c": set(), "d": {"b", "c"}}
+    posicion = {nombre: i for i, nombre in enumerate(grafo.orden)}
+    for nombre, dependencias in grafo.dependencias.items():
+        assert all(posicion[d] < posicion[nombre] for d in dependencias)
+
+
+def test_dependencia_sin_productor_se_informa():
+    with pytest.raises(ValueError, match="'skills' de b no tiene productor"):
+        _grafo(a=_Agente({"cv": "cv"}, {"a": 0}), b=_Agente({"x": "skills"}, {}))
+
+
+def test_ciclo_y_productor_duplicado_se_informan():
+    with pytest.raises(ValueError, match="Ciclo"):
+        _grafo(a=_Agente({"b": "b"}, {"a": 0}), b=_Agente({"a": "a"}, {"b": 0}))
+    with pytest.raises(ValueError, match="mas de un productor"):
+        _grafo(a=_Agente({}, {"x": 0}), b=_Agente({}, {"x": 0}))
+    with pytest.raises(ValueError, match="mas de un productor"):
+        _grafo(a=_Agente({}, {"cv": 0}))
+
+
+def test_grafo_del_coordinador():
+    coordinador = AgenteCoordinador(ConfiguracionEvaluacion(usar_langchain=False))
+
+    assert coordinador.grafo.dependencias == {
+        "analista_skills": set(),
+        "evaluador_seniority": set(),
+        "detector_brechas": {"analista_skills"},
+        "calculador_match": {"detector_brechas", "evaluador_seniority"},
+    }
+
+
+def test_coordinador_con_entrada_sin_productor_falla_al_crearse(monkeypatch):
+    monkeypatch.setattr(
+        AgenteDetectorBrechas,
+        "ENTRADAS",
+        {**AgenteDetectorBrechas.ENTRADAS, "certificaciones": "certificaciones"},
+    )
+
+    with pytest.raises(ValueError, match="no tiene productor"):
+        AgenteCoordinador(ConfiguracionEvaluacion(usar_langchain=False))
+
+
+def test_agentes_independientes_se_ejecutan_a_la_vez():
+    coordinador = AgenteCoordinador(
+        ConfiguracionEvaluacion(
+            simulacion=ConfiguracionSimulacion(latencia_ms=0, distribucion="fija"),
+            coalescer=False,
+        )
+    )
+    eventos: list[tuple[str, str, float]] = []
+
+    for nombre, agente in coordinador.agentes.items():
+
+        async def _aejecutar(input_data, nombre=nombre, agente=agente):
+            eventos.append((nombre, "inicio", time.monotonic()))
+            await asyncio.sleep(0.1)
+            eventos.append((nombre, "fin", time.monotonic()))
+            return agente._ejecutar_local(input_data)
+
+        agente.aejecutar = _aejecutar
+
+    resultado = coordinador.evaluar(
+        "Python y Django, 6 anos de experiencia", ["python", "react"], "senior"
+    )
+
+    assert resultado.resultado.skills_faltantes == ["react"]
+    momento = {(nombre, tipo): t for nombre, tipo, t in eventos}
+    # Analista y evaluador arrancan antes de que ninguno termine
+    assert max(
+        momento["analista_skills", "inicio"], momento["evaluador_seniority", "inicio"]
+    ) < min(momento["analista_skills", "fin"], momento["evaluador_seniority", "fin"])
+    for nombre, dependencias in coordinador.grafo.dependencias.items():
+        for dependencia in dependencias:
+            assert momento[dependencia, "fin"] <= momento[nombre, "inicio"]
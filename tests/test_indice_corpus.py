@@ -0,0 +1,81 @@
+import pytest
+
+from agentes_especializados import AgenteAnalistaSkills, AgenteDetectorBrechas
+from indice_corpus import IndiceCorpus
+from modelos import RequisitosPuesto
+from templates import NIVELES_DEFAULT, STACKS_REQUERIDOS
+
+
+def _requisitos(nombre: str) -> RequisitosPuesto:
+    return RequisitosPuesto(STACKS_REQUERIDOS[nombre], NIVELES_DEFAULT[nombre], 0)
+
+
+def _cobertura_por_cv(cvs: list[str], requisitos: RequisitosPuesto) -> dict[int, int]:
+    """Skills requeridas cubiertas segun el analista y el detector, CV a CV"""
+    analista = AgenteAnalistaSkills(None)
+    detector = AgenteDetectorBrechas(None)
+    cobertura = {}
+    for cv_id, cv in enumerate(cvs):
+        skills = analista._extraer_local(cv)["skills_tecnicas"]
+        brechas = detector._detectar_local(skills, requisitos.stack_tecnico)
+        cobertura[cv_id] = len(brechas["skills_coincidentes"])
+    return cobertura
+
+
+@pytest.fixture(scope="module")
+def indice(corpus_aleatorio) -> IndiceCorpus:
+    indice = IndiceCorpus()
+    indice.agregar_varios(enumerate(corpus_aleatorio))
+    return indice
+
+
+@pytest.mark.parametrize("nombre", sorted(STACKS_REQUERIDOS))
+def test_buscar_coincide_con_los_agentes_cv_a_cv(indice, corpus_aleatorio, nombre):
+    requisitos = _requisitos(nombre)
+    esperada = _cobertura_por_cv(corpus_aleatorio, requisitos)
+
+    for min_skills in (0, 1, 3, None):
+        minimo = len(requisitos.stack_tecnico) if min_skills is None else min_skills
+        preseleccion = indice.buscar(requisitos, min_skills)
+
+        assert dict(preseleccion) == {
+            cv_id: n for cv_id, n in esperada.items() if n >= minimo
+        }
+        coberturas = [n for _, n in preseleccion]
+        assert coberturas == sorted(coberturas, reverse=True)
+
+
+def test_indice_vacio():
+    indice = IndiceCorpus()
+
+    assert len(indice) == 0
+    assert indice.buscar(_requisitos("backend_developer")) == []
+    assert indice.buscar(_requisitos("backend_developer"), min_skills=None) == []
+
+
+def test_stack_vacio():
+    indice = IndiceCorpus()
+    indice.agregar("ana", "Python y Docker")
+    vacio = RequisitosPuesto([], "senior", 0)
+
+    assert indice.buscar(vacio) == []
+    # Todo CV cubre un stack vacio, como en AgenteDetectorBrechas
+    assert indice.buscar(vacio, min_skills=None) == [("ana", 0)]
+    assert indice.buscar(vacio, min_skills=0) == [("ana", 0)]
+
+
+def test_reemplazar_y_eliminar():
+    indice = IndiceCorpus()
+    indice.agregar("ana", "Python y Docker")
+    indice.agregar("ana", "Java y Spring")
+    indice.agregar("luis", "Python")
+    requisitos = RequisitosPuesto(["Python"], "senior", 0)
+
+    assert indice.obtener_skills("ana") == ["java", "spring"]
+    assert indice.buscar(requisitos) == [("luis", 1)]
+
+    indice.eliminar("luis")
+    indice.eliminar("inexistente")
+    assert "luis" not in indice
+    assert indice.buscar(requisitos) == []
+    assert indice._postings.keys() == {"java", "spring"}
@@ -0,0 +1,139 @@
+from types import SimpleNamespace
+import asyncio
+
+import pytest
+
+import limites_llm
+from agente_coordinador import AgenteCoordinador, ConfiguracionEvaluacion
+from limites_llm import ConfiguracionLimites, ErrorLLM, LimitadorLLM
+
+
+def _coordinador(**kwargs) -> AgenteCoordinador:
+    return AgenteCoordinador(ConfiguracionEvaluacion(usar_langchain=False, **kwargs))
+
+
+def test_coordinadores_de_la_misma_cuenta_comparten_limitador():
+    limites = ConfiguracionLimites(peticiones_por_minuto=60)
+    a = _coordinador(api_key="sk-test-a", limites=limites)
+    b = _coordinador(api_key="sk-test-a", limites=limites)
+    otra = _coordinador(api_key="sk-test-b", limites=limites)
+
+    assert a.llm is not b.llm
+    assert a.llm.limitador is b.llm.limitador
+    assert otra.llm.limitador is not a.llm.limitador
+
+
+def test_limitador_explicito_en_la_configuracion():
+    limitador = LimitadorLLM(ConfiguracionLimites(max_en_curso=2))
+    coordinador = _coordinador(limitador=limitador)
+
+    assert coordinador.llm.limitador is limitador
+
+
+class RelojFalso:
+    """Sustituye time.monotonic/time.sleep: dormir solo avanza el reloj"""
+
+    def __init__(self):
+        self.ahora = 0.0
+        self.esperas: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.ahora
+
+    def sleep(self, segundos: float):
+        self.esperas.append(segundos)
+        self.ahora += segundos
+
+
+@pytest.fixture
+def reloj(monkeypatch) -> RelojFalso:
+    reloj = RelojFalso()
+    monkeypatch.setattr(limites_llm.time, "monotonic", reloj.monotonic)
+    monkeypatch.setattr(limites_llm.time, "sleep", reloj.sleep)
+    return reloj
+
+
+class ErrorTransitorio(Exception):
+    status_code = 429
+
+
+def test_cubo_respeta_la_tasa(reloj):
+    limitador = LimitadorLLM(
+        ConfiguracionLimites(peticiones_por_minuto=60, max_en_curso=None)
+    )
+
+    for _ in range(70):
+        limitador.ejecutar(lambda: None, tokens=1)
+
+    # Rafaga de 60 sin esperar; las 10 siguientes, una por segundo
+    assert reloj.ahora == pytest.approx(10.0)
+
+
+def test_reintentos_agotados_lanzan_error_llm(reloj):
+    limitador = LimitadorLLM(ConfiguracionLimites(max_reintentos=2, espera_max_s=1))
+    llamadas = []
+
+    def _fallar():
+        llamadas.append(1)
+        raise ErrorTransitorio("429")
+
+    with pytest.raises(ErrorLLM) as error:
+        limitador.ejecutar(_fallar, tokens=1)
+
+    assert len(llamadas) == 3
+    assert error.value.intentos == 3
+    assert len(reloj.esperas) == 2
+    assert all(0 <= espera <= 1 for espera in reloj.esperas)
+
+
+def test_error_no_transitorio_no_se_reintenta(reloj):
+    limitador = LimitadorLLM()
+    llamadas = []
+
+    def _fallar():
+        llamadas.append(1)
+        raise ValueError("peticion invalida")
+
+    with pytest.raises(ErrorLLM):
+        limitador.ejecutar(_fallar, tokens=1)
+
+    assert len(llamadas) == 1
+    assert reloj.esperas == []
+
+
+def test_reintento_respeta_retry_after(reloj):
+    limitador = LimitadorLLM()
+    error = ErrorTransitorio("429")
+    error.response = SimpleNamespace(headers={"retry-after": "3"})
+    errores = [error]
+
+    def _llamar():
+        if errores:
+            raise errores.pop()
+        return "ok"
+
+    assert limitador.ejecutar(_llamar, tokens=1) == "ok"
+    assert reloj.esperas == [3.0]
+
+
+def test_max_en_curso_con_tareas_asyncio():
+    limitador = LimitadorLLM(ConfiguracionLimites(max_en_curso=2))
+    en_curso = 0
+    maximo = 0
+
+    async def _llamada():
+        nonlocal en_curso, maximo
+        en_curso += 1
+        maximo = max(maximo, en_curso)
+        await asyncio.sleep(0.01)
+        en_curso -= 1
+
+    async def _probar():
+        await asyncio.gather(
+            *(limitador.aejecutar(_llamada, tokens=1) for _ in range(6))
+        )
+
+    asyncio.run(_probar())
+
+    assert maximo == 2
+    assert limitador._semaforo.en_curso == 0
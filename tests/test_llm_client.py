@@ -0,0 +1,59 @@
+import asyncio
+
+from cache_llm import CacheRespuestasLLM
+from llm_client import LLMClient
+from llm_simulado import ConfiguracionSimulacion, LLMSimulado, RespuestaSimulada
+
+
+class LLMGuionado(LLMSimulado):
+    """Devuelve las respuestas de `guion` en orden, sin latencia"""
+
+    def __init__(self, guion: list[str]):
+        super().__init__(ConfiguracionSimulacion(latencia_ms=0, distribucion="fija"))
+        self.guion = list(guion)
+        self.llamadas = 0
+
+    def invoke(self, mensajes):
+        self.llamadas += 1
+        return RespuestaSimulada(self.guion.pop(0))
+
+    async def ainvoke(self, mensajes):
+        return self.invoke(mensajes)
+
+
+def _cliente(guion: list[str]) -> LLMClient:
+    cliente = LLMClient(
+        simulacion=ConfiguracionSimulacion(latencia_ms=0, distribucion="fija"),
+        cache=CacheRespuestasLLM(),
+    )
+    cliente._client = LLMGuionado(guion)
+    return cliente
+
+
+def test_respuesta_no_json_no_se_guarda_en_cache():
+    cliente = _cliente(["Lo siento, no puedo.", '{"ok": 1}'])
+
+    assert cliente.generate_json("p") == {"raw_response": "Lo siento, no puedo."}
+    assert cliente.generate_json("p") == {"ok": 1}
+    assert cliente.generate_json("p") == {"ok": 1}
+    assert cliente._client.llamadas == 2
+    assert cliente.cache.contadores["escrituras"] == 1
+
+
+def test_respuesta_no_json_no_se_guarda_en_cache_async():
+    cliente = _cliente(["Lo siento, no puedo.", '{"ok": 1}'])
+
+    async def _pedir():
+        return await cliente.agenerate_json("p")
+
+    assert asyncio.run(_pedir()) == {"raw_response": "Lo siento, no puedo."}
+    assert asyncio.run(_pedir()) == {"ok": 1}
+    assert cliente._client.llamadas == 2
+
+
+def test_generate_sin_validar_guarda_texto_libre():
+    cliente = _cliente(["texto libre"])
+
+    assert cliente.generate("p") == "texto libre"
+    assert cliente.generate("p") == "texto libre"
+    assert cliente._client.llamadas == 1
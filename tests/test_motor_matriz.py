@@ -0,0 +1,71 @@
+import pytest
+
+from agentes_especializados import AgenteCalculadorMatch, AgenteDetectorBrechas
+from motor_matriz import MotorMatriz, PerfilPuesto, extraer_perfil_cv
+from templates import STACKS_REQUERIDOS
+
+
+@pytest.fixture(scope="module")
+def perfiles_cv(corpus_aleatorio) -> list[dict]:
+    return [extraer_perfil_cv(cv) for cv in corpus_aleatorio]
+
+
+def test_matriz_igual_a_los_agentes_par_a_par(perfiles_cv):
+    motor = MotorMatriz.desde_templates()
+
+    matriz = motor.puntuar_perfiles(perfiles_cv)
+
+    assert matriz.porcentaje_match.shape == (len(perfiles_cv), len(STACKS_REQUERIDOS))
+    detector = AgenteDetectorBrechas(None)
+    calculador = AgenteCalculadorMatch(None)
+    for j, puesto in enumerate(motor.perfiles):
+        stack, nivel = puesto.stack_requerido, puesto.nivel_solicitado
+        for i, perfil in enumerate(perfiles_cv):
+            brechas = detector._detectar_local(perfil["skills_tecnicas"], stack)
+            puntaje = calculador._calcular_local(
+                brechas["skills_coincidentes"],
+                stack,
+                perfil["seniority_estimado"],
+                nivel,
+                brechas["brechas_criticas"],
+            )
+            for clave in ("porcentaje_match", "match_tecnico", "match_seniority"):
+                assert getattr(matriz, clave)[i, j] == puntaje[clave]
+            assert matriz.n_brechas[i, j] == len(brechas["brechas_criticas"])
+            assert matriz.clasificacion_de(i, j) == puntaje["clasificacion"]
+
+
+def test_corpus_vacio():
+    motor = MotorMatriz.desde_templates()
+
+    matriz = motor.puntuar([], [])
+
+    assert matriz.porcentaje_match.shape == (0, len(STACKS_REQUERIDOS))
+    assert matriz.n_brechas.shape == (0, len(STACKS_REQUERIDOS))
+    assert matriz.mejor_puesto() == []
+
+
+def test_puesto_sin_requisitos():
+    motor = MotorMatriz(
+        [PerfilPuesto("libre", [], "senior"), PerfilPuesto("py", ["Python"], "senior")]
+    )
+
+    matriz = motor.puntuar([["python"], []], ["senior", "junior"])
+
+    puntaje = AgenteCalculadorMatch(None)._calcular_local(
+        [], [], "junior", "senior", []
+    )
+    assert matriz.match_tecnico[:, 0].tolist() == [100, 100]
+    assert matriz.n_brechas[:, 0].tolist() == [0, 0]
+    assert matriz.porcentaje_match[1, 0] == puntaje["porcentaje_match"]
+    assert matriz.n_brechas[:, 1].tolist() == [0, 1]
+    assert matriz.mejor_puesto() == ["libre", "libre"]
+
+
+def test_skills_fuera_del_vocabulario():
+    motor = MotorMatriz([PerfilPuesto("raro", ["Cobol", "Fortran"], "mid")])
+
+    matriz = motor.puntuar([["cobol"], ["fortran", "cobol"]], ["mid", "mid"])
+
+    assert matriz.n_brechas[:, 0].tolist() == [1, 0]
+    assert matriz.match_tecnico[1, 0] == 100
@@ -0,0 +1,80 @@
+import asyncio
+import json
+
+from agente_coordinador import AgenteCoordinador, ConfiguracionEvaluacion
+from main import requisitos_desde_dict
+from metricas import METRICAS
+from servidor_http import ConfiguracionServidor, MicroLotes, ServidorEvaluacion
+
+
+async def _post(puerto: int, ruta: str, datos: dict) -> tuple[int, str, dict]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", puerto)
+    cuerpo = json.dumps(datos).encode("utf-8")
+    writer.write(
+        f"POST {ruta} HTTP/1.1\r\nHost: test\r\nConnection: close\r\n"
+        f"Content-Length: {len(cuerpo)}\r\n\r\n".encode("latin-1")
+        + cuerpo
+    )
+    await writer.drain()
+    respuesta = await reader.read()
+    writer.close()
+    cabecera, _, cuerpo = respuesta.partition(b"\r\n\r\n")
+    cabecera = cabecera.decode("latin-1")
+    return int(cabecera.split(" ", 2)[1]), cabecera, json.loads(cuerpo)
+
+
+def _lote(n: int) -> dict:
+    return {
+        "cvs": [{"id": i, "cv": f"Python y Django, CV {i}"} for i in range(n)],
+        "stack_requerido": ["Python"],
+        "nivel_solicitado": "senior",
+    }
+
+
+def test_lote_mayor_que_la_cola_da_413():
+    async def _probar():
+        coordinador = AgenteCoordinador(ConfiguracionEvaluacion(usar_langchain=False))
+        servidor = ServidorEvaluacion(
+            ConfiguracionServidor(puerto=0, max_cola=2), coordinador=coordinador
+        )
+        await servidor.iniciar()
+        try:
+            grande = await _post(servidor.puerto, "/lote", _lote(3))
+            cabe = await _post(servidor.puerto, "/lote", _lote(2))
+        finally:
+            await servidor.detener()
+        return grande, cabe
+
+    (estado, cabecera, _), (estado_ok, _, datos) = asyncio.run(_probar())
+
+    assert estado == 413
+    assert "Retry-After" not in cabecera
+    assert estado_ok == 200
+    assert [r["id"] for r in datos["resultados"]] == [0, 1]
+
+
+def test_cola_se_agrupa_sin_ventana_y_publica_la_profundidad():
+    async def _probar():
+        coordinador = AgenteCoordinador(ConfiguracionEvaluacion(usar_langchain=False))
+        lotes = MicroLotes(coordinador, ConfiguracionServidor())
+        requisitos = requisitos_desde_dict({"perfil": "backend_developer"})
+        futuros = [lotes.encolar("Python y Django", requisitos) for _ in range(3)]
+        futuros.append(lotes.encolar("Java y Spring", requisitos))
+        assert METRICAS.medidor("servidor_cola_profundidad") == 4
+
+        lotes.iniciar()
+        try:
+            resultados = await asyncio.gather(*futuros)
+        finally:
+            await lotes.detener()
+        return resultados
+
+    duplicados = METRICAS.contador("servidor_lote_duplicados_total")
+    resultados = asyncio.run(_probar())
+
+    assert ConfiguracionServidor().ventana_lote_ms == 0
+    assert resultados[0] is resultados[1] is resultados[2]
+    assert resultados[3] is not resultados[0]
+    assert METRICAS.contador("servidor_lote_duplicados_total") - duplicados == 2
+    assert METRICAS.medidor("servidor_cola_profundidad") == 0
+    assert METRICAS.medidor("servidor_evaluaciones_en_curso") == 0
@@ -0,0 +1,213 @@
+import asyncio
+import copy
+import json
+import threading
+
+import pytest
+
+import trazas
+from agente_coordinador import AgenteCoordinador, ConfiguracionEvaluacion
+from llm_simulado import ConfiguracionSimulacion
+from modelos import TrazabilidadAgente
+from trazas import AlmacenTrazas, ContextoTraza, contexto_actual, resumir_payload
+from workflows import WORKFLOW_DEFAULT
+
+
+def _traza(agente: str = "A", status: str = "success", fallback=None):
+    return TrazabilidadAgente(
+        agente=agente,
+        status=status,
+        duracion_ms=1.0,
+        input_data={"cv_texto": "Python"},
+        output_data={"skills": ["python"]},
+        error="fallo" if status == "error" else None,
+        fallback=fallback,
+    )
+
+
+def _contexto(*trazas_contexto: TrazabilidadAgente) -> ContextoTraza:
+    contexto = ContextoTraza()
+    contexto.extender(trazas_contexto)
+    return contexto
+
+
+def test_contextos_anidados_se_restauran():
+    assert contexto_actual() is None
+    with ContextoTraza() as externo:
+        with ContextoTraza() as interno:
+            assert contexto_actual() is interno
+        assert contexto_actual() is externo
+        # Reentrante: volver a entrar en el mismo contexto
+        with externo:
+            assert contexto_actual() is externo
+        assert contexto_actual() is externo
+    assert contexto_actual() is None
+
+
+def test_hilos_concurrentes_no_mezclan_trazas():
+    barrera = threading.Barrier(8)
+    contextos = {}
+
+    def _evaluacion(i: int):
+        with ContextoTraza() as contexto:
+            barrera.wait()
+            for _ in range(50):
+                contexto_actual().registrar(_traza(agente=f"hilo-{i}"))
+        contextos[i] = contexto
+
+    hilos = [threading.Thread(target=_evaluacion, args=(i,)) for i in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    for i, contexto in contextos.items():
+        assert len(contexto) == 50
+        assert {t.agente for t in contexto.trazas} == {f"hilo-{i}"}
+
+
+def test_tareas_concurrentes_no_mezclan_trazas():
+    async def _evaluacion(i: int) -> ContextoTraza:
+        with ContextoTraza() as contexto:
+            for _ in range(3):
+                await asyncio.sleep(0)
+                contexto_actual().registrar(_traza(agente=f"tarea-{i}"))
+        return contexto
+
+    async def _todas():
+        return await asyncio.gather(*(_evaluacion(i) for i in range(10)))
+
+    for i, contexto in enumerate(asyncio.run(_todas())):
+        assert [t.agente for t in contexto.trazas] == [f"tarea-{i}"] * 3
+
+
+def test_evaluaciones_concurrentes_del_coordinador_tienen_sus_trazas():
+    coordinador = AgenteCoordinador(ConfiguracionEvaluacion(usar_langchain=False))
+    cvs = [f"Desarrollador Python con {i} anos de experiencia" for i in range(12)]
+    resultados = {}
+
+    def _evaluar(cv: str):
+        resultados[cv] = coordinador.evaluar(cv, ["python"], "senior")
+
+    hilos = [threading.Thread(target=_evaluar, args=(cv,)) for cv in cvs]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    for cv, resultado in resultados.items():
+        assert len(resultado.trazabilidad) == 4
+        textos = {
+            t.input_data["cv_texto"]
+            for t in resultado.trazabilidad
+            if "cv_texto" in t.input_data
+        }
+        assert textos == {cv}
+    assert len(coordinador.almacen_trazas) == len(cvs)
+
+
+def test_almacen_descarta_las_evaluaciones_mas_antiguas():
+    almacen = AlmacenTrazas(max_evaluaciones=3)
+    contextos = [_contexto(_traza()) for _ in range(5)]
+    for contexto in contextos:
+        assert almacen.guardar(contexto)
+
+    assert almacen.recientes() == contextos[2:]
+    assert almacen.recientes(1) == contextos[-1:]
+    assert almacen.buscar(contextos[0].id_evaluacion) is None
+    assert almacen.buscar(contextos[4].id_evaluacion) is contextos[4]
+    assert almacen.contadores == {"retenidas": 5, "descartadas_muestreo": 0}
+
+
+def test_almacen_aplica_el_muestreo(monkeypatch):
+    tiradas = iter([0.1, 0.5, 0.9, 0.29])
+    monkeypatch.setattr(trazas.random, "random", lambda: next(tiradas))
+    almacen = AlmacenTrazas(muestreo=0.3)
+
+    guardados = [almacen.guardar(_contexto(_traza())) for _ in range(4)]
+
+    assert guardados == [True, False, False, True]
+    assert almacen.contadores == {"retenidas": 2, "descartadas_muestreo": 2}
+
+
+@pytest.mark.parametrize(
+    "traza", [_traza(status="error"), _traza(fallback="timeout tras 30s")]
+)
+def test_almacen_retiene_siempre_errores_y_respaldos(traza):
+    almacen = AlmacenTrazas(muestreo=0.0)
+
+    assert not almacen.guardar(_contexto(_traza()))
+    assert almacen.guardar(_contexto(_traza(), traza))
+    assert len(almacen) == 1
+
+
+CV_LARGO = "Desarrolladora Python senior, 6 anos de experiencia. " * 200
+
+
+def _evaluar(**config):
+    coordinador = AgenteCoordinador(ConfiguracionEvaluacion(**config))
+    return coordinador.evaluar(CV_LARGO, ["python", "react"], "senior")
+
+
+def test_nivel_compacto_resume_los_payloads():
+    completo = _evaluar(usar_langchain=False)
+    compacto = _evaluar(usar_langchain=False, nivel_traza="compacto")
+
+    assert compacto.resultado == completo.resultado
+    for original, resumida in zip(completo.trazabilidad, compacto.trazabilidad):
+        assert resumida.agente == original.agente
+        assert resumida.input_data == resumir_payload(original.input_data)
+        assert resumida.output_data == resumir_payload(original.output_data)
+        assert set(resumida.input_data) == {"sha256", "bytes", "claves"}
+    assert "Desarrolladora" not in json.dumps(
+        [t.to_dict() for t in compacto.trazabilidad]
+    )
+
+
+def test_resumen_de_payload():
+    resumen = resumir_payload({"b": "ñ", "a": 1})
+
+    assert resumen["claves"] == 2
+    assert resumen["bytes"] == len('{"a": 1, "b": "ñ"}'.encode("utf-8"))
+    assert resumen == resumir_payload({"a": 1, "b": "ñ"})
+    assert resumen["sha256"] != resumir_payload({"a": 2, "b": "ñ"})["sha256"]
+
+
+@pytest.mark.parametrize(
+    "traza", [_traza(status="error"), _traza(fallback="timeout tras 30s")]
+)
+def test_compactar_conserva_las_evaluaciones_con_fallos(traza):
+    contexto = _contexto(_traza(), traza)
+
+    assert not contexto.compactar()
+    assert [t.input_data for t in contexto.trazas] == [{"cv_texto": "Python"}] * 2
+
+
+def test_compactar_respeta_el_muestreo_de_payloads(monkeypatch):
+    monkeypatch.setattr(trazas.random, "random", lambda: 0.2)
+
+    assert not _contexto(_traza()).compactar(muestreo_payload=0.5)
+    assert _contexto(_traza()).compactar(muestreo_payload=0.1)
+
+
+def test_evaluacion_con_respaldo_conserva_los_payloads():
+    workflow = copy.deepcopy(WORKFLOW_DEFAULT)
+    for paso in workflow["pasos"]:
+        paso["timeout"] = 0.02
+
+    resultado = _evaluar(
+        nivel_traza="compacto",
+        workflow=workflow,
+        simulacion=ConfiguracionSimulacion(latencia_ms=5000, distribucion="fija"),
+        coalescer=False,
+    )
+
+    assert len(resultado.trazabilidad) == 4
+    assert all(t.fallback for t in resultado.trazabilidad)
+    assert not any("sha256" in t.input_data for t in resultado.trazabilidad)
+    assert resultado.trazabilidad[0].input_data["cv_texto"] == CV_LARGO
+
+
+def test_nivel_traza_desconocido():
+    with pytest.raises(ValueError, match="nivel_traza"):
+        AgenteCoordinador(ConfiguracionEvaluacion(nivel_traza="minimo"))
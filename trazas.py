@@ -0,0 +1,158 @@
+"""
+Trazabilidad por evaluacion.
+
+Cada evaluacion abre un ContextoTraza (variable de contexto) donde los
+agentes registran sus trazas; al terminar, el coordinador lo entrega a un
+AlmacenTrazas acotado (buffer circular con muestreo), de modo que la
+memoria no crece en un proceso de larga duracion.
+
+En nivel "compacto" los payloads de entrada y salida se sustituyen por un
+resumen (hash, tamano en bytes y numero de claves), salvo en las
+evaluaciones muestreadas o con fallos.
+"""
+
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Iterable, Optional
+import hashlib
+import json
+import random
+import os
+import threading
+
+from modelos import TrazabilidadAgente
+
+NIVELES_TRAZA = ("completo", "compacto")
+
+_CONTEXTO_ACTUAL: ContextVar[Optional["ContextoTraza"]] = ContextVar(
+    "contexto_traza", default=None
+)
+
+
+def resumir_payload(payload: dict) -> dict:
+    """Hash sha256, tamano en bytes y numero de claves del payload serializado"""
+    contenido = json.dumps(
+        payload, sort_keys=True, ensure_ascii=False, default=str
+    ).encode("utf-8")
+    return {
+        "sha256": hashlib.sha256(contenido).hexdigest(),
+        "bytes": len(contenido),
+        "claves": len(payload),
+    }
+
+
+def contexto_actual() -> Optional["ContextoTraza"]:
+    """ContextoTraza activo en el hilo o tarea actual, si lo hay"""
+    return _CONTEXTO_ACTUAL.get()
+
+
+class ContextoTraza:
+    """
+    Trazas de una sola evaluacion.
+
+    Usado como context manager, se convierte en el contexto activo: las
+    trazas que registren los agentes dentro del bloque van a este contexto.
+    """
+
+    def __init__(self, id_evaluacion: Optional[str] = None):
+        self.id_evaluacion = id_evaluacion or os.urandom(16).hex()
+        self.inicio = datetime.now().isoformat()
+        self._trazas: list[TrazabilidadAgente] = []
+        self._tokens = []
+        self._lock = threading.Lock()
+
+    def registrar(self, traza: TrazabilidadAgente):
+        with self._lock:
+            self._trazas.append(traza)
+
+    def extender(self, trazas: Iterable[TrazabilidadAgente]):
+        with self._lock:
+            self._trazas.extend(trazas)
+
+    @property
+    def trazas(self) -> list[TrazabilidadAgente]:
+        with self._lock:
+            return list(self._trazas)
+
+    @property
+    def con_fallos(self) -> bool:
+        """True si algun agente fallo o uso su metodo de respaldo"""
+        return any(t.status == "error" or t.fallback for t in self.trazas)
+
+    def compactar(self, muestreo_payload: float = 0.0) -> bool:
+        """
+        Sustituye los payloads por su resumen (ver resumir_payload).
+
+        Las evaluaciones con fallos, y una fraccion muestreo_payload de las
+        demas, conservan los payloads completos. Devuelve si se compacto.
+        """
+        if self.con_fallos or random.random() < muestreo_payload:
+            return False
+        with self._lock:
+            for traza in self._trazas:
+                traza.input_data = resumir_payload(traza.input_data)
+                traza.output_data = resumir_payload(traza.output_data)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._trazas)
+
+    def __enter__(self) -> "ContextoTraza":
+        self._tokens.append(_CONTEXTO_ACTUAL.set(self))
+        return self
+
+    def __exit__(self, *exc):
+        _CONTEXTO_ACTUAL.reset(self._tokens.pop())
+
+
+class AlmacenTrazas:
+    """
+    Buffer circular de las trazas de las ultimas evaluaciones.
+
+    Args:
+        max_evaluaciones: Evaluaciones retenidas; las mas antiguas se descartan
+        muestreo: Fraccion (0-1) de evaluaciones correctas que se retienen;
+            las que tienen errores o respaldos se retienen siempre
+    """
+
+    def __init__(self, max_evaluaciones: int = 256, muestreo: float = 1.0):
+        self.muestreo = muestreo
+        self._contextos: deque[ContextoTraza] = deque(maxlen=max_evaluaciones)
+        self._lock = threading.Lock()
+        self.contadores = {"retenidas": 0, "descartadas_muestreo": 0}
+
+    def guardar(self, contexto: ContextoTraza) -> bool:
+        """Retiene el contexto segun el muestreo; devuelve si se guardo"""
+        retener = (
+            self.muestreo >= 1.0
+            or contexto.con_fallos
+            or random.random() < self.muestreo
+        )
+        with self._lock:
+            if not retener:
+                self.contadores["descartadas_muestreo"] += 1
+                return False
+            self._contextos.append(contexto)
+            self.contadores["retenidas"] += 1
+            return True
+
+    def recientes(self, n: Optional[int] = None) -> list[ContextoTraza]:
+        """Ultimos n contextos retenidos, del mas antiguo al mas reciente"""
+        with self._lock:
+            contextos = list(self._contextos)
+        return contextos if n is None else contextos[-n:]
+
+    def buscar(self, id_evaluacion: str) -> Optional[ContextoTraza]:
+        with self._lock:
+            for contexto in reversed(self._contextos):
+                if contexto.id_evaluacion == id_evaluacion:
+                    return contexto
+        return None
+
+    def limpiar(self):
+        with self._lock:
+            self._contextos.clear()
+
+    def __len__(self) -> int:
+        return len(self._contextos)
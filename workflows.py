@@ -32,6 +32,7 @@ WORKFLOW_DEFAULT = {
         {
             "orden": 1,
             "agente": "AgenteAnalizadorSkills",
+            "nodo": "analista_skills",
             "descripcion": "Extraer skills del CV",
             "obligatorio": True,
             "timeout": 30,
@@ -39,6 +40,7 @@ WORKFLOW_DEFAULT = {
         {
             "orden": 2,
             "agente": "AgenteEvaluadorSeniority",
+            "nodo": "evaluador_seniority",
             "descripcion": "Evaluar nivel de seniority",
             "obligatorio": True,
             "timeout": 20,
@@ -46,6 +48,7 @@ WORKFLOW_DEFAULT = {
         {
             "orden": 3,
             "agente": "AgenteDetectorBrechas",
+            "nodo": "detector_brechas",
             "descripcion": "Identificar brechas técnicas",
             "obligatorio": True,
             "timeout": 25,
@@ -53,6 +56,7 @@ WORKFLOW_DEFAULT = {
         {
             "orden": 4,
             "agente": "AgenteCalculadorMatch",
+            "nodo": "calculador_match",
             "descripcion": "Calcular porcentaje de match",
             "obligatorio": True,
             "timeout": 15,